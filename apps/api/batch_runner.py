@@ -0,0 +1,240 @@
+# apps/api/batch_runner.py
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import math
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from apps.api.batch_store import add_item, incr, is_cancelled, update_batch, update_item
+from configs.settings import settings
+from core.metrics import RUNS_IN_FLIGHT, RUNS_QUEUED
+
+# Bulk pipeline for POST /batches, streamed chunk by chunk of BATCH_ENCODE_SIZE applicants:
+#   parse rows + create their cases -> one batched encoder forward + batched Qdrant
+#   queries -> debates/triage with at most `concurrency` in flight. Chunk i+1 is read
+#   and scored while chunk i is still being decided; a chunk is dropped once decided,
+#   so at most two chunks of applicants are held in memory whatever the upload size.
+
+FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: str, content_type: Optional[str], explicit: Optional[str]) -> Optional[str]:
+    if explicit:
+        return explicit if explicit in FORMATS else None
+    ext = filename.lower().rsplit(".", 1)[-1] if "." in filename else ""
+    if ext == "csv" or (content_type or "").startswith("text/csv"):
+        return "csv"
+    if ext in ("ndjson", "jsonl") or "ndjson" in (content_type or "") or "jsonl" in (content_type or ""):
+        return "ndjson"
+    return None
+
+
+def _coerce(value: Any) -> Any:
+    """CSV cells are strings: '' -> None, numeric strings -> int/float, rest untouched ("nan"/"inf" too)."""
+    if not isinstance(value, str):
+        return value
+    v = value.strip()
+    if v == "":
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        pass
+    try:
+        f = float(v)
+    except ValueError:
+        return v
+    return f if math.isfinite(f) else v
+
+
+def iter_rows(path: str, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yields (row number, applicant, error) — exactly one of applicant / error is set."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            for n, row in enumerate(csv.DictReader(f), 1):
+                applicant = {k.strip(): _coerce(v) for k, v in row.items() if k}
+                yield (n, applicant, None) if applicant else (n, None, "empty row")
+            return
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield n, None, f"invalid JSON: {e.msg}"
+                continue
+            # either a bare applicant object or {"applicant": {...}} like POST /cases
+            obj = obj.get("applicant", obj) if isinstance(obj, dict) else obj
+            if isinstance(obj, dict) and obj:
+                yield n, obj, None
+            else:
+                yield n, None, "expected a JSON object per line"
+
+
+def run_batch(batch_id: str, path: str, fmt: str, params: Dict[str, Any]):
+    """BackgroundTasks entrypoint (runs in a worker thread); removes `path` when done."""
+    try:
+        update_batch(batch_id, status="running", stage="parsing")
+        asyncio.run(_process(batch_id, iter_rows(path, fmt), params))
+        cancelled = is_cancelled(batch_id)
+        update_batch(batch_id, status="cancelled" if cancelled else "done", stage="done")
+    except Exception as e:
+        update_batch(batch_id, status="failed", stage="done", error=str(e))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+Chunk = List[Tuple[int, str, Dict[str, Any]]]
+
+
+class _CaseReader:
+    """Reads rows and creates one draft case per valid row, `size` cases at a time."""
+
+    def __init__(self, batch_id: str, rows: Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]):
+        self.batch_id = batch_id
+        self.rows = rows
+        self.exhausted = False
+
+    def next_chunk(self, size: int) -> Chunk:
+        """Up to `size` (item index, case_id, applicant); fewer once the rows run out."""
+        from apps.api.routes_cases import new_case
+
+        chunk: Chunk = []
+        while len(chunk) < size:
+            if is_cancelled(self.batch_id):
+                self.exhausted = True
+                break
+            item = next(self.rows, None)
+            if item is None:
+                self.exhausted = True
+                break
+            n, applicant, error = item
+            if n > settings.BATCH_MAX_ROWS:
+                update_batch(self.batch_id, error=f"truncated at BATCH_MAX_ROWS={settings.BATCH_MAX_ROWS}")
+                self.exhausted = True
+                break
+            incr(self.batch_id, rows=1)
+            if error:
+                add_item(self.batch_id, {"row": n, "case_id": None, "status": "invalid", "error": error})
+                incr(self.batch_id, invalid=1)
+                continue
+            case_id = new_case(applicant, source="batch", batch_id=self.batch_id)
+            idx = add_item(self.batch_id, {"row": n, "case_id": case_id, "status": "pending"})
+            chunk.append((idx, case_id, applicant))
+            incr(self.batch_id, cases_created=1)
+        return chunk
+
+
+def _score(applicants: List[Dict[str, Any]], top_k: int):
+    """One encoder forward + batched neighbor queries for a chunk of applicants."""
+    from core.encoder_runtime import encode_and_score_applicants
+    from retrieval.neighbors import retrieve_neighbors_batch
+
+    vecs, default_probs = encode_and_score_applicants(applicants)
+    neighbors = retrieve_neighbors_batch(vecs, applicant_payloads=applicants, top_k=top_k)
+    return neighbors, default_probs
+
+
+async def _process(batch_id: str, rows: Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]], params: Dict[str, Any]):
+    from apps.api.routes_cases import fail_case
+
+    top_k = params["top_k"]
+    sem = asyncio.Semaphore(params["concurrency"])
+    size = max(1, settings.BATCH_ENCODE_SIZE)
+    reader = _CaseReader(batch_id, rows)
+    inflight: List[asyncio.Future] = []
+
+    while not reader.exhausted:
+        update_batch(batch_id, stage="parsing")
+        chunk = await asyncio.to_thread(reader.next_chunk, size)
+        if not chunk:
+            break
+        if is_cancelled(batch_id):
+            # cases created just before the cancel are reported as cancelled
+            for idx, _, _ in chunk:
+                update_item(batch_id, idx, status="cancelled")
+            incr(batch_id, cancelled=len(chunk))
+            break
+        update_batch(batch_id, stage="scoring")
+        try:
+            neighbors, probs = await asyncio.to_thread(_score, [a for _, _, a in chunk], top_k)
+        except Exception as e:
+            error = f"scoring failed: {e}"
+            for idx, case_id, _ in chunk:
+                update_item(batch_id, idx, status="failed", error=error)
+                fail_case(case_id, error)
+            incr(batch_id, failed=len(chunk))
+            continue
+        incr(batch_id, encoded=len(chunk))
+        update_batch(batch_id, stage="deciding")
+
+        # bound memory: wait for the previous chunk before reading the one after this
+        if inflight:
+            await asyncio.gather(*inflight)
+        inflight = [
+            asyncio.ensure_future(_decide_one(batch_id, idx, case_id, applicant, nb, p, params, sem))
+            for (idx, case_id, applicant), nb, p in zip(chunk, neighbors, probs)
+        ]
+        del chunk, neighbors, probs
+    if inflight:
+        await asyncio.gather(*inflight)
+
+
+async def _decide_one(
+    batch_id: str,
+    idx: int,
+    case_id: str,
+    applicant: Dict[str, Any],
+    neighbors: List[Dict[str, Any]],
+    default_prob: float,
+    params: Dict[str, Any],
+    sem: asyncio.Semaphore,
+):
+    from apps.api.pipeline_adapter import decide_case
+    from apps.api.routes_case_run import begin_run, message_streamer, record_run_failure, record_run_result
+
+    with RUNS_QUEUED.track(source="batch"):
+        await sem.acquire()
+    try:
+        if is_cancelled(batch_id):
+            update_item(batch_id, idx, status="cancelled")
+            incr(batch_id, cancelled=1)
+            return
+        run_id = begin_run(case_id)
+        update_item(batch_id, idx, status="running", run_id=run_id)
+        try:
+            with RUNS_IN_FLIGHT.track(source="batch"):
+                result = await decide_case(
+                    applicant,
+                    neighbors,
+                    default_prob,
+                    top_k=params["top_k"],
+                    mode=params["mode"],
+                    rounds=params.get("rounds"),
+                    use_triage=params.get("triage"),
+                    on_message=message_streamer(run_id, case_id),
+                )
+        except Exception as e:
+            record_run_failure(run_id, case_id, e)
+            update_item(batch_id, idx, status="failed", error=str(e))
+            incr(batch_id, failed=1)
+            return
+    finally:
+        sem.release()
+
+    record_run_result(run_id, case_id, result)
+    decision = result.get("decision") or {}
+    path = result.get("path")
+    update_item(
+        batch_id,
+        idx,
+        status="decided",
+        verdict=decision.get("verdict"),
+        confidence=decision.get("confidence"),
+        path=path,
+    )
+    incr(batch_id, decided=1, **({"triaged": 1} if path == "triage" else {"debated": 1}))
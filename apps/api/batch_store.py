@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import threading
+import uuid
+
+# In-memory store for bulk batches (same idea as run_store / policy_jobs).
+# BATCHES holds the progress record; _ITEMS holds one result row per input row.
+BATCHES: Dict[str, Dict[str, Any]] = {}
+_ITEMS: Dict[str, List[Dict[str, Any]]] = {}
+_CANCEL: Dict[str, threading.Event] = {}
+_LOCK = threading.Lock()
+
+COUNTERS = ("rows", "cases_created", "invalid", "encoded", "decided", "failed", "cancelled", "triaged", "debated")
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
+
+def create_batch(params: Dict[str, Any]) -> str:
+    batch_id = f"batch_{uuid.uuid4().hex[:10]}"
+    now = _now()
+    with _LOCK:
+        BATCHES[batch_id] = {
+            "batch_id": batch_id,
+            "status": "queued",   # queued | running | done | cancelled | failed
+            "stage": "queued",    # queued | parsing | scoring | deciding | done
+            "params": params,
+            **{c: 0 for c in COUNTERS},
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        _ITEMS[batch_id] = []
+        _CANCEL[batch_id] = threading.Event()
+    return batch_id
+
+def update_batch(batch_id: str, **fields: Any):
+    with _LOCK:
+        batch = BATCHES.get(batch_id)
+        if batch is None:
+            return
+        batch.update(fields)
+        batch["updated_at"] = _now()
+
+def incr(batch_id: str, **deltas: int):
+    with _LOCK:
+        batch = BATCHES.get(batch_id)
+        if batch is None:
+            return
+        for k, v in deltas.items():
+            batch[k] = batch.get(k, 0) + v
+        batch["updated_at"] = _now()
+
+def add_item(batch_id: str, item: Dict[str, Any]) -> int:
+    with _LOCK:
+        items = _ITEMS.setdefault(batch_id, [])
+        items.append(item)
+        return len(items) - 1
+
+def update_item(batch_id: str, index: int, **fields: Any):
+    with _LOCK:
+        _ITEMS[batch_id][index].update(fields)
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    with _LOCK:
+        batch = BATCHES.get(batch_id)
+        return dict(batch) if batch else None
+
+def get_items(
+    batch_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    with _LOCK:
+        items = _ITEMS.get(batch_id, [])
+        if status:
+            items = [i for i in items if i.get("status") == status]
+        return len(items), [dict(i) for i in items[offset:offset + limit]]
+
+def request_cancel(batch_id: str) -> bool:
+    with _LOCK:
+        event = _CANCEL.get(batch_id)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+def is_cancelled(batch_id: str) -> bool:
+    event = _CANCEL.get(batch_id)
+    return bool(event and event.is_set())
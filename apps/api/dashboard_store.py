@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta
+import threading
+
+# Incrementally maintained dashboard aggregates.
+# Every case contributes one "snapshot" (status, verdict, confidence bucket, ...).
+# On each transition we subtract the old snapshot and add the new one, so reading
+# the dashboard never has to walk CASES.
+
+CONFIDENCE_BUCKETS = 10
+THROUGHPUT_HOURS = 48
+
+_LOCK = threading.Lock()
+_CONTRIB: Dict[str, Tuple[Any, ...]] = {}
+
+_STATUS: Counter = Counter()
+_VERDICT: Counter = Counter()
+_CONFIDENCE: Counter = Counter()
+_BY_PURPOSE: Dict[str, Counter] = {}
+_BY_GRADE: Dict[str, Counter] = {}
+_THROUGHPUT: Counter = Counter()
+# hours before this were pruned from _THROUGHPUT: contributions to them are neither added
+# nor subtracted (a case moved after its decision hour was pruned mustn't go negative)
+_throughput_cutoff = ""
+
+
+def _hour_bucket(ts: Optional[str]) -> Optional[str]:
+    if not ts:
+        return None
+    return ts[:13] + ":00:00Z"  # ISO "YYYY-MM-DDTHH"
+
+
+def _confidence_bucket(conf: Any) -> Optional[int]:
+    try:
+        v = float(conf)
+    except Exception:
+        return None
+    v = max(0.0, min(1.0, v))
+    return min(int(v * CONFIDENCE_BUCKETS), CONFIDENCE_BUCKETS - 1)
+
+
+def _contribution(case: Dict[str, Any]) -> Tuple[Any, ...]:
+    decision = case.get("decision") or {}
+    applicant = case.get("applicant") or {}
+    verdict = decision.get("verdict")
+    return (
+        case.get("status"),
+        verdict,
+        _confidence_bucket(decision.get("confidence")) if verdict else None,
+        str(applicant.get("loan_purpose") or "unknown"),
+        str(applicant.get("grade_subgrade") or "unknown"),
+        _hour_bucket(case.get("decided_at")) if verdict else None,
+    )
+
+
+def _bump(group: Dict[str, Counter], key: str, verdict: Optional[str], sign: int):
+    c = group.setdefault(key, Counter())
+    c["total"] += sign
+    if verdict:
+        c[verdict] += sign
+    if c["total"] <= 0:
+        group.pop(key, None)
+
+
+def _apply(contrib: Tuple[Any, ...], sign: int):
+    status, verdict, conf, purpose, grade, hour = contrib
+    _STATUS[status] += sign
+    if verdict:
+        _VERDICT[verdict] += sign
+    if conf is not None:
+        _CONFIDENCE[conf] += sign
+    _bump(_BY_PURPOSE, purpose, verdict, sign)
+    _bump(_BY_GRADE, grade, verdict, sign)
+    if hour and hour >= _throughput_cutoff:
+        _THROUGHPUT[hour] += sign
+
+
+def _prune_throughput():
+    global _throughput_cutoff
+    _throughput_cutoff = _hour_bucket((datetime.utcnow() - timedelta(hours=THROUGHPUT_HOURS)).isoformat()) or ""
+    for hour in [h for h in _THROUGHPUT if h < _throughput_cutoff]:
+        del _THROUGHPUT[hour]
+
+
+def track_case(case: Dict[str, Any]):
+    """Call after every status/decision/applicant change of a case."""
+    case_id = case["case_id"]
+    new = _contribution(case)
+    with _LOCK:
+        old = _CONTRIB.get(case_id)
+        if old == new:
+            return
+        if old is not None:
+            _apply(old, -1)
+        _apply(new, +1)
+        _CONTRIB[case_id] = new
+        _prune_throughput()
+
+
+def forget_case(case_id: str):
+    with _LOCK:
+        old = _CONTRIB.pop(case_id, None)
+        if old is not None:
+            _apply(old, -1)
+
+
+def rebuild(cases: Dict[str, Dict[str, Any]]) -> int:
+    """Recompute every aggregate from the case store (recovery path)."""
+    with _LOCK:
+        _CONTRIB.clear()
+        for c in (_STATUS, _VERDICT, _CONFIDENCE, _THROUGHPUT):
+            c.clear()
+        _BY_PURPOSE.clear()
+        _BY_GRADE.clear()
+        for case in list(cases.values()):
+            contrib = _contribution(case)
+            _apply(contrib, +1)
+            _CONTRIB[case["case_id"]] = contrib
+        _prune_throughput()
+        return len(_CONTRIB)
+
+
+def _positive(c: Counter) -> Dict[str, int]:
+    return {str(k): v for k, v in c.items() if v > 0}
+
+
+def snapshot() -> Dict[str, Any]:
+    with _LOCK:
+        histogram: List[Dict[str, Any]] = [
+            {
+                "bucket": f"{i / CONFIDENCE_BUCKETS:.1f}-{(i + 1) / CONFIDENCE_BUCKETS:.1f}",
+                "count": _CONFIDENCE.get(i, 0),
+            }
+            for i in range(CONFIDENCE_BUCKETS)
+        ]
+        return {
+            "total_cases": len(_CONTRIB),
+            "status_counts": _positive(_STATUS),
+            "verdict_counts": _positive(_VERDICT),
+            "confidence_histogram": histogram,
+            "by_loan_purpose": {k: _positive(v) for k, v in _BY_PURPOSE.items()},
+            "by_grade_subgrade": {k: _positive(v) for k, v in _BY_GRADE.items()},
+            "throughput_hourly": [
+                {"hour": h, "decided": n} for h, n in sorted(_THROUGHPUT.items()) if n > 0
+            ],
+        }
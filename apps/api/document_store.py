@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import os
+import tempfile
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from configs.settings import settings
+
+# Content-addressed document store: <DOCUMENT_STORE_DIR>/<sha[:2]>/<sha256>.
+# Uploads are streamed chunk by chunk into a temp file (same filesystem) while the
+# SHA-256 is computed, then atomically renamed into place. Identical files
+# uploaded to different cases share one blob.
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def _root() -> str:
+    return settings.DOCUMENT_STORE_DIR
+
+
+def document_path(sha256: str) -> str:
+    """Local path of a stored blob (for extraction / download)."""
+    return os.path.join(_root(), sha256[:2], sha256)
+
+
+def has_document(sha256: str) -> bool:
+    return os.path.exists(document_path(sha256))
+
+
+async def store_upload(
+    file: UploadFile, max_bytes: int, reserve: Optional[Callable[[int], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Streams `file` into the store, enforcing `max_bytes`. `reserve(n)` (if given) is asked
+    for every chunk before it is written; False aborts the upload (e.g. a per-case quota).
+    Returns { sha256, size, deduplicated }.
+    """
+    tmp_dir = os.path.join(_root(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix="upload_")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds limit of {max_bytes} bytes")
+                if reserve is not None and not reserve(len(chunk)):
+                    raise UploadTooLarge("Case document quota exceeded")
+                h.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+
+        sha = h.hexdigest()
+        final_path = document_path(sha)
+        deduplicated = os.path.exists(final_path)
+        if not deduplicated:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        return {"sha256": sha, "size": size, "deduplicated": deduplicated}
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
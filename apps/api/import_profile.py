@@ -0,0 +1,52 @@
+"""
+Import-time profile of the API entrypoint.
+
+    python -m apps.api.import_profile [--module apps.api.main] [--top 25]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and prints the
+total plus the slowest imports by cumulative time, so regressions (a heavy library
+imported at module level again) show up before they reach a deploy.
+"""
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+def profile(module: str) -> List[Tuple[int, int, str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise SystemExit(f"import {module} failed: {tail[0]}")
+
+    rows: List[Tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |   cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cum_us), name.rstrip()))
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--module", default="apps.api.main")
+    p.add_argument("--top", type=int, default=25)
+    args = p.parse_args()
+
+    rows = profile(args.module)
+    # top-level entries (no leading indentation) sum to the total import time
+    total_us = sum(cum for _, cum, name in rows if not name.startswith("  "))
+    print(f"import {args.module}: {total_us / 1000:.1f} ms total")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  package")
+    for self_us, cum_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{cum_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
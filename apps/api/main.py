@@ -1,5 +1,14 @@
-from fastapi import FastAPI, APIRouter
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, APIRouter, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+from apps.api.request_metrics import RequestMetricsMiddleware
+from apps.api.responses import FastJSONResponse
+from apps.api.startup import readiness, start_warmup
+from core import metrics
+from core.connections import connections
 
 from apps.api.routes_health import router as health_router
 from apps.api.routes_retrieval import router as retrieval_router
@@ -12,8 +21,22 @@ from apps.api.routes_runs import router as runs_router
 from apps.api.routes_case_run import router as case_run_router
 from apps.api.routes_dashboard import router as dashboard_router
 from apps.api.routes_policies_list import router as policies_list_router
+from apps.api.routes_batches import router as batches_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connections.startup()
+    start_warmup()  # background: the port is bound right away, /ready flips once warm
+    yield
+    connections.shutdown()
 
-app = FastAPI(title="credit courtroom API", version="0.1.0")
+
+app = FastAPI(
+    title="credit courtroom API",
+    version="0.1.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS (so Vite on :5173 can call FastAPI on :8000)
 app.add_middleware(
@@ -22,14 +45,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compress large bodies (case lists / full case payloads); small polls stay uncompressed.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Outermost: per-route latency histogram (includes gzip + CORS time).
+app.add_middleware(RequestMetricsMiddleware)
+
 api_v1 = APIRouter(prefix="/api/v1")
 api_v1.include_router(health_router)
 api_v1.include_router(cases_router)
 api_v1.include_router(case_run_router)
 api_v1.include_router(runs_router)
 api_v1.include_router(dashboard_router)
+api_v1.include_router(batches_router)
 
 api_v1.include_router(policies_router)       # POST /policies/upload (your existing)
 api_v1.include_router(policies_list_router)
@@ -40,4 +71,16 @@ app.include_router(api_v1)
 
 @app.get("/health")
 def health():
+    # liveness: the process is up (no dependency or model checks)
     return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    # readiness: 503 until the startup warmup has loaded the encoder + embedding model
+    state = readiness()
+    return FastJSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    # Prometheus text format: stage/node latency, LLM tokens, runs queued/in flight, cache hits, HTTP latency
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
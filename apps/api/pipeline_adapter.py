@@ -3,11 +3,13 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from core.encoder_runtime import encode_applicant_payload
+from core.encoder_runtime import encode_and_score_applicant
+from core.metrics import RUN_OUTCOMES, stage_timer
 from retrieval.neighbors import retrieve_neighbors, summarize_neighbor_stats
 from workflow.debate_workflow import CreditDebateWorkflow
+from workflow.triage import PATH_DEBATE, PATH_TRIAGE, templated_decision, templated_message, triage
 
 # This is your in-memory case store used by routes_cases.py
 # (routes_runs.py already imports CASES from routes_cases)
@@ -230,13 +232,23 @@ def _build_decision_payload(workflow_messages: List[Dict[str, Any]], neighbor_it
     }
 
 
-def run_case_pipeline(case_id: str, top_k: int = 8, mode: str = "standard") -> Dict[str, Any]:
+def run_case_pipeline(
+    case_id: str,
+    top_k: int = 8,
+    mode: str = "standard",
+    rounds: Optional[int] = None,
+    use_triage: Optional[bool] = None,
+    on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
     """
     SYNC entrypoint used by BackgroundTasks.
     It runs the async workflow using asyncio.run safely in a background thread.
 
+    use_triage: None = follow settings.TRIAGE_ENABLED, False = always debate.
+    on_message: receives each transcript message (frontend shape) as the debate produces it.
+
     Returns:
-      { messages, retrieval, decision }
+      { messages, retrieval, decision, path, triage }
     """
     if case_id not in CASES:
         raise ValueError(f"Case not found: {case_id}")
@@ -246,16 +258,74 @@ def run_case_pipeline(case_id: str, top_k: int = 8, mode: str = "standard") -> D
         raise ValueError("Applicant not saved for this case_id (PATCH /cases/{caseId}/applicant first).")
 
     # Run async pipeline in this background thread
-    return asyncio.run(_run_async_pipeline(applicant=applicant, top_k=top_k, mode=mode))
-
-
-async def _run_async_pipeline(applicant: Dict[str, Any], top_k: int, mode: str) -> Dict[str, Any]:
-    # 1) Encode applicant
-    vec = encode_applicant_payload(applicant)
+    return asyncio.run(_run_async_pipeline(
+        applicant=applicant, top_k=top_k, mode=mode, rounds=rounds, use_triage=use_triage, on_message=on_message,
+    ))
+
+
+async def _run_async_pipeline(
+    applicant: Dict[str, Any],
+    top_k: int,
+    mode: str,
+    rounds: Optional[int] = None,
+    use_triage: Optional[bool] = None,
+    on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    # 1) Encode applicant (embedding + encoder-head default probability, one forward pass)
+    with stage_timer("encode"):
+        vec, default_prob = encode_and_score_applicant(applicant)
 
     # 2) Retrieve neighbors
-    neighbors = retrieve_neighbors(vec, applicant_payload=applicant, top_k=top_k)
-    stats = summarize_neighbor_stats(neighbors)
+    with stage_timer("neighbors"):
+        neighbors = retrieve_neighbors(vec, applicant_payload=applicant, top_k=top_k)
+
+    return await decide_case(
+        applicant, neighbors, default_prob, top_k=top_k, mode=mode, rounds=rounds, use_triage=use_triage,
+        on_message=on_message,
+    )
+
+
+async def decide_case(
+    applicant: Dict[str, Any],
+    neighbors: List[Dict[str, Any]],
+    default_prob: float,
+    top_k: int,
+    mode: str = "standard",
+    rounds: Optional[int] = None,
+    use_triage: Optional[bool] = None,
+    on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Steps 2b-3 for an applicant that is already encoded + retrieved
+    (also used by batches, which encode and retrieve many applicants at once).
+    """
+    with stage_timer("triage"):
+        stats = summarize_neighbor_stats(neighbors)
+        neighbor_items = _map_neighbors_for_frontend(neighbors)
+        retrieval = {
+            "top_k": top_k,
+            "neighbors": neighbor_items,
+            "stats": _compute_retrieval_stats(applicant, neighbors, stats),
+        }
+
+        # 2b) Triage: clear-cut cases get a templated decision, no LLM calls
+        triage_result = triage(default_prob, stats)
+        if use_triage is False and triage_result["path"] == PATH_TRIAGE:
+            triage_result.update(path=PATH_DEBATE, verdict=None, reason="triage skipped by request")
+    if triage_result["path"] == PATH_TRIAGE:
+        decision = templated_decision(triage_result, neighbor_items)
+        judge_msg = {"speaker": "judge", "content": templated_message(decision), "stage": "verdict"}
+        RUN_OUTCOMES.inc(path=PATH_TRIAGE, status="decided")
+        return {
+            "messages": _map_transcript_messages([judge_msg]),
+            "retrieval": retrieval,
+            "decision": decision,
+            "path": PATH_TRIAGE,
+            "triage": triage_result,
+        }
+
+    # the model score is evidence for the agents too (they may only cite provided values)
+    stats = {**stats, "model_default_prob": triage_result["default_prob"]}
 
     # 3) Run debate workflow
     init_state = {
@@ -266,29 +336,25 @@ async def _run_async_pipeline(applicant: Dict[str, Any], top_k: int, mode: str)
         "debate_topic": "Should we approve this loan application?",
         "stage": "opening",
         "speaker": "risk",
-        "mode": mode,  # harmless if ignored
     }
 
-    wf = CreditDebateWorkflow()
-    final_state = await wf.run(init_state)
+    # mode: "standard" (sequential rounds) | "fast" (parallel openings -> judge)
+    wf = CreditDebateWorkflow(mode=mode, rounds=rounds)
+    stream = (lambda m: on_message(_map_transcript_messages([m])[0])) if on_message else None
+    with stage_timer(f"debate_{wf.mode}"):
+        final_state = await wf.run(init_state, on_message=stream)
+    RUN_OUTCOMES.inc(path=PATH_DEBATE, status="decided")
 
     wf_messages = final_state.get("messages") or []
 
     # ---- Map to frontend shapes ----
     transcript_messages = _map_transcript_messages(wf_messages)
-    neighbor_items = _map_neighbors_for_frontend(neighbors)
-    retrieval_stats = _compute_retrieval_stats(applicant, neighbors, stats)
-
-    retrieval = {
-        "top_k": top_k,
-        "neighbors": neighbor_items,
-        "stats": retrieval_stats,
-    }
-
-    decision = _build_decision_payload(wf_messages, neighbor_items)
+    decision = {**_build_decision_payload(wf_messages, neighbor_items), "path": PATH_DEBATE}
 
     return {
         "messages": transcript_messages,
         "retrieval": retrieval,
         "decision": decision,
+        "path": PATH_DEBATE,
+        "triage": triage_result,
     }
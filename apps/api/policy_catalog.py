@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import threading
+import time
+
+from configs.settings import settings
+from core.metrics import cache_hit
+from core.supabase_client import supabase
+
+# In-process cache of the policy catalogue behind GET /policies and /policies/{id}.
+# Loaded at most once per POLICY_CATALOG_TTL_SECONDS (or after invalidate(), which
+# upload/embed jobs call), indexed by policy_id for O(1) lookups. Clause counts come
+# from the `policies.clauses_count` column maintained by the upload job, or — when
+# the `policies` table is absent — from a server-side aggregate:
+#
+#     create or replace function policy_chunk_counts()
+#     returns table(policy_name text, clauses_count bigint) language sql stable as $$
+#       select trim(policy_name), count(*) from policy_chunks
+#       where coalesce(trim(policy_name), '') <> ''
+#       group by trim(policy_name);
+#     $$;
+
+COUNTS_RPC = "policy_chunk_counts"
+_SCAN_PAGE_SIZE = 1000
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _chunk_counts() -> Dict[str, int]:
+    """policy_name -> number of chunks, aggregated in Postgres when the RPC is installed."""
+    try:
+        rows = supabase.rpc(COUNTS_RPC, {}).execute().data or []
+        return {r["policy_name"].strip(): int(r["clauses_count"]) for r in rows if (r.get("policy_name") or "").strip()}
+    except Exception:
+        print(f"RPC {COUNTS_RPC} unavailable; counting policy_chunks client-side")
+
+    # last resort: keyset scan of just (id, policy_name), amortized by the cache TTL
+    counts: Dict[str, int] = {}
+    last_id = None
+    while True:
+        q = supabase.table("policy_chunks").select("id,policy_name")
+        if last_id is not None:
+            q = q.gt("id", last_id)
+        rows = q.order("id").limit(_SCAN_PAGE_SIZE).execute().data or []
+        for r in rows:
+            pn = (r.get("policy_name") or "").strip()
+            if pn:
+                counts[pn] = counts.get(pn, 0) + 1
+        if len(rows) < _SCAN_PAGE_SIZE:
+            return counts
+        last_id = rows[-1]["id"]
+
+
+def _from_chunks() -> List[Dict[str, Any]]:
+    """If a `policies` table is not present, derive the catalogue from policy_chunks."""
+    try:
+        counts = _chunk_counts()
+    except Exception:
+        return []
+
+    now = _now()
+    return [
+        {
+            "policy_id": pn,
+            "name": pn,
+            "document_type": "eligibility",
+            "filename": "",
+            "version": "v1.0",
+            "uploaded_at": now,
+            "clauses_count": n,
+            "status": "active",
+        }
+        for pn, n in sorted(counts.items(), key=lambda x: x[0].lower())
+    ]
+
+
+class PolicyCatalog:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._items: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._has_table = True
+        self._loaded_at: Optional[float] = None
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _load(self):
+        # Preferred: Supabase `policies` table
+        try:
+            items = supabase.table("policies").select("*").execute().data or []
+            has_table = True
+        except Exception:
+            items = _from_chunks()
+            has_table = False
+        self._items = items
+        self._by_id = {p.get("policy_id"): p for p in items}
+        self._has_table = has_table
+        self._loaded_at = time.monotonic()
+
+    def _ensure(self):
+        if self._fresh():
+            cache_hit("policy_catalog")
+            return
+        with self._lock:
+            if not self._fresh():
+                cache_hit("policy_catalog", hit=False)
+                self._load()
+
+    def items(self) -> List[Dict[str, Any]]:
+        self._ensure()
+        return list(self._items)
+
+    def get(self, policy_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure()
+        policy = self._by_id.get(policy_id)
+        if policy is not None or not self._has_table:
+            return policy
+        # cache miss on a live table (e.g. written by another worker): one indexed lookup
+        try:
+            rows = supabase.table("policies").select("*").eq("policy_id", policy_id).execute().data
+        except Exception:
+            return None
+        return rows[0] if rows else None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+policy_catalog = PolicyCatalog(settings.POLICY_CATALOG_TTL_SECONDS)
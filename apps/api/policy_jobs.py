@@ -0,0 +1,42 @@
+from typing import Dict, Any, Optional
+from datetime import datetime
+import threading
+import uuid
+
+# In-memory store for background policy ingestion jobs (same idea as run_store).
+JOBS: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
+
+def create_job(policy_id: str, policy_name: str) -> str:
+    job_id = f"job_{uuid.uuid4().hex[:10]}"
+    now = _now()
+    with _LOCK:
+        JOBS[job_id] = {
+            "job_id": job_id,
+            "policy_id": policy_id,
+            "policy_name": policy_name,
+            "status": "queued",
+            "stage": "queued",
+            "chunks_done": 0,
+            "chunks_total": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+    return job_id
+
+def update_job(job_id: str, **fields: Any):
+    with _LOCK:
+        job = JOBS.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        job["updated_at"] = _now()
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _LOCK:
+        job = JOBS.get(job_id)
+        return dict(job) if job else None
@@ -0,0 +1,36 @@
+import time
+
+from core.metrics import HTTP_REQUEST_SECONDS
+
+# Pure ASGI middleware (no BaseHTTPMiddleware task/stream wrapping): records
+# http_request_duration_seconds labelled by the matched route *template*
+# ("/api/v1/cases/{case_id}"), so case ids never become label values.
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - t0,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", None) or "unmatched",
+                status=str(status["code"]),
+            )
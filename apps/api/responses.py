@@ -0,0 +1,35 @@
+from typing import Any, Iterable, Optional
+import hashlib
+
+from fastapi.responses import JSONResponse
+
+# orjson is optional: it is several times faster than the stdlib encoder on the
+# large case payloads (neighbors + transcript), but the API works without it.
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates: Iterable[str] = (t.strip() for t in if_none_match.split(","))
+    for tag in candidates:
+        if tag == "*" or tag == etag or tag.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
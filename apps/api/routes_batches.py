@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Literal, Optional
+
+from fastapi import APIRouter, BackgroundTasks, File, HTTPException, Query, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from apps.api.batch_runner import detect_format, run_batch
+from apps.api.batch_store import create_batch, get_batch, get_items, request_cancel
+from configs.settings import settings
+
+router = APIRouter(prefix="/batches", tags=["batches"])
+
+
+async def _spool_batch(file: UploadFile) -> str:
+    """Streams the upload into a temp file (enforcing BATCH_MAX_BYTES); caller removes it."""
+    fd, path = tempfile.mkstemp(prefix="batch_")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.BATCH_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Batch exceeds limit of {settings.BATCH_MAX_BYTES} bytes")
+                await run_in_threadpool(out.write, chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+@router.post("", status_code=202)
+async def create_batch_endpoint(
+    background: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    top_k: int = Query(8, ge=1, le=50),
+    mode: Literal["standard", "adversarial", "fast"] = "standard",
+    rounds: Optional[int] = Query(None, ge=1, le=6),
+    triage: Optional[bool] = None,
+    concurrency: Optional[int] = Query(None, ge=1),
+):
+    """
+    Bulk import: one applicant per CSV row (header = applicant fields) or NDJSON line.
+    Creates a case per row and decides them in the background; returns batch_id immediately.
+    """
+    fmt = detect_format(file.filename or "", file.content_type, format)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unsupported batch format. Upload .csv or .ndjson/.jsonl (or pass ?format=).")
+
+    path = await _spool_batch(file)
+    params = {
+        "format": fmt,
+        "filename": file.filename,
+        "top_k": top_k,
+        "mode": mode,
+        "rounds": rounds,
+        "triage": triage,
+        "concurrency": min(concurrency or settings.BATCH_DEBATE_CONCURRENCY, settings.BATCH_MAX_DEBATE_CONCURRENCY),
+    }
+    batch_id = create_batch(params)
+    background.add_task(run_batch, batch_id, path, fmt, params)
+    return {"batch_id": batch_id, "status": "queued"}
+
+
+@router.get("/{batch_id}")
+def get_batch_endpoint(batch_id: str):
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+
+@router.get("/{batch_id}/results")
+def get_batch_results(
+    batch_id: str,
+    status: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Per-row results so far (partial while the batch is running)."""
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    total, items = get_items(batch_id, offset=offset, limit=limit, status=status)
+    return {"batch_id": batch_id, "status": batch["status"], "items": items, "total": total}
+
+
+@router.post("/{batch_id}/cancel")
+def cancel_batch(batch_id: str):
+    """Stops scheduling new rows; debates already in flight finish and are kept."""
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch["status"] in ("done", "failed", "cancelled"):
+        return {"batch_id": batch_id, "status": batch["status"]}
+    request_cancel(batch_id)
+    return {"batch_id": batch_id, "status": "cancelling"}
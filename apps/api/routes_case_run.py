@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
 
 from datetime import datetime
 
+from core.metrics import RUN_OUTCOMES, RUNS_IN_FLIGHT, RUNS_QUEUED
+
 # import your pipeline runner (you already have something like workflow runner)
 # example:
 # from workflow.runner import run_full_pipeline_for_case
@@ -18,21 +20,22 @@ def _now() -> str:
 
 class StartRunRequest(BaseModel):
     top_k: Optional[int] = 8
-    mode: Optional[str] = "standard"
-
-@router.post("/cases/{case_id}/run")
-async def start_run(case_id: str, payload: StartRunRequest, background: BackgroundTasks):
-    """
-    Starts the debate pipeline in the background and returns run_id immediately.
-    """
+    # "standard": sequential debate; "fast": parallel openings straight to the judge
+    # ("adversarial" is accepted as an alias of "standard")
+    mode: Literal["standard", "adversarial", "fast"] = "standard"
+    # standard mode only: risk/advocate exchanges before the verdict (default 2)
+    rounds: Optional[int] = Field(default=None, ge=1, le=6)
+    # None: settings.TRIAGE_ENABLED decides; False: always run the full debate
+    triage: Optional[bool] = None
+
+def begin_run(case_id: str) -> str:
+    """Creates a run for the case and marks both as running; returns run_id."""
     # 1) create a run_id (you probably already have run store logic)
     import uuid
     run_id = f"run_{uuid.uuid4().hex[:10]}"
 
     # 1b) attach run to the case so the frontend can start polling
     from apps.api.routes_cases import CASES, RUNS_BY_CASE
-    if case_id not in CASES:
-        raise HTTPException(status_code=404, detail="Case not found")
 
     now = _now()
     CASES[case_id]["debate"] = {
@@ -46,97 +49,150 @@ async def start_run(case_id: str, payload: StartRunRequest, background: Backgrou
     CASES[case_id]["updated_at"] = now
     RUNS_BY_CASE[case_id] = run_id
 
+    from apps.api.dashboard_store import track_case
+    track_case(CASES[case_id])
+
     # 2) mark run as running in your in-memory store (or DB)
-    # IMPORTANT: you must implement these 2 funcs in routes_runs or a shared store:
-    from apps.api.run_store import set_run_status  # you create this tiny file (below)
+    from apps.api.run_store import set_run_status
     set_run_status(run_id, case_id, status="running", stage="opening", progress=10)
+    return run_id
+
+@router.post("/cases/{case_id}/run")
+async def start_run(case_id: str, payload: StartRunRequest, background: BackgroundTasks):
+    """
+    Starts the debate pipeline in the background and returns run_id immediately.
+    """
+    from apps.api.routes_cases import CASES
+    if case_id not in CASES:
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    run_id = begin_run(case_id)
 
     # 3) fire background job
-    background.add_task(_execute_pipeline, run_id, case_id, payload.top_k, payload.mode)
+    RUNS_QUEUED.inc(source="api")
+    background.add_task(_execute_pipeline, run_id, case_id, payload.top_k, payload.mode, payload.rounds, payload.triage)
 
     return {"run_id": run_id, "status": "running", "case_id": case_id}
 
-def _execute_pipeline(run_id: str, case_id: str, top_k: int, mode: str):
+def _execute_pipeline(
+    run_id: str,
+    case_id: str,
+    top_k: int,
+    mode: str,
+    rounds: Optional[int] = None,
+    use_triage: Optional[bool] = None,
+):
     """
     Runs the pipeline and updates run_store. Runs in background thread.
     """
-    from apps.api.run_store import (
-        set_run_status,
-        append_message,
-        set_run_decision,
-        set_run_retrieval,
-    )
+    from apps.api.run_store import set_run_status
 
+    RUNS_QUEUED.dec(source="api")
     try:
         # stage updates (optional)
         set_run_status(run_id, case_id, status="running", stage="opening", progress=20)
 
-        # ---- CALL YOUR EXISTING PIPELINE HERE ----
-        # You already have debate orchestration working in terminal.
-        # Wrap it into a function that returns:
-        # - transcript messages
-        # - retrieval summary
-        # - final decision
-        #
-        # Example signature:
-        # result = run_case_pipeline(case_id=case_id, top_k=top_k, mode=mode)
-
-        from apps.api.pipeline_adapter import run_case_pipeline  # you create this (below)
-        result = run_case_pipeline(case_id=case_id, top_k=top_k, mode=mode)
-
-        # result expected:
-        # {
-        #   "messages": [...],
-        #   "retrieval": {...},
-        #   "decision": {...},
-        # }
-
-        for msg in result.get("messages", []):
-            append_message(run_id, msg)
-
-        set_run_retrieval(run_id, result.get("retrieval"))
-        set_run_decision(run_id, result.get("decision"))
-
-        # Persist outputs onto the case object for the Case Detail page
-        from apps.api.routes_cases import CASES
-        if case_id in CASES:
-            now = _now()
-            CASES[case_id]["retrieval"] = result.get("retrieval")
-            CASES[case_id]["decision"] = result.get("decision")
-            CASES[case_id]["status"] = "decided"
-            CASES[case_id]["updated_at"] = now
-
-            debate = CASES[case_id].get("debate") or {}
-            debate.update({
-                "run_id": run_id,
-                "stage": "done",
-                "messages": result.get("messages", []),
-                "updated_at": now,
-            })
-            CASES[case_id]["debate"] = debate
-
-        set_run_status(run_id, case_id, status="decided", stage="done", progress=100)
+        from apps.api.pipeline_adapter import run_case_pipeline
+        with RUNS_IN_FLIGHT.track(source="api"):
+            result = run_case_pipeline(
+                case_id=case_id, top_k=top_k, mode=mode, rounds=rounds, use_triage=use_triage,
+                on_message=message_streamer(run_id, case_id),
+            )
+        record_run_result(run_id, case_id, result)
 
     except Exception as e:
-        set_run_status(run_id, case_id, status="failed", stage="done", progress=100)
-        append_message(run_id, {
-            "role": "MODERATOR",
-            "content": f"Run failed: {e}",
-            "timestamp": __import__("datetime").datetime.utcnow().isoformat() + "Z",
+        record_run_failure(run_id, case_id, e)
+
+def message_streamer(run_id: str, case_id: str):
+    """on_message callback: publishes each debate message (and its stage) to the run as it lands."""
+    from apps.api.run_store import append_message, get_run
+
+    def on_message(msg: Dict[str, Any]):
+        seq = append_message(run_id, msg, stage=msg.get("stage"))
+        run = get_run(run_id)
+        if run is not None:
+            run["progress"] = min(90, 20 + 10 * seq)
+
+    return on_message
+
+def record_run_result(run_id: str, case_id: str, result: Dict[str, Any]):
+    """
+    Stores a pipeline result on the run and the case.
+
+    result expected:
+    {
+      "messages": [...],
+      "retrieval": {...},
+      "decision": {...},
+      "path": "triage" | "debate",
+      "triage": {...},
+    }
+    """
+    from apps.api.run_store import (
+        set_run_status,
+        sync_messages,
+        set_run_decision,
+        set_run_retrieval,
+        set_run_path,
+    )
+
+    # messages streamed during the debate are already stored; add the rest
+    sync_messages(run_id, result.get("messages", []))
+
+    set_run_path(run_id, result.get("path"), result.get("triage"))
+    set_run_retrieval(run_id, result.get("retrieval"))
+    set_run_decision(run_id, result.get("decision"))
+
+    # Persist outputs onto the case object for the Case Detail page
+    from apps.api.routes_cases import CASES
+    if case_id in CASES:
+        now = _now()
+        CASES[case_id]["retrieval"] = result.get("retrieval")
+        CASES[case_id]["decision"] = result.get("decision")
+        CASES[case_id]["status"] = "decided"
+        CASES[case_id]["updated_at"] = now
+        CASES[case_id]["decided_at"] = now
+
+        debate = CASES[case_id].get("debate") or {}
+        debate.update({
+            "run_id": run_id,
+            "stage": "done",
+            "messages": result.get("messages", []),
+            "updated_at": now,
+        })
+        CASES[case_id]["debate"] = debate
+
+        from apps.api.dashboard_store import track_case
+        track_case(CASES[case_id])
+
+    set_run_status(run_id, case_id, status="decided", stage="done", progress=100)
+
+def record_run_failure(run_id: str, case_id: str, error: Exception):
+    from apps.api.run_store import set_run_status
+
+    RUN_OUTCOMES.inc(path="unknown", status="failed")
+    # status and error message in one update: a client that stops at the terminal status has both
+    set_run_status(run_id, case_id, status="failed", stage="done", progress=100, message={
+        "role": "MODERATOR",
+        "content": f"Run failed: {error}",
+        "timestamp": _now(),
+        "stage": "done",
+    })
+
+    # Reflect failure on the case too
+    from apps.api.routes_cases import CASES
+    if case_id in CASES:
+        now = _now()
+        CASES[case_id]["status"] = "failed"
+        CASES[case_id]["updated_at"] = now
+
+        debate = CASES[case_id].get("debate") or {}
+        debate.update({
+            "run_id": run_id,
             "stage": "done",
+            "updated_at": now,
         })
+        CASES[case_id]["debate"] = debate
 
-        # Reflect failure on the case too
-        from apps.api.routes_cases import CASES
-        if case_id in CASES:
-            now = _now()
-            CASES[case_id]["status"] = "failed"
-            CASES[case_id]["updated_at"] = now
-
-            debate = CASES[case_id].get("debate") or {}
-            debate.update({
-                "run_id": run_id,
-                "stage": "done",
-                "updated_at": now,
-            })
-            CASES[case_id]["debate"] = debate
+        from apps.api.dashboard_store import track_case
+        track_case(CASES[case_id])
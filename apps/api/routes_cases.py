@@ -1,8 +1,14 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Response
+from fastapi.responses import FileResponse
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 import uuid
 
+from apps.api.dashboard_store import track_case
+from apps.api.responses import FastJSONResponse, etag_matches, make_etag
+from apps.api.document_store import UploadTooLarge, document_path, has_document, store_upload
+from configs.settings import settings
+
 router = APIRouter( tags=["cases"])
 
 # -------- In-memory store (MVP) --------
@@ -10,6 +16,8 @@ CASES: Dict[str, Dict[str, Any]] = {}
 DOCUMENTS: Dict[str, List[Dict[str, Any]]] = {}
 AUDIT: Dict[str, List[Dict[str, Any]]] = {}
 RUNS_BY_CASE: Dict[str, str] = {}
+# bytes of uploads still streaming, per case (counted against MAX_CASE_DOCUMENT_BYTES)
+_UPLOADS_RESERVED: Dict[str, int] = {}
 
 def _now() -> str:
     return datetime.utcnow().isoformat() + "Z"
@@ -23,6 +31,11 @@ def _audit(case_id: str, event_type: str, metadata: Dict[str, Any]):
         "metadata": metadata or {},
     })
 
+CASE_FIELDS = (
+    "case_id", "status", "created_at", "updated_at", "applicant", "documents",
+    "retrieval", "debate", "decision", "fraud_signals", "error",
+)
+
 def _case_shape(case_id: str) -> Dict[str, Any]:
     c = CASES[case_id]
     return {
@@ -36,10 +49,56 @@ def _case_shape(case_id: str) -> Dict[str, Any]:
         "debate": c.get("debate"),
         "decision": c.get("decision"),
         "fraud_signals": c.get("fraud_signals"),
+        "error": c.get("error"),
     }
 
-@router.post("/cases")
-def create_case(payload: Dict[str, Any] = {}):
+def _case_summary(case_id: str) -> Dict[str, Any]:
+    """Lightweight shape for lists/polls: no neighbor payloads, no transcript."""
+    c = CASES[case_id]
+    retrieval = c.get("retrieval")
+    debate = c.get("debate")
+    decision = c.get("decision")
+    return {
+        "case_id": c["case_id"],
+        "status": c["status"],
+        "created_at": c["created_at"],
+        "updated_at": c["updated_at"],
+        "applicant": c.get("applicant"),
+        "documents": DOCUMENTS.get(case_id, []),
+        "retrieval": {"top_k": retrieval.get("top_k"), "stats": retrieval.get("stats")} if retrieval else None,
+        "debate": {k: debate.get(k) for k in ("run_id", "stage", "started_at", "updated_at")} if debate else None,
+        "decision": {"verdict": decision.get("verdict"), "confidence": decision.get("confidence")} if decision else None,
+        "fraud_signals": c.get("fraud_signals"),
+        "error": c.get("error"),
+    }
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in CASE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+def _check_view(view: str):
+    if view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be 'summary' or 'full'")
+
+def _project(case_id: str, view: str = "full", fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """view=summary|full, optionally narrowed to `fields` (case_id is always kept)."""
+    shaped = _case_summary(case_id) if view == "summary" else _case_shape(case_id)
+    if fields:
+        shaped = {k: shaped[k] for k in CASE_FIELDS if k == "case_id" or k in fields}
+    return shaped
+
+def _case_etag(case_id: str, view: str, fields: Optional[List[str]]) -> str:
+    c = CASES[case_id]
+    fraud_at = (c.get("fraud_signals") or {}).get("computed_at")
+    return make_etag(case_id, c["updated_at"], fraud_at, view, ",".join(fields or []))
+
+def new_case(applicant: Optional[Dict[str, Any]], source: str = "api", **extra: Any) -> str:
+    """Creates a draft case (also used by bulk batch imports); returns case_id."""
     case_id = f"case_{uuid.uuid4().hex[:8]}"
     now = _now()
     CASES[case_id] = {
@@ -47,19 +106,43 @@ def create_case(payload: Dict[str, Any] = {}):
         "status": "draft",
         "created_at": now,
         "updated_at": now,
-        "applicant": payload.get("applicant"),
+        "applicant": applicant,
         "documents": [],
         "retrieval": None,
         "debate": None,
         "decision": None,
         "fraud_signals": None,
+        **extra,
     }
     DOCUMENTS[case_id] = []
-    _audit(case_id, "created_case", {"source": "api"})
+    track_case(CASES[case_id])
+    _audit(case_id, "created_case", {"source": source, **extra})
+    return case_id
+
+def fail_case(case_id: str, error: str):
+    """Marks a case failed outside a run (e.g. its batch chunk could not be scored)."""
+    if case_id not in CASES:
+        return
+    CASES[case_id].update({"status": "failed", "error": error, "updated_at": _now()})
+    track_case(CASES[case_id])
+    _audit(case_id, "failed", {"error": error})
+
+@router.post("/cases")
+def create_case(payload: Dict[str, Any] = {}):
+    case_id = new_case(payload.get("applicant"))
     return {"case": _case_shape(case_id)}
 
 @router.get("/cases")
-def list_cases(query: Optional[str] = None, status: Optional[str] = None, limit: int = 20, offset: int = 0):
+def list_cases(
+    query: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    view: str = "full",
+    fields: Optional[str] = None,
+):
+    _check_view(view)
+    wanted = _parse_fields(fields)
     items = list(CASES.values())
 
     if query:
@@ -77,13 +160,24 @@ def list_cases(query: Optional[str] = None, status: Optional[str] = None, limit:
 
     total = len(items)
     items = items[offset: offset + limit]
-    return {"items": [_case_shape(c["case_id"]) for c in items], "total": total}
+    # Returned as a Response directly: skips FastAPI's jsonable_encoder walk over the payload.
+    return FastJSONResponse({"items": [_project(c["case_id"], view, wanted) for c in items], "total": total})
 
 @router.get("/cases/{case_id}")
-def get_case(case_id: str):
+def get_case(
+    case_id: str,
+    view: str = "full",
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+):
     if case_id not in CASES:
         raise HTTPException(status_code=404, detail="Case not found")
-    return {"case": _case_shape(case_id)}
+    _check_view(view)
+    wanted = _parse_fields(fields)
+    etag = _case_etag(case_id, view, wanted)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return FastJSONResponse({"case": _project(case_id, view, wanted)}, headers={"ETag": etag})
 
 @router.patch("/cases/{case_id}/applicant")
 def update_applicant(case_id: str, payload: Dict[str, Any]):
@@ -98,6 +192,7 @@ def update_applicant(case_id: str, payload: Dict[str, Any]):
 
     # auto status
     CASES[case_id]["status"] = "ready"
+    track_case(CASES[case_id])
 
     _audit(case_id, "updated_applicant", {"fields": list(payload.keys())})
     return {"case": _case_shape(case_id)}
@@ -107,7 +202,40 @@ async def upload_document(case_id: str, file: UploadFile = File(...)):
     if case_id not in CASES:
         raise HTTPException(status_code=404, detail="Case not found")
 
-    content = await file.read()
+    def case_bytes() -> int:
+        stored = sum(int(d.get("size") or 0) for d in DOCUMENTS.get(case_id, []))
+        return stored + _UPLOADS_RESERVED.get(case_id, 0)
+
+    if case_bytes() >= settings.MAX_CASE_DOCUMENT_BYTES:
+        raise HTTPException(status_code=413, detail="Case document quota exceeded")
+
+    # Concurrent uploads to one case reserve their bytes chunk by chunk; check + reserve
+    # (and later doc append + release) run on the event loop with no await in between.
+    reserved = 0
+
+    def reserve(n: int) -> bool:
+        nonlocal reserved
+        if case_bytes() + n > settings.MAX_CASE_DOCUMENT_BYTES:
+            return False
+        _UPLOADS_RESERVED[case_id] = _UPLOADS_RESERVED.get(case_id, 0) + n
+        reserved += n
+        return True
+
+    try:
+        # Stream to the content-addressed store (never holds the whole file in memory)
+        stored = await store_upload(file, max_bytes=settings.MAX_DOCUMENT_BYTES, reserve=reserve)
+        doc = _add_document(case_id, file, stored)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        left = _UPLOADS_RESERVED.get(case_id, 0) - reserved
+        if left > 0:
+            _UPLOADS_RESERVED[case_id] = left
+        else:
+            _UPLOADS_RESERVED.pop(case_id, None)
+    return {"document": doc}
+
+def _add_document(case_id: str, file: UploadFile, stored: Dict[str, Any]) -> Dict[str, Any]:
     doc_id = f"doc_{uuid.uuid4().hex[:10]}"
     doc = {
         "document_id": doc_id,
@@ -117,12 +245,18 @@ async def upload_document(case_id: str, file: UploadFile = File(...)):
         "status": "uploaded",
         "extracted_fields": None,
         "created_at": _now(),
-        "size": len(content),
+        "size": stored["size"],
+        "sha256": stored["sha256"],
     }
     DOCUMENTS.setdefault(case_id, []).append(doc)
     CASES[case_id]["updated_at"] = _now()
-    _audit(case_id, "uploaded_docs", {"document_id": doc_id, "filename": file.filename})
-    return {"document": doc}
+    _audit(case_id, "uploaded_docs", {
+        "document_id": doc_id,
+        "filename": file.filename,
+        "sha256": stored["sha256"],
+        "deduplicated": stored["deduplicated"],
+    })
+    return doc
 
 @router.get("/cases/{case_id}/documents")
 def list_documents(case_id: str):
@@ -130,6 +264,15 @@ def list_documents(case_id: str):
         raise HTTPException(status_code=404, detail="Case not found")
     return {"items": DOCUMENTS.get(case_id, [])}
 
+@router.get("/cases/{case_id}/documents/{document_id}/content")
+def get_document_content(case_id: str, document_id: str):
+    if case_id not in CASES:
+        raise HTTPException(status_code=404, detail="Case not found")
+    for d in DOCUMENTS.get(case_id, []):
+        if d["document_id"] == document_id and d.get("sha256") and has_document(d["sha256"]):
+            return FileResponse(document_path(d["sha256"]), media_type=d["content_type"], filename=d["filename"])
+    raise HTTPException(status_code=404, detail="Document not found")
+
 @router.get("/cases/{case_id}/audit")
 def get_audit(case_id: str):
     if case_id not in CASES:
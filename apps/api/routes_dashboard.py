@@ -1,38 +1,34 @@
 from fastapi import APIRouter
 from apps.api.routes_cases import CASES
+from apps.api import dashboard_store
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/stats")
 def dashboard_stats():
-    items = list(CASES.values())
-    total = len(items)
-
-    approvals = 0
-    rejects = 0
-    manual_reviews = 0
-    draft = 0
-    running = 0
-
-    for c in items:
-        if c["status"] == "draft":
-            draft += 1
-        if c["status"] == "running":
-            running += 1
-        if c.get("decision"):
-            v = c["decision"].get("verdict")
-            if v == "approve":
-                approvals += 1
-            elif v == "reject":
-                rejects += 1
-            elif v == "manual_review":
-                manual_reviews += 1
+    # Served from incrementally maintained counters (see dashboard_store), no scan of CASES.
+    snap = dashboard_store.snapshot()
+    status_counts = snap["status_counts"]
+    verdict_counts = snap["verdict_counts"]
 
     return {
-        "total_cases": total,
-        "approvals": approvals,
-        "rejects": rejects,
-        "manual_reviews": manual_reviews,
-        "draft_cases": draft,
-        "running_cases": running,
+        "total_cases": snap["total_cases"],
+        "approvals": verdict_counts.get("approve", 0),
+        "rejects": verdict_counts.get("reject", 0),
+        "manual_reviews": verdict_counts.get("manual_review", 0),
+        "draft_cases": status_counts.get("draft", 0),
+        "running_cases": status_counts.get("running", 0),
+        # breakdowns
+        "status_counts": status_counts,
+        "verdict_counts": verdict_counts,
+        "confidence_histogram": snap["confidence_histogram"],
+        "by_loan_purpose": snap["by_loan_purpose"],
+        "by_grade_subgrade": snap["by_grade_subgrade"],
+        "throughput_hourly": snap["throughput_hourly"],
     }
+
+@router.post("/rebuild")
+def dashboard_rebuild():
+    """Recovery: recompute all dashboard aggregates from the case store."""
+    n = dashboard_store.rebuild(CASES)
+    return {"message": "Dashboard aggregates rebuilt", "cases": n}
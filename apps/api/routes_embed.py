@@ -1,9 +1,13 @@
 from fastapi import APIRouter
+from apps.api.policy_catalog import policy_catalog
+from apps.retrieval.policy_index import refresh_policy_index
 from ingestion.policies.embed_policies import embed_policies
 
 router = APIRouter(prefix="/policies", tags=["policies"])
 
 @router.post("/embed")
 def embed_policy_chunks():
-    embed_policies()
-    return {"message": "All policy chunks embedded"}
+    result = embed_policies()
+    refresh_policy_index()
+    policy_catalog.invalidate()
+    return {"message": "All policy chunks embedded", **result}
@@ -1,20 +1,24 @@
 from fastapi import APIRouter
-from configs.settings import settings
-from qdrant_client import QdrantClient
-from neo4j import GraphDatabase
+
+from apps.api.responses import FastJSONResponse
+from core.connections import connections
 
 router = APIRouter()
 
+# Probes reuse the pooled clients from core/connections.py and are cached for
+# HEALTH_CACHE_TTL_SECONDS, so frequent orchestrator polling stays cheap.
+
+def _respond(result):
+    return FastJSONResponse(result, status_code=200 if result["status"] == "ok" else 503)
+
 @router.get("/health/qdrant")
 def health_qdrant():
-    client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key or None) # type: ignore
-    info = client.get_collections()
-    return {"status": "ok", "collections_count": len(info.collections)}
+    return _respond(connections.probe_qdrant())
 
 @router.get("/health/neo4j")
 def health_neo4j():
-    driver = GraphDatabase.driver(settings.neo4j_uri, auth=(settings.neo4j_user, settings.neo4j_password)) # type: ignore
-    with driver.session() as session:
-        result = session.run("RETURN 1 AS ok").single()
-    driver.close()
-    return {"status": "ok", "neo4j_ok": result["ok"]} # type: ignore
+    return _respond(connections.probe_neo4j())
+
+@router.get("/health/supabase")
+def health_supabase():
+    return _respond(connections.probe_supabase())
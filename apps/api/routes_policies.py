@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import os
+import tempfile
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Dict
 
 from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
 
+from apps.api.policy_catalog import policy_catalog
+from apps.api.policy_jobs import create_job, get_job, update_job
+from apps.retrieval.policy_index import refresh_policy_index
+from configs.settings import settings
 from core.supabase_client import supabase
-from ingestion.policies.embed_policies import embed_policies
-from ingestion.policies.ingest_policies import ingest_policy
+from ingestion.policies.embed_policies import dedup_ratio, embed_policies
+from ingestion.policies.ingest_policies import ingest_policy, ingest_policy_file
 
 
 router = APIRouter(prefix="/policies", tags=["policies"])
@@ -34,33 +42,83 @@ def _try_update_policy_row(policy_id: str, updates: Dict[str, Any]) -> None:
         return
 
 
-def _count_policy_chunks_by_name(policy_name: str) -> int:
-    """Count chunks for a policy; falls back to fetching ids if count isn't supported."""
+def _try_delete_policy_chunks(policy_id: str) -> None:
+    """Removes the chunks a failed job already inserted (needs the policy_chunks.policy_id column)."""
     try:
-        # supabase-py doesn't consistently support exact count across versions.
-        rows = (
-            supabase.table("policy_chunks")
-            .select("id")
-            .eq("policy_name", policy_name)
-            .execute()
-            .data
-        )
-        return len(rows or [])
-    except Exception:
-        return 0
-
+        supabase.table("policy_chunks").delete().eq("policy_id", policy_id).execute()
+    except Exception as e:
+        # without policy_id the rows can't be told apart from other uploads of the same name: keep them
+        print(f"could not remove partial chunks of {policy_id}: {e}")
 
-def _ingest_and_embed_policy(policy_id: str, policy_name: str, bucket: str, filename: str) -> None:
-    """Background job: chunk policy and embed its chunks."""
-    # 1) chunk into policy_chunks
-    ingest_policy(bucket=bucket, file_name=filename, policy_name=policy_name, policy_id=policy_id)
 
-    # 2) embed only this policy's chunks
-    embed_policies(policy_name=policy_name)
+async def _spool_upload(file: UploadFile, suffix: str) -> str:
+    """Streams the upload into a temp file (enforcing MAX_POLICY_BYTES); the caller owns (and removes) the path."""
+    fd, path = tempfile.mkstemp(prefix="policy_", suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.MAX_POLICY_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Policy exceeds limit of {settings.MAX_POLICY_BYTES} bytes")
+                await run_in_threadpool(out.write, chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def _ingest_policy_job(
+    job_id: str,
+    policy_id: str,
+    policy_name: str,
+    bucket: str,
+    filename: str,
+    local_path: str,
+    content_type: str,
+) -> None:
+    """Background job: store original -> chunk -> embed -> insert, from the spooled upload."""
+    try:
+        update_job(job_id, status="running", stage="storing")
+        supabase.storage.from_(bucket).upload(filename, local_path, {"content-type": content_type})
+
+        update_job(job_id, stage="ingesting")
+        started = time.perf_counter()
+        embed_stats: Dict[str, int] = {}
+        clauses_count = ingest_policy_file(
+            local_path,
+            policy_name,
+            policy_id=policy_id,
+            embed=True,
+            progress=lambda done, total: update_job(job_id, chunks_done=done, chunks_total=total),
+            stats=embed_stats,
+        )
 
-    # 3) update clauses_count (best-effort)
-    clauses_count = _count_policy_chunks_by_name(policy_name)
-    _try_update_policy_row(policy_id, {"clauses_count": clauses_count})
+        # clauses_count is known from the job itself, no need to count rows again
+        _try_update_policy_row(policy_id, {"clauses_count": clauses_count})
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        update_job(
+            job_id,
+            status="done",
+            stage="done",
+            chunks_done=clauses_count,
+            chunks_total=clauses_count,
+            chunks_per_sec=round(clauses_count / elapsed, 1),
+            dedup_ratio=round(dedup_ratio(embed_stats), 4),
+        )
+        refresh_policy_index()
+    except Exception as e:
+        # don't leave an "active" policy with 0 clauses and half of its chunks behind
+        _try_delete_policy_chunks(policy_id)
+        _try_update_policy_row(policy_id, {"status": "failed"})
+        update_job(job_id, status="failed", stage="done", error=str(e))
+    finally:
+        policy_catalog.invalidate()
+        if os.path.exists(local_path):
+            os.remove(local_path)
 
 @router.post("/upload")
 async def upload_policy(
@@ -82,13 +140,7 @@ async def upload_policy(
 
     policy_id = f"policy_{uuid.uuid4().hex[:12]}"
     filename = f"{policy_id}_{uuid.uuid4().hex[:8]}_{file.filename}"
-    content = await file.read()
-
-    supabase.storage.from_(bucket).upload(
-        filename,
-        content,
-        {"content-type": file.content_type},
-    )
+    local_path = await _spool_upload(file, suffix=f".{ext}")
 
     policy_name = (name or file.filename).strip()
     now = _now()
@@ -106,24 +158,32 @@ async def upload_policy(
 
     # Persist metadata if the table exists
     _try_insert_policy_row(policy_row)
+    policy_catalog.invalidate()
+
+    # Storage upload + chunk/embed/insert run as one background job from the spooled file;
+    # poll GET /policies/jobs/{job_id} for progress.
+    job_id = create_job(policy_id, policy_name)
+    background.add_task(
+        _ingest_policy_job,
+        job_id,
+        policy_id,
+        policy_name,
+        bucket,
+        filename,
+        local_path,
+        file.content_type or "application/octet-stream",
+    )
 
-    # Ingest chunks synchronously so GET /policies can show it immediately
-    # (even when we are falling back to aggregating from policy_chunks).
-    try:
-        ingest_policy(bucket=bucket, file_name=filename, policy_name=policy_name, policy_id=policy_id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Policy ingestion failed: {e}")
-
-    # Embed in background (can be slower)
-    background.add_task(embed_policies, policy_name)
+    # Frontend expects a raw Policy object
+    return {**policy_row, "job_id": job_id}
 
-    # Update clauses_count best-effort
-    clauses_count = _count_policy_chunks_by_name(policy_name)
-    _try_update_policy_row(policy_id, {"clauses_count": clauses_count})
-    policy_row["clauses_count"] = clauses_count
 
-    # Frontend expects a raw Policy object
-    return policy_row
+@router.get("/jobs/{job_id}")
+def get_policy_job(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 @router.post("/ingest")
@@ -140,6 +200,7 @@ def ingest_policy_endpoint(payload: dict):
         file_name=payload["file_name"],
         policy_name=payload["policy_name"],
     )
+    policy_catalog.invalidate()
 
     return {
         "message": "Policy ingested and chunked",
@@ -149,7 +210,10 @@ def ingest_policy_endpoint(payload: dict):
 
 @router.post("/embed")
 def embed_policy_chunks():
-    embed_policies()
+    result = embed_policies()
+    refresh_policy_index()
+    policy_catalog.invalidate()
     return {
-        "message": "All policy chunks embedded"
+        "message": "All policy chunks embedded",
+        **result,
     }
\ No newline at end of file
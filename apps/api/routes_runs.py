@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException
-from apps.api.run_store import get_run
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from apps.api.run_store import get_run, get_transcript, wait_for_transcript
+from configs.settings import settings
 
 router = APIRouter(tags=["runs"])
 
@@ -14,18 +17,26 @@ def run_status(run_id: str):
         "status": run["status"],
         "stage": run["stage"],
         "progress": run["progress"],
+        "path": run.get("path"),   # "triage" | "debate" (null until decided)
     }
 
 @router.get("/runs/{run_id}/transcript")
-def run_transcript(run_id: str):
-    run = get_run(run_id)
-    if not run:
+async def run_transcript(
+    run_id: str,
+    since: Optional[int] = Query(default=None, ge=0, description="return only messages with seq > since"),
+    wait: float = Query(default=0.0, ge=0, description="long-poll: hold up to this many seconds for news"),
+):
+    """
+    Without params: the whole transcript (messages carry `seq`, 1-based).
+    ?since=<last_seq>: only newer messages. &wait=<s>: if there is nothing newer yet,
+    park until a message arrives, the stage changes or the run finishes (capped at
+    TRANSCRIPT_MAX_WAIT_SECONDS); an empty `messages` list means the wait timed out.
+    """
+    if get_run(run_id) is None:
         raise HTTPException(status_code=404, detail="Run not found")
-    return {
-        "messages": run.get("messages", []),
-        "stage": run.get("stage", "opening"),
-        "updated_at": run.get("updated_at"),
-    }
+    if wait > 0:
+        await wait_for_transcript(run_id, since or 0, min(wait, settings.TRANSCRIPT_MAX_WAIT_SECONDS))
+    return get_transcript(run_id, since)
 
 @router.get("/runs/{run_id}/decision")
 def run_decision(run_id: str):
@@ -37,4 +48,6 @@ def run_decision(run_id: str):
     return {
         "decision": run["decision"],
         "retrieval": run["retrieval"],
+        "path": run.get("path"),
+        "triage": run.get("triage"),
     }
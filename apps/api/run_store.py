@@ -1,37 +1,156 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import threading
 
 RUNS: Dict[str, Dict[str, Any]] = {}
 
+# Writers run in pipeline threads, readers in request handlers. Every mutation
+# happens under _LOCK and wakes the long-poll waiters parked on that run
+# (asyncio futures resolved via their own loop, so a waiting request holds no thread).
+_LOCK = threading.RLock()
+_WAITERS: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+
+TERMINAL_STATUSES = ("decided", "failed")
+
 def _now():
     return datetime.utcnow().isoformat() + "Z"
 
-def set_run_status(run_id: str, case_id: str, status: str, stage: str, progress: int):
-    run = RUNS.setdefault(run_id, {
-        "run_id": run_id,
-        "case_id": case_id,
-        "status": status,
-        "stage": stage,
-        "progress": progress,
-        "messages": [],
-        "retrieval": None,
-        "decision": None,
-        "updated_at": _now(),
-    })
-    run.update({"status": status, "stage": stage, "progress": progress, "updated_at": _now()})
-
-def append_message(run_id: str, message: Dict[str, Any]):
-    run = RUNS.setdefault(run_id, {"messages": []})
-    run.setdefault("messages", []).append(message)
-    run["updated_at"] = _now()
+def _wake(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
+
+def _notify(run_id: str):
+    # caller holds _LOCK
+    for loop, fut in _WAITERS.pop(run_id, []):
+        try:
+            loop.call_soon_threadsafe(_wake, fut)
+        except RuntimeError:
+            pass  # loop already closed (client went away with its worker)
+
+def _append(run: Dict[str, Any], message: Dict[str, Any]) -> int:
+    # caller holds _LOCK
+    msgs = run.setdefault("messages", [])
+    msgs.append({**message, "seq": len(msgs) + 1})
+    return len(msgs)
+
+def set_run_status(
+    run_id: str, case_id: str, status: str, stage: str, progress: int, message: Optional[Dict[str, Any]] = None,
+):
+    """`message` is appended in the same update, so a poller that sees the status also gets it."""
+    with _LOCK:
+        run = RUNS.setdefault(run_id, {
+            "run_id": run_id,
+            "case_id": case_id,
+            "status": status,
+            "stage": stage,
+            "progress": progress,
+            "messages": [],
+            "retrieval": None,
+            "decision": None,
+            "path": None,      # "triage" | "debate" once the pipeline has decided
+            "triage": None,
+            "updated_at": _now(),
+        })
+        run.update({"status": status, "stage": stage, "progress": progress, "updated_at": _now()})
+        if message is not None:
+            _append(run, message)
+        _notify(run_id)
+
+def append_message(run_id: str, message: Dict[str, Any], stage: Optional[str] = None) -> int:
+    """
+    Appends with a per-run sequence number (1-based, the message's position) and
+    returns it. `stage` moves the run to that stage in the same update (one wake-up).
+    """
+    with _LOCK:
+        run = RUNS.setdefault(run_id, {"messages": []})
+        seq = _append(run, message)
+        if stage:
+            run["stage"] = stage
+        run["updated_at"] = _now()
+        _notify(run_id)
+        return seq
+
+def sync_messages(run_id: str, messages: List[Dict[str, Any]]):
+    """Appends the tail of `messages` not stored yet (the prefix was streamed during the run)."""
+    with _LOCK:
+        have = len((RUNS.get(run_id) or {}).get("messages") or [])
+        for msg in messages[have:]:
+            append_message(run_id, msg)
 
 def set_run_retrieval(run_id: str, retrieval: Any):
-    RUNS.setdefault(run_id, {})["retrieval"] = retrieval
-    RUNS[run_id]["updated_at"] = _now()
+    with _LOCK:
+        RUNS.setdefault(run_id, {})["retrieval"] = retrieval
+        RUNS[run_id]["updated_at"] = _now()
 
 def set_run_decision(run_id: str, decision: Any):
-    RUNS.setdefault(run_id, {})["decision"] = decision
-    RUNS[run_id]["updated_at"] = _now()
+    with _LOCK:
+        RUNS.setdefault(run_id, {})["decision"] = decision
+        RUNS[run_id]["updated_at"] = _now()
+
+def set_run_path(run_id: str, path: Optional[str], triage: Any):
+    with _LOCK:
+        run = RUNS.setdefault(run_id, {})
+        run["path"] = path
+        run["triage"] = triage
+        run["updated_at"] = _now()
 
 def get_run(run_id: str) -> Optional[Dict[str, Any]]:
     return RUNS.get(run_id)
+
+def get_transcript(run_id: str, since: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Messages with seq > since (all when since is None) plus the run's stage/status."""
+    with _LOCK:
+        run = RUNS.get(run_id)
+        if run is None:
+            return None
+        msgs = run.get("messages") or []
+        return {
+            "messages": list(msgs[since:]) if since else list(msgs),
+            "since": since,
+            "last_seq": len(msgs),
+            "stage": run.get("stage", "opening"),
+            "status": run.get("status"),
+            "updated_at": run.get("updated_at"),
+        }
+
+async def wait_for_transcript(run_id: str, since: int, timeout: float):
+    """
+    Long-poll: returns once the run has a message with seq > since, its stage changes
+    from what it is now, it is finished, or `timeout` seconds pass.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    with _LOCK:
+        run = RUNS.get(run_id)
+        stage = run.get("stage") if run else None
+
+    while True:
+        with _LOCK:
+            run = RUNS.get(run_id)
+            if (
+                run is None
+                or len(run.get("messages") or []) > since
+                or run.get("stage") != stage
+                or run.get("status") in TERMINAL_STATUSES
+            ):
+                return
+            fut = loop.create_future()
+            waiter = (loop, fut)
+            _WAITERS.setdefault(run_id, []).append(waiter)
+
+        remaining = deadline - loop.time()
+        try:
+            if remaining <= 0:
+                return
+            await asyncio.wait_for(fut, remaining)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            # timed out or the client disconnected: drop the parked waiter
+            with _LOCK:
+                waiters = _WAITERS.get(run_id)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        _WAITERS.pop(run_id, None)
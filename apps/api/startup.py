@@ -0,0 +1,105 @@
+from typing import Any, Callable, Dict, List, Tuple
+from datetime import datetime
+import threading
+import time
+
+from configs.settings import settings
+
+# Startup warmup: heavy components (torch encoder, SentenceTransformer, policy index)
+# are imported lazily, so the process binds its port quickly; this phase loads them
+# in a background thread and /ready reports 503 until the critical ones are in place.
+
+STATE: Dict[str, Any] = {
+    "ready": False,
+    "warmup_enabled": settings.STARTUP_WARMUP,
+    "started_at": None,
+    "finished_at": None,
+    "steps": {},
+}
+_LOCK = threading.Lock()
+
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _warm_encoder():
+    from core.encoder_runtime import get_encoder_bundle
+
+    get_encoder_bundle().embed_one({})  # dummy forward pass (first call pays allocator setup)
+
+
+def _warm_embedding_model():
+    from core.model_registry import warmup
+
+    warmup()
+
+
+def _warm_policy_index():
+    from apps.retrieval.policy_index import policy_index
+
+    try:
+        policy_index.reload()
+    finally:
+        # judge retrieval falls back to the match_policy_chunks RPC while the index is cold
+        policy_index.start_polling(settings.POLICY_INDEX_POLL_SECONDS)
+
+
+def _steps() -> List[Tuple[str, Callable[[], None], bool]]:
+    """(name, fn, critical) — a failed critical step keeps /ready at 503."""
+    steps = [
+        ("encoder", _warm_encoder, True),
+        ("embedding_model", _warm_embedding_model, True),
+    ]
+    if settings.POLICY_INDEX_ENABLED:
+        steps.append(("policy_index", _warm_policy_index, False))
+    return steps
+
+
+def _set_step(name: str, **fields: Any):
+    with _LOCK:
+        STATE["steps"].setdefault(name, {}).update(fields)
+
+
+def run_warmup():
+    STATE["started_at"] = _now()
+    ok = True
+    for name, fn, critical in _steps():
+        _set_step(name, status="running", critical=critical)
+        t0 = time.perf_counter()
+        try:
+            fn()
+            _set_step(name, status="ok", seconds=round(time.perf_counter() - t0, 3))
+        except Exception as e:
+            print(f"warmup step {name} failed: {e}")
+            _set_step(name, status="failed", seconds=round(time.perf_counter() - t0, 3), error=str(e))
+            ok = ok and not critical
+    with _LOCK:
+        STATE["finished_at"] = _now()
+        STATE["ready"] = ok
+
+
+def start_warmup():
+    """Called from the app lifespan; returns immediately."""
+    if not settings.STARTUP_WARMUP:
+        # everything loads on first use instead; still keep the policy index behaviour
+        STATE["ready"] = True
+        if settings.POLICY_INDEX_ENABLED:
+            threading.Thread(target=_safe_index_load, name="policy-index-load", daemon=True).start()
+        return
+    threading.Thread(target=run_warmup, name="startup-warmup", daemon=True).start()
+
+
+def _safe_index_load():
+    try:
+        _warm_policy_index()
+    except Exception as e:
+        print(f"policy index load failed: {e}")
+
+
+def readiness() -> Dict[str, Any]:
+    with _LOCK:
+        return {
+            **{k: v for k, v in STATE.items() if k != "steps"},
+            "steps": {k: dict(v) for k, v in STATE["steps"].items()},
+        }
@@ -1,17 +1,77 @@
-from sentence_transformers import SentenceTransformer
-from core.supabase_client import supabase
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
-_model = None
+from apps.retrieval.policy_index import policy_index
+from configs.settings import settings
+from core.metrics import cache_hit, stage_timer
+from core.model_registry import get_sentence_model
+from core.supabase_client import supabase
 
 def _get_model():
-    global _model
-    if _model is None:
-        print("initializing model...")
-        _model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-    return _model
+    # shared with policy ingestion: one copy of the model per process
+    return get_sentence_model()
+
+def retrieve_policies(query_text: str, k: int = 5, min_similarity: float = 0.0):
+    model = _get_model()
+    with stage_timer("policy_encode"):
+        query_embedding = model.encode(query_text, normalize_embeddings=True)
+
+    # Local index answers with one matmul; the RPC is only the cold-start fallback.
+    if settings.POLICY_INDEX_ENABLED and policy_index.is_warm:
+        cache_hit("policy_index")
+        with stage_timer("policy_search_local"):
+            return policy_index.search(query_embedding, k=k, min_similarity=min_similarity)
+
+    cache_hit("policy_index", hit=False)
+    return _rpc_search(query_embedding.tolist(), k, min_similarity)
+
+def _rpc_search(query_embedding: List[float], k: int, min_similarity: float) -> List[Dict[str, Any]]:
+    with stage_timer("policy_search_rpc"):
+        res = supabase.rpc("match_policy_chunks", {"query_embedding": query_embedding, "match_count": k}).execute()
+    return [m for m in (res.data or []) if (m.get("similarity") or 0) >= min_similarity]
+
+def retrieve_policies_multi(
+    facets: Dict[str, str],
+    k: int = 10,
+    per_facet_k: int = 8,
+    min_similarity: float = 0.0,
+    rrf_k: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Multi-query retrieval: one short query per facet (kept under the model's 256
+    word-piece limit), encoded in a single batched call, searched together
+    (one matmul on the local index, concurrent RPCs otherwise), then fused with
+    reciprocal rank fusion and de-duplicated by chunk id.
+
+    Each match keeps its best `similarity` and lists the `facets` that retrieved it.
+    """
+    names = [n for n, q in facets.items() if (q or "").strip()]
+    if not names:
+        return []
 
-def retrieve_policies(query_text: str, k: int = 5):
     model = _get_model()
-    query_embedding = model.encode(query_text).tolist()
-    res = supabase.rpc("match_policy_chunks", {"query_embedding": query_embedding, "match_count": k}).execute()
-    return res.data or []
+    with stage_timer("policy_encode"):
+        vecs = model.encode([facets[n] for n in names], batch_size=len(names), normalize_embeddings=True)
+
+    if settings.POLICY_INDEX_ENABLED and policy_index.is_warm:
+        cache_hit("policy_index")
+        with stage_timer("policy_search_local"):
+            per_facet = policy_index.search_many(vecs, k=per_facet_k, min_similarity=min_similarity)
+    else:
+        cache_hit("policy_index", hit=False)
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            per_facet = list(pool.map(lambda v: _rpc_search(v.tolist(), per_facet_k, min_similarity), vecs))
+
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for name, matches in zip(names, per_facet):
+        for rank, m in enumerate(matches, 1):
+            key = m.get("id")
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**m, "rrf_score": 0.0, "facets": []}
+            entry["rrf_score"] += 1.0 / (rrf_k + rank)
+            entry["similarity"] = max(entry.get("similarity") or 0.0, m.get("similarity") or 0.0)
+            entry["facets"].append(name)
+
+    ranked = sorted(fused.values(), key=lambda m: (m["rrf_score"], m["similarity"]), reverse=True)
+    return ranked[:k]
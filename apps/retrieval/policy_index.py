@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# In-process policy vector index.
+# The policy corpus is small and changes rarely, so we keep every embedded
+# policy_chunks row in memory as one L2-normalized float32 matrix and answer
+# top-k queries with a single matmul instead of a match_policy_chunks RPC.
+#
+# Staleness is detected with a fingerprint of the embedded rows, which changes on any
+# insert, delete or re-embed (e.g. `embed_policies --all` from another process):
+#
+#     create or replace function policy_chunks_version()
+#     returns text language sql stable as $$
+#       select count(*)::text || ':' || coalesce(md5(string_agg(id::text || ':' || md5(embedding::text), ',' order by id)), '')
+#       from policy_chunks where embedding is not null;
+#     $$;
+#
+# Without it the index falls back to comparing the embedded-row count and the newest id,
+# which misses re-embeds and a delete + insert that keep the count.
+
+VERSION_RPC = "policy_chunks_version"
+_PAGE_SIZE = 1000
+_META_COLS = "id,policy_name,section,content"
+
+
+def _parse_vector(raw: Any) -> Optional[np.ndarray]:
+    # PostgREST returns pgvector columns as text ("[0.1,0.2,...]"); some setups return lists
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    vec = np.asarray(raw, dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else None
+
+
+class PolicyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()        # guards the arrays swapped in by loads
+        self._load_lock = threading.Lock()   # serializes reload/refresh
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._meta: List[Dict[str, Any]] = []
+        self._max_id: Optional[Any] = None
+        self._skipped = 0                    # fetched rows whose vector didn't parse (e.g. zero norm)
+        self._version: Optional[str] = None  # VERSION_RPC fingerprint the arrays were loaded at
+        self._version_rpc: Optional[bool] = None  # None = not probed yet; False once known missing
+        self.loaded_at: Optional[float] = None
+        self._poller: Optional[threading.Thread] = None
+
+    # ---------- state ----------
+    @property
+    def is_warm(self) -> bool:
+        return self.loaded_at is not None and len(self._meta) > 0
+
+    def size(self) -> int:
+        return len(self._meta)
+
+    def _seen(self) -> int:
+        # embedded rows the index has accounted for, indexed or skipped: what the remote count is compared to
+        return len(self._meta) + self._skipped
+
+    # ---------- loading ----------
+    def _fetch(self, after_id: Optional[Any]) -> List[Dict[str, Any]]:
+        from core.supabase_client import supabase
+
+        out: List[Dict[str, Any]] = []
+        last_id = after_id
+        while True:
+            q = supabase.table("policy_chunks").select(f"{_META_COLS},embedding").not_.is_("embedding", "null")
+            if last_id is not None:
+                q = q.gt("id", last_id)
+            rows = q.order("id").limit(_PAGE_SIZE).execute().data or []
+            out.extend(rows)
+            if len(rows) < _PAGE_SIZE:
+                return out
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def _to_arrays(rows: List[Dict[str, Any]]):
+        vecs, meta = [], []
+        for r in rows:
+            v = _parse_vector(r.get("embedding"))
+            if v is None:
+                continue
+            vecs.append(v)
+            meta.append({k: r.get(k) for k in ("id", "policy_name", "section", "content")})
+        matrix = np.vstack(vecs).astype(np.float32) if vecs else np.zeros((0, 0), dtype=np.float32)
+        return matrix, meta, len(rows) - len(meta)
+
+    def reload(self) -> int:
+        """Full (re)load of every embedded chunk."""
+        with self._load_lock:
+            # taken before the fetch: a write that lands mid-load shows up as a new version
+            version = self._remote_version()
+            rows = self._fetch(None)
+            matrix, meta, skipped = self._to_arrays(rows)
+            with self._lock:
+                self._matrix, self._meta = matrix, meta
+                self._max_id = rows[-1]["id"] if rows else None
+                self._skipped = skipped
+                self._version = version
+                self.loaded_at = time.time()
+        print(f"policy index loaded: {len(meta)} chunks" + (f" ({skipped} unusable vectors skipped)" if skipped else ""))
+        return len(meta)
+
+    def refresh(self) -> int:
+        """
+        Brings the index up to date after an ingestion / embedding job. With VERSION_RPC
+        installed, any change to the embedded rows triggers a full reload.
+        Without it: append chunks with id > the newest one already indexed, then reload if
+        the remote embedded-chunk count still differs (rows embedded after the fact, deletes).
+        Rows skipped for an unusable vector count as seen, so they don't force a reload on
+        every poll. Re-embeds that keep ids and count are only detected through VERSION_RPC.
+        """
+        if self.loaded_at is None:
+            return self.reload()
+        version = self._remote_version()
+        if self._version_rpc:
+            return self.reload() if version is None or version != self._version else 0
+        with self._load_lock:
+            rows = self._fetch(self._max_id)
+            matrix, meta, skipped = self._to_arrays(rows)
+            with self._lock:
+                if meta:
+                    self._matrix = matrix if self._matrix.size == 0 else np.vstack([self._matrix, matrix])
+                    self._meta = self._meta + meta
+                if rows:
+                    self._max_id = rows[-1]["id"]
+                self._skipped += skipped
+        remote = self._remote_count()
+        if remote is not None and remote != self._seen():
+            return self.reload()
+        return len(meta)
+
+    def _remote_version(self) -> Optional[str]:
+        """VERSION_RPC fingerprint; None if the call failed or the RPC isn't installed."""
+        from core.supabase_client import is_missing_function, supabase
+
+        if self._version_rpc is False:
+            return None
+        try:
+            version = supabase.rpc(VERSION_RPC, {}).execute().data
+        except Exception as e:
+            if is_missing_function(e):
+                print(f"RPC {VERSION_RPC} not installed; policy index re-embeds won't be detected")
+                self._version_rpc = False
+            return None
+        self._version_rpc = True
+        return str(version)
+
+    @staticmethod
+    def _remote_count() -> Optional[int]:
+        """Cheap change detector: number of embedded chunks (exact count, no rows)."""
+        from core.supabase_client import supabase
+
+        try:
+            res = (
+                supabase.table("policy_chunks")
+                .select("id", count="exact")
+                .not_.is_("embedding", "null")
+                .limit(1)
+                .execute()
+            )
+            return res.count
+        except Exception:
+            return None
+
+    def poll_once(self):
+        """Version poll: reload when the fingerprint changed (or, without it, refresh on a count mismatch)."""
+        version = self._remote_version()
+        if self._version_rpc:
+            if version is not None and version != self._version:
+                self.reload()
+            return
+        remote = self._remote_count()
+        if remote is not None and remote != self._seen():
+            self.refresh()
+
+    def start_polling(self, interval_seconds: float):
+        if interval_seconds <= 0 or self._poller is not None:
+            return
+
+        def _loop():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"policy index poll failed: {e}")
+
+        self._poller = threading.Thread(target=_loop, name="policy-index-poll", daemon=True)
+        self._poller.start()
+
+    # ---------- search ----------
+    def search(self, query_vec: np.ndarray, k: int = 5, min_similarity: float = 0.0) -> List[Dict[str, Any]]:
+        """Top-k by cosine similarity; same row shape as the match_policy_chunks RPC."""
+        with self._lock:
+            matrix, meta = self._matrix, self._meta
+        if not meta:
+            return []
+        q = np.asarray(query_vec, dtype=np.float32).ravel()
+        q = q / (float(np.linalg.norm(q)) or 1.0)
+        sims = matrix @ q
+        k = min(k, len(meta))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [
+            {**meta[i], "similarity": float(sims[i])}
+            for i in top
+            if sims[i] >= min_similarity
+        ]
+
+    def search_many(self, query_vecs: np.ndarray, k: int = 5, min_similarity: float = 0.0) -> List[List[Dict[str, Any]]]:
+        """Top-k for several queries at once (one (n_chunks x n_queries) matmul)."""
+        with self._lock:
+            matrix, meta = self._matrix, self._meta
+        q = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        if not meta:
+            return [[] for _ in range(len(q))]
+        q = q / np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+        sims = matrix @ q.T
+        k = min(k, len(meta))
+        out: List[List[Dict[str, Any]]] = []
+        for j in range(q.shape[0]):
+            col = sims[:, j]
+            top = np.argpartition(-col, k - 1)[:k]
+            top = top[np.argsort(-col[top])]
+            out.append([{**meta[i], "similarity": float(col[i])} for i in top if col[i] >= min_similarity])
+        return out
+
+
+policy_index = PolicyIndex()
+
+
+def refresh_policy_index() -> None:
+    """Make freshly embedded chunks visible to judge-time retrieval (best-effort)."""
+    from configs.settings import settings
+
+    if not settings.POLICY_INDEX_ENABLED:
+        return
+    try:
+        policy_index.refresh()
+    except Exception as e:
+        print(f"policy index refresh failed: {e}")
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, List, Tuple
+
+from benchmarks import synthetic
+
+# Each benchmark is (name, setup) where setup() builds its inputs once and returns the
+# zero-argument callable that is timed. A setup that raises ImportError marks the
+# benchmark as skipped (e.g. torch or langgraph not installed in this environment).
+
+Setup = Callable[[], Callable[[], Any]]
+BENCHMARKS: List[Tuple[str, Setup]] = []
+
+
+def bench(name: str):
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+# ---------- encoder ----------
+def _synthetic_bundle():
+    """EncoderBundle with random weights and a scaler fitted on synthetic rows (no artifacts)."""
+    import numpy as np
+    import torch
+    from sklearn.preprocessing import StandardScaler
+
+    from configs.settings import settings
+    from core.encoder import CreditEncoder, EncoderBundle
+    from core.encoder_runtime import build_feature_row
+
+    torch.manual_seed(0)
+    bundle = EncoderBundle.__new__(EncoderBundle)
+    bundle.feature_cols = list(synthetic.FEATURE_COLS)
+    rows = [build_feature_row(a, bundle.feature_cols) for a in synthetic.applicants(512)]
+    x = np.asarray([[r[c] for c in bundle.feature_cols] for r in rows], dtype=np.float32)
+    bundle.scaler = StandardScaler().fit(x)
+    bundle.device = "cpu"
+    bundle.model = CreditEncoder(in_dim=len(bundle.feature_cols), emb_dim=settings.QDRANT_VECTOR_SIZE).eval()
+    return bundle
+
+
+@bench("build_feature_row")
+def _build_feature_row():
+    from core.encoder_runtime import build_feature_row
+
+    applicant = synthetic.applicants(1)[0]
+    cols = list(synthetic.FEATURE_COLS)
+    return lambda: build_feature_row(applicant, cols)
+
+
+@bench("build_feature_matrix[1000]")
+def _build_feature_matrix():
+    import pandas as pd
+
+    from core.encoder_runtime import build_feature_matrix
+
+    df = pd.DataFrame(synthetic.applicants(1000))
+    cols = list(synthetic.FEATURE_COLS)
+    return lambda: build_feature_matrix(df, cols)
+
+
+@bench("EncoderBundle.embed_one")
+def _embed_one():
+    from core.encoder_runtime import build_feature_row
+
+    bundle = _synthetic_bundle()
+    row = build_feature_row(synthetic.applicants(1)[0], bundle.feature_cols)
+    return lambda: bundle.embed_one(row)
+
+
+@bench("EncoderBundle.embed_and_score_many[256]")
+def _embed_many():
+    from core.encoder_runtime import build_feature_row
+
+    bundle = _synthetic_bundle()
+    rows = [build_feature_row(a, bundle.feature_cols) for a in synthetic.applicants(256)]
+    return lambda: bundle.embed_and_score_many(rows)
+
+
+# ---------- retrieval ----------
+@bench("retrieve_neighbors._to_neighbors[10]")
+def _to_neighbors():
+    from retrieval.neighbors import _to_neighbors as to_neighbors
+
+    hits = synthetic.qdrant_hits(10)
+    applicant = synthetic.applicants(1)[0]
+    return lambda: to_neighbors(hits, applicant)
+
+
+@bench("neighbor_highlights")
+def _neighbor_highlights():
+    from retrieval.neighbors import neighbor_highlights
+
+    a, b = synthetic.applicants(2)
+    b.update({k: a[k] for k in ("loan_term", "employment_status", "loan_purpose")})
+    return lambda: neighbor_highlights(a, b)
+
+
+@bench("summarize_neighbor_stats[10]")
+def _summarize_neighbor_stats():
+    from retrieval.neighbors import summarize_neighbor_stats
+
+    nbrs = synthetic.neighbors(10)
+    return lambda: summarize_neighbor_stats(nbrs)
+
+
+# ---------- pipeline_adapter mapping ----------
+@bench("pipeline_adapter._map_neighbors_for_frontend[10]")
+def _map_neighbors():
+    from apps.api.pipeline_adapter import _map_neighbors_for_frontend
+
+    nbrs = synthetic.neighbors(10)
+    return lambda: _map_neighbors_for_frontend(nbrs)
+
+
+@bench("pipeline_adapter._compute_retrieval_stats[10]")
+def _retrieval_stats():
+    from apps.api.pipeline_adapter import _compute_retrieval_stats
+    from retrieval.neighbors import summarize_neighbor_stats
+
+    nbrs = synthetic.neighbors(10)
+    applicant = synthetic.applicants(1)[0]
+    stats = summarize_neighbor_stats(nbrs)
+    return lambda: _compute_retrieval_stats(applicant, nbrs, stats)
+
+
+@bench("pipeline_adapter._build_decision_payload")
+def _decision_payload():
+    from apps.api.pipeline_adapter import _build_decision_payload, _map_neighbors_for_frontend
+
+    msgs = synthetic.debate_messages(5)
+    items = _map_neighbors_for_frontend(synthetic.neighbors(10))
+    return lambda: _build_decision_payload(msgs, items)
+
+
+# ---------- prompt rendering ----------
+@bench("nodes._fmt_neighbors[10]")
+def _fmt_neighbors():
+    from workflow.nodes import _fmt_neighbors as fmt
+
+    nbrs = synthetic.neighbors(10)
+    return lambda: fmt(nbrs)
+
+
+@bench("utils.history[5 turns]")
+def _history():
+    from workflow.utils import history
+
+    msgs = synthetic.debate_messages(5)
+    return lambda: history(msgs)
+
+
+# ---------- API serialization ----------
+@bench("routes_cases._case_shape+render")
+def _case_shape():
+    from apps.api import routes_cases
+    from apps.api.responses import FastJSONResponse
+
+    case = synthetic.case()
+    routes_cases.CASES[case["case_id"]] = case
+    response = FastJSONResponse(content=None)
+    return lambda: response.render(routes_cases._case_shape(case["case_id"]))
+
+
+@bench("json.dumps(_case_shape) [stdlib]")
+def _case_shape_stdlib():
+    from apps.api import routes_cases
+
+    case = synthetic.case()
+    routes_cases.CASES[case["case_id"]] = case
+    return lambda: json.dumps(routes_cases._case_shape(case["case_id"]))
+
+
+def selected(patterns: List[str]) -> List[Tuple[str, Setup]]:
+    if not patterns:
+        return list(BENCHMARKS)
+    return [(n, s) for n, s in BENCHMARKS if any(p.lower() in n.lower() for p in patterns)]
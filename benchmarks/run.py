@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks for the backend's hot functions (synthetic data, no services).
+
+    python -m benchmarks.run                         # run all, write benchmarks/results/latest.json
+    python -m benchmarks.run -k neighbors -k case    # only names containing these substrings
+    python -m benchmarks.run --save-baseline         # also store the run as benchmarks/baseline.json
+    python -m benchmarks.run --compare               # diff against the baseline (exit 1 on regression with --strict)
+
+Each benchmark is timed with timeit: autorange picks a loop count that takes at
+least 0.2 s, then --repeat rounds of that loop are measured. Per-call min / median /
+p95 are reported; comparisons use the median. Baselines are machine specific:
+record one on the machine (or CI runner) you compare on.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(HERE, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _environment() -> Dict[str, Any]:
+    env: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": _git_commit(),
+    }
+    for mod in ("numpy", "torch", "pandas", "orjson"):
+        try:
+            env[mod] = __import__(mod).__version__
+        except Exception:
+            env[mod] = None
+    return env
+
+
+def measure(fn, repeat: int = 7, min_time: float = 0.2) -> Dict[str, Any]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    # autorange stops at >= 0.2s; scale up if a longer window was requested
+    number = max(1, int(number * max(1.0, min_time / 0.2)))
+    per_call = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    p95 = per_call[min(len(per_call) - 1, int(round(0.95 * (len(per_call) - 1))))]
+    median = statistics.median(per_call)
+    return {
+        "status": "ok",
+        "loops": number,
+        "repeat": repeat,
+        "min_us": round(per_call[0] * 1e6, 3),
+        "median_us": round(median * 1e6, 3),
+        "p95_us": round(p95 * 1e6, 3),
+        "ops_per_sec": round(1.0 / median, 1) if median > 0 else None,
+    }
+
+
+def run(patterns: List[str], repeat: int, min_time: float) -> Dict[str, Any]:
+    from benchmarks.cases import selected
+
+    results: Dict[str, Any] = {}
+    for name, setup in selected(patterns):
+        try:
+            fn = setup()
+        except ImportError as e:
+            results[name] = {"status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+            print(f"  skip  {name:<52} ({e})")
+            continue
+        res = measure(fn, repeat=repeat, min_time=min_time)
+        results[name] = res
+        print(f"  {res['median_us']:>12.2f} us  {name:<52} (p95 {res['p95_us']:.2f} us, {res['loops']} loops)")
+    return {
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "environment": _environment(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Median ratio current/baseline per benchmark present (and measured) in both runs."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or cur.get("status") != "ok" or base.get("status") != "ok":
+            continue
+        ratio = cur["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        verdict = "regression" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "same"
+        rows.append({"name": name, "baseline_us": base["median_us"], "current_us": cur["median_us"], "ratio": round(ratio, 3), "verdict": verdict})
+    return rows
+
+
+def _write(path: str, data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Backend micro-benchmarks")
+    p.add_argument("-k", dest="patterns", action="append", default=[], help="only benchmarks whose name contains this (repeatable)")
+    p.add_argument("--repeat", type=int, default=7)
+    p.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round (lower bound)")
+    p.add_argument("--out", default=DEFAULT_OUT)
+    p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--compare", action="store_true")
+    p.add_argument("--threshold", type=float, default=0.10, help="relative median change treated as noise")
+    p.add_argument("--strict", action="store_true", help="exit 1 if any benchmark regressed")
+    args = p.parse_args(argv)
+
+    started = time.perf_counter()
+    print(f"running benchmarks (repeat={args.repeat})")
+    current = run(args.patterns, args.repeat, args.min_time)
+    _write(args.out, current)
+    print(f"results -> {args.out} ({time.perf_counter() - started:.1f}s)")
+
+    regressed = False
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline} (create one with --save-baseline)")
+        else:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            print(f"\ncompared to baseline {baseline.get('environment', {}).get('commit')} ({baseline.get('created_at')}):")
+            for row in compare(current, baseline, args.threshold):
+                mark = {"regression": "!!", "faster": "++", "same": "  "}[row["verdict"]]
+                print(f"  {mark} {row['ratio']:>6.2f}x  {row['name']:<52} {row['baseline_us']:.2f} -> {row['current_us']:.2f} us")
+                regressed = regressed or row["verdict"] == "regression"
+
+    if args.save_baseline:
+        _write(args.baseline, current)
+        print(f"baseline -> {args.baseline}")
+
+    return 1 if (regressed and args.strict) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
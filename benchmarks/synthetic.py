@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+# Deterministic synthetic inputs shaped like loan_dataset_20000.csv rows, Qdrant hits,
+# debate messages and stored cases. Nothing here touches a model file or a service.
+
+EDUCATION = ["High School", "Bachelor's", "Master's", "PhD", "Other"]
+EMPLOYMENT = ["Employed", "Self-employed", "Unemployed", "Retired", "Student"]
+PURPOSE = ["Car", "Home", "Debt consolidation", "Education", "Business", "Medical", "Vacation", "Other"]
+GRADES = [f"{g}{n}" for g in "ABCDEF" for n in range(1, 6)]
+
+NUMERIC_COLS = [
+    "age", "annual_income", "monthly_income", "debt_to_income_ratio", "credit_score", "loan_amount",
+    "interest_rate", "loan_term", "installment", "num_of_open_accounts", "total_credit_limit",
+    "current_balance", "delinquency_history", "public_records", "num_of_delinquencies",
+]
+
+# same layout as the training columns: numerics + pd.get_dummies of the categorical columns
+FEATURE_COLS = (
+    NUMERIC_COLS
+    + [f"education_level_{v}" for v in EDUCATION]
+    + [f"employment_status_{v}" for v in EMPLOYMENT]
+    + [f"loan_purpose_{v}" for v in PURPOSE]
+)
+
+
+def applicant(rng: random.Random) -> Dict[str, Any]:
+    income = round(rng.uniform(12_000, 180_000), 2)
+    amount = round(rng.uniform(1_000, 45_000), 2)
+    return {
+        "age": rng.randint(21, 70),
+        "gender": rng.choice(["Male", "Female"]),
+        "marital_status": rng.choice(["Single", "Married", "Divorced"]),
+        "education_level": rng.choice(EDUCATION),
+        "annual_income": income,
+        "monthly_income": round(income / 12, 2),
+        "employment_status": rng.choice(EMPLOYMENT),
+        "debt_to_income_ratio": round(rng.uniform(0.01, 0.6), 3),
+        "credit_score": rng.randint(450, 850),
+        "loan_amount": amount,
+        "loan_purpose": rng.choice(PURPOSE),
+        "interest_rate": round(rng.uniform(4, 24), 2),
+        "loan_term": rng.choice([36, 60]),
+        "installment": round(amount / 40, 2),
+        "grade_subgrade": rng.choice(GRADES),
+        "num_of_open_accounts": rng.randint(0, 15),
+        "total_credit_limit": round(rng.uniform(1_000, 90_000), 2),
+        "current_balance": round(rng.uniform(0, 60_000), 2),
+        "delinquency_history": rng.randint(0, 5),
+        "public_records": rng.randint(0, 2),
+        "num_of_delinquencies": rng.randint(0, 6),
+    }
+
+
+def applicants(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [applicant(rng) for _ in range(n)]
+
+
+def qdrant_hits(n: int, seed: int = 11) -> List[SimpleNamespace]:
+    """ScoredPoint-like objects (id, score, payload) as returned by query_points."""
+    rng = random.Random(seed)
+    hits = []
+    for i in range(n):
+        payload = {**applicant(rng), "applicant_id": f"A{100000 + i}", "loan_paid_back": rng.choice([0, 1, 1, 1])}
+        hits.append(SimpleNamespace(id=i, score=rng.uniform(0.7, 0.99), payload=payload))
+    return hits
+
+
+def neighbors(n: int, seed: int = 13) -> List[Dict[str, Any]]:
+    """retrieve_neighbors() output shape."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        raw = {**applicant(rng), "applicant_id": f"A{200000 + i}"}
+        out.append({
+            "applicant_id": raw["applicant_id"],
+            "similarity": rng.uniform(0.7, 0.99),
+            "loan_paid_back": rng.choice([0, 1, 1, 1, -1]),
+            "summary": f"{raw['employment_status']} {raw['loan_purpose']} loan, score {raw['credit_score']}",
+            "highlights": [f"credit_score matches ({raw['credit_score']})"],
+            "raw": raw,
+        })
+    return out
+
+
+_SENTENCE = (
+    "The applicant's debt-to-income ratio and credit history are within the range of neighbors "
+    "that repaid, but the loan amount relative to income warrants attention. "
+)
+
+
+def debate_messages(turns: int = 5, words: int = 250) -> List[Dict[str, Any]]:
+    body = (_SENTENCE * (words // 30 + 1))[: words * 6]
+    speakers = ["risk", "advocate"]
+    stages = ["opening", "rebuttal", "counter", "final_argument"]
+    msgs = [
+        {"speaker": speakers[i % 2], "content": f"Decision recommendation: REVIEW\n{body}", "stage": stages[min(i, 3)], "validated": True}
+        for i in range(turns - 1)
+    ]
+    msgs.append({
+        "speaker": "judge",
+        "content": "final_decision: REJECT\nconfidence: 72\n- affordability below policy\n- recent delinquencies\n- " + body,
+        "stage": "verdict",
+        "validated": True,
+    })
+    return msgs
+
+
+def case(case_id: str = "case_bench", n_neighbors: int = 10, turns: int = 5) -> Dict[str, Any]:
+    """A fully decided stored case (routes_cases.CASES entry)."""
+    from apps.api.pipeline_adapter import _map_neighbors_for_frontend, _map_transcript_messages
+
+    nbrs = neighbors(n_neighbors)
+    return {
+        "case_id": case_id,
+        "status": "decided",
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:05:00Z",
+        "applicant": applicants(1)[0],
+        "retrieval": {
+            "top_k": n_neighbors,
+            "neighbors": _map_neighbors_for_frontend(nbrs),
+            "stats": {"default_rate": 0.3, "average_credit_score": 690.0, "median_income": 61000.0, "total_neighbors": n_neighbors},
+        },
+        "debate": {"run_id": "run_bench", "stage": "done", "messages": _map_transcript_messages(debate_messages(turns))},
+        "decision": {"verdict": "reject", "justification": ["a", "b"], "evidence_refs": ["A1"], "confidence": 0.72, "policy_refs": []},
+        "fraud_signals": None,
+    }
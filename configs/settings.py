@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 import os
@@ -16,6 +18,21 @@ class Settings(BaseSettings):
     QDRANT_URL: str = "http://localhost:6333"
     QDRANT_COLLECTION: str = "applicants_v1"
     QDRANT_VECTOR_SIZE: int = 128
+    QDRANT_API_KEY: str = ""
+    QDRANT_TIMEOUT_SECONDS: int = 10
+
+    # neo4j (docker-compose defaults)
+    NEO4J_URI: str = "bolt://localhost:7687"
+    NEO4J_USER: str = "neo4j"
+    NEO4J_PASSWORD: str = "pleaseChangeMe"
+    NEO4J_POOL_SIZE: int = 20
+    NEO4J_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # supabase (credentials are the module-level SUPABASE_URL / SUPABASE_ANON_KEY)
+    SUPABASE_TIMEOUT_SECONDS: int = 20
+
+    # dependency health probes reuse pooled clients; results are cached this long
+    HEALTH_CACHE_TTL_SECONDS: float = 5.0
 
     # groq
     GROQ_API_KEY: str
@@ -26,10 +43,91 @@ class Settings(BaseSettings):
     ENCODER_WEIGHTS: str = "encoder_best.pt"
     ENCODER_SCALER: str = "scaler.joblib"
     ENCODER_FEATURES: str = "feature_cols.joblib"
+    ENCODER_HEAD_PREDICTS_REPAYMENT: bool = True  # head target is loan_paid_back (1 = repaid)
+
+    # bulk batches (POST /batches)
+    BATCH_MAX_BYTES: int = 200 * 1024 * 1024
+    BATCH_MAX_ROWS: int = 100_000
+    BATCH_ENCODE_SIZE: int = 512            # applicants per encoder forward / neighbor batch
+    BATCH_DEBATE_CONCURRENCY: int = 4       # default debates in flight per batch
+    BATCH_MAX_DEBATE_CONCURRENCY: int = 16
+
+    # GET /runs/{id}/transcript?wait=: longest a long-poll is parked (seconds)
+    TRANSCRIPT_MAX_WAIT_SECONDS: float = 25.0
+
+    # LLM calls (workflow/resilience.py): per-attempt deadline, hedging, retries, breaker
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_NODE_TIMEOUTS: Dict[str, float] = {"judge": 45.0}   # per node overrides (risk|advocate|judge)
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_QUANTILE: float = 0.95         # hedge once the call is slower than this quantile of recent calls
+    LLM_HEDGE_MIN_SAMPLES: int = 20          # until then wait LLM_HEDGE_DEFAULT_DELAY_SECONDS
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 8.0
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    LLM_MAX_RETRIES: int = 2                 # per call
+    LLM_RUN_RETRY_BUDGET: int = 4            # per run, across all its calls
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURES: int = 5            # consecutive retryable failures that open the breaker
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    LLM_DEGRADE_ON_FAILURE: bool = True      # failed agent turn -> placeholder message; failed judge -> manual review
+    # provider quota, per process (0 = no limit); defaults are Groq's free tier for llama-3.1-8b-instant
+    LLM_RPM_LIMIT: int = 30
+    LLM_TPM_LIMIT: int = 6000
+    LLM_RATE_LIMIT_HEADROOM: float = 0.9     # sustained rate as a fraction of the quota
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = 400    # completion tokens reserved per call until the real usage is known
+    LLM_RATE_LIMIT_PENALTY_SECONDS: float = 10.0 # pause after a 429 without Retry-After
+
+    # debate: moderator jumps to the judge once risk + advocate recommend the same outcome
+    EARLY_CONSENSUS: bool = True
+
+    # triage: clear cases get a templated decision instead of the LLM debate (workflow/triage.py)
+    TRIAGE_ENABLED: bool = True
+    TRIAGE_APPROVE_MAX_PROB: float = 0.05   # modelled default probability at or below -> approve
+    TRIAGE_REJECT_MIN_PROB: float = 0.90    # at or above -> reject
+    TRIAGE_MIN_KNOWN_NEIGHBORS: int = 5     # labelled neighbors required to trust the neighborhood
+    TRIAGE_MAX_DISSENT: float = 0.0         # share of neighbors allowed to disagree (0 = unanimous)
 
     # retrieval
     TOPK_POS: int = 6
     TOPK_NEG: int = 6
 
+    # case documents (content-addressed local store)
+    DOCUMENT_STORE_DIR: str = "data/documents"
+    MAX_DOCUMENT_BYTES: int = 25 * 1024 * 1024
+    MAX_CASE_DOCUMENT_BYTES: int = 100 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+
+    # policy ingestion
+    MAX_POLICY_BYTES: int = 50 * 1024 * 1024
+    INGEST_INSERT_BATCH_SIZE: int = 500
+    INGEST_INSERT_CONCURRENCY: int = 4
+    PDF_EXTRACT_WORKERS: int = 4        # processes for page-parallel PDF extraction (<=1 = serial)
+    PDF_PAGES_PER_TASK: int = 16        # contiguous pages handed to a worker at a time
+    CHUNK_WINDOW_CHARS: int = 20000     # text buffered before each chunker call
+
+    # sentence embedding models (see core/model_registry.py)
+    POLICY_EMBED_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBED_DEVICE: str = "cpu"
+    EMBED_NUM_THREADS: int = 0  # 0 = torch default
+
+    # policy embedding write-back (see ingestion/policies/embed_policies.py)
+    POLICY_EMBED_WRITE_RPC: str = "set_policy_chunk_embeddings"
+    POLICY_EMBED_WRITE_CONCURRENCY: int = 4
+    POLICY_EMBED_WRITE_RETRIES: int = 3
+
+    # content-hash cache of policy chunk embeddings (see ingestion/policies/embed_cache.py)
+    POLICY_EMBED_CACHE: bool = True
+    POLICY_EMBED_CACHE_PATH: str = "data/embed_cache.sqlite"
+
+    # in-process policy vector index (judge-time retrieval)
+    POLICY_INDEX_ENABLED: bool = True
+    POLICY_INDEX_POLL_SECONDS: float = 60.0
+
+    # policy catalogue (GET /policies) in-process cache
+    POLICY_CATALOG_TTL_SECONDS: float = 30.0
+
+    # startup: preload encoder / embedding model / policy index before reporting ready
+    STARTUP_WARMUP: bool = True
+
 
 settings = Settings() # type: ignore
\ No newline at end of file
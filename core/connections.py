@@ -0,0 +1,141 @@
+# core/connections.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from configs.settings import settings, SUPABASE_URL, SUPABASE_ANON_KEY
+
+# One lifecycle-managed set of clients per process.
+# Every client is created lazily on first use (or eagerly by startup()), reused by
+# all callers, and closed by shutdown(). QdrantClient keeps an httpx keep-alive
+# pool, the Neo4j driver keeps a bolt connection pool, and the supabase client
+# reuses its PostgREST session, so no caller pays a fresh TCP/TLS handshake.
+
+
+class ConnectionManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._qdrant = None
+        self._neo4j = None
+        self._supabase = None
+        self._probe_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._probe_locks: Dict[str, threading.Lock] = {}
+
+    # ---------- clients ----------
+    def qdrant(self):
+        if self._qdrant is None:
+            with self._lock:
+                if self._qdrant is None:
+                    from qdrant_client import QdrantClient
+
+                    self._qdrant = QdrantClient(
+                        url=settings.QDRANT_URL,
+                        api_key=settings.QDRANT_API_KEY or None,
+                        timeout=settings.QDRANT_TIMEOUT_SECONDS,
+                    )
+        return self._qdrant
+
+    def neo4j(self):
+        if self._neo4j is None:
+            with self._lock:
+                if self._neo4j is None:
+                    from neo4j import GraphDatabase
+
+                    self._neo4j = GraphDatabase.driver(
+                        settings.NEO4J_URI,
+                        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                        max_connection_pool_size=settings.NEO4J_POOL_SIZE,
+                        connection_timeout=settings.NEO4J_CONNECT_TIMEOUT_SECONDS,
+                    )
+        return self._neo4j
+
+    def supabase(self):
+        if self._supabase is None:
+            with self._lock:
+                if self._supabase is None:
+                    if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+                        raise RuntimeError("supabase credentials are missing, recheck .env file please!")
+                    from supabase import create_client
+                    from supabase.lib.client_options import ClientOptions
+
+                    self._supabase = create_client(
+                        SUPABASE_URL,
+                        SUPABASE_ANON_KEY,
+                        options=ClientOptions(postgrest_client_timeout=settings.SUPABASE_TIMEOUT_SECONDS),
+                    )
+        return self._supabase
+
+    # ---------- lifecycle ----------
+    def startup(self):
+        """Create the clients up front (none of them connects in its constructor)."""
+        for name, factory in (("qdrant", self.qdrant), ("neo4j", self.neo4j), ("supabase", self.supabase)):
+            try:
+                factory()
+            except Exception as e:
+                print(f"{name} client not created: {e}")
+
+    def shutdown(self):
+        with self._lock:
+            qdrant, neo4j = self._qdrant, self._neo4j
+            self._qdrant = self._neo4j = self._supabase = None
+            self._probe_cache.clear()
+        for name, client in (("qdrant", qdrant), ("neo4j", neo4j)):
+            if client is None:
+                continue
+            try:
+                client.close()
+            except Exception as e:
+                print(f"closing {name} client failed: {e}")
+
+    # ---------- health ----------
+    def _probe(self, name: str, check: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Runs `check` at most once per HEALTH_CACHE_TTL_SECONDS; concurrent probes of the
+        same dependency wait for the in-flight one instead of issuing their own.
+        """
+        ttl = settings.HEALTH_CACHE_TTL_SECONDS
+        cached = self._probe_cache.get(name)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        with self._lock:
+            probe_lock = self._probe_locks.setdefault(name, threading.Lock())
+        with probe_lock:
+            cached = self._probe_cache.get(name)
+            if cached and time.monotonic() - cached[0] < ttl:
+                return cached[1]
+            t0 = time.perf_counter()
+            try:
+                result = {"status": "ok", **check()}
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+            result["latency_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            result["checked_at"] = time.time()
+            self._probe_cache[name] = (time.monotonic(), result)
+            return result
+
+    def probe_qdrant(self) -> Dict[str, Any]:
+        def check():
+            info = self.qdrant().get_collections()
+            return {"collections_count": len(info.collections)}
+
+        return self._probe("qdrant", check)
+
+    def probe_neo4j(self) -> Dict[str, Any]:
+        def check():
+            with self.neo4j().session() as session:
+                record = session.run("RETURN 1 AS ok").single()
+            return {"neo4j_ok": record["ok"] if record else None}
+
+        return self._probe("neo4j", check)
+
+    def probe_supabase(self) -> Dict[str, Any]:
+        def check():
+            self.supabase().table("policy_chunks").select("id").limit(1).execute()
+            return {}
+
+        return self._probe("supabase", check)
+
+
+connections = ConnectionManager()
@@ -38,26 +38,66 @@ class EncoderBundle:
         self.model.load_state_dict(state)
         self.model.eval()
 
-    def embed_one(self, row_dict: dict) -> np.ndarray:
-        """
-        row_dict: must contain ALL feature columns (after one-hot), but we’ll build it safely.
-        """
-        # build vector in correct column order
-        x = np.zeros((1, len(self.feature_cols)), dtype=np.float32)
-        for j, col in enumerate(self.feature_cols):
-            val = row_dict.get(col, 0.0)
-            try:
-                x[0, j] = float(val)
-            except Exception:
-                x[0, j] = 0.0
+    def _forward_many(self, row_dicts: list):
+        """One batched forward pass -> (L2-normalized embeddings (n, d), head logits (n,))."""
+        # build matrix in correct column order
+        x = np.zeros((len(row_dicts), len(self.feature_cols)), dtype=np.float32)
+        for i, row_dict in enumerate(row_dicts):
+            for j, col in enumerate(self.feature_cols):
+                val = row_dict.get(col, 0.0)
+                try:
+                    x[i, j] = float(val)
+                except Exception:
+                    x[i, j] = 0.0
+        return self._forward_matrix(x)
 
+    def _forward_matrix(self, x: np.ndarray):
+        """Unscaled feature matrix (n, len(feature_cols)) -> (embeddings (n, d), head logits (n,))."""
         x = self.scaler.transform(x).astype(np.float32)
         xb = torch.tensor(x, dtype=torch.float32).to(self.device)
 
         with torch.no_grad():
-            _, emb = self.model(xb)
-            emb = emb.cpu().numpy().astype(np.float32)[0]
+            logits, emb = self.model(xb)
+            emb = emb.cpu().numpy().astype(np.float32)
+            logits = logits.cpu().numpy().astype(np.float64).reshape(-1)
 
         # L2 normalize (cosine ready)
-        norm = np.linalg.norm(emb) + 1e-12
-        return emb / norm
+        norm = np.linalg.norm(emb, axis=1, keepdims=True) + 1e-12
+        return emb / norm, logits
+
+    def _forward(self, row_dict: dict):
+        """One forward pass -> (L2-normalized embedding, head logit)."""
+        emb, logits = self._forward_many([row_dict])
+        return emb[0], float(logits[0])
+
+    def _default_prob(self, logits):
+        p = 1.0 / (1.0 + np.exp(-np.asarray(logits, dtype=np.float64)))
+        return (1.0 - p) if settings.ENCODER_HEAD_PREDICTS_REPAYMENT else p
+
+    def embed_one(self, row_dict: dict) -> np.ndarray:
+        """
+        row_dict: must contain ALL feature columns (after one-hot), but we’ll build it safely.
+        """
+        emb, _ = self._forward(row_dict)
+        return emb
+
+    def embed_and_score(self, row_dict: dict):
+        """
+        Same forward pass as embed_one, but keeps the head output.
+        Returns (embedding, default_prob). The head is trained on loan_paid_back
+        (ENCODER_HEAD_PREDICTS_REPAYMENT=True), so P(default) = 1 - sigmoid(logit).
+        """
+        emb, logit = self._forward(row_dict)
+        return emb, float(self._default_prob(logit))
+
+    def embed_and_score_many(self, row_dicts: list):
+        """Batched embed_and_score: (embeddings (n, d), default_probs (n,)) from one forward pass."""
+        if not row_dicts:
+            return np.zeros((0, settings.QDRANT_VECTOR_SIZE), dtype=np.float32), np.zeros(0)
+        emb, logits = self._forward_many(row_dicts)
+        return emb, self._default_prob(logits)
+
+    def embed_and_score_matrix(self, x: np.ndarray):
+        """embed_and_score_many for a prebuilt feature matrix (see encoder_runtime.build_feature_matrix)."""
+        emb, logits = self._forward_matrix(np.asarray(x, dtype=np.float32))
+        return emb, self._default_prob(logits)
@@ -1,21 +1,31 @@
 # core/encoder_runtime.py
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional
+import threading
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
 import numpy as np
 
-# uses YOUR existing bundle (loads scaler/feature_cols/weights once)
-from core.encoder import EncoderBundle
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.encoder import EncoderBundle
 
+_CAT_COLS = ["education_level", "employment_status", "loan_purpose"]
 
-_bundle: Optional[EncoderBundle] = None
 
+_bundle: Optional["EncoderBundle"] = None
+_bundle_lock = threading.Lock()
 
-def get_encoder_bundle() -> EncoderBundle:
+
+def get_encoder_bundle() -> "EncoderBundle":
     global _bundle
     if _bundle is None:
-        _bundle = EncoderBundle()
+        with _bundle_lock:
+            if _bundle is None:
+                # uses YOUR existing bundle (loads scaler/feature_cols/weights once);
+                # imported here so torch is only loaded when the encoder is first needed
+                from core.encoder import EncoderBundle
+                _bundle = EncoderBundle()
     return _bundle
 
 
@@ -31,6 +41,25 @@ def encode_applicant_payload(applicant: Dict[str, Any]) -> List[float]:
     return emb.tolist()
 
 
+def encode_and_score_applicant(applicant: Dict[str, Any]) -> Tuple[List[float], float]:
+    """
+    Like encode_applicant_payload, plus the encoder head's default probability
+    from the same forward pass: (embedding, default_prob in 0..1).
+    """
+    bundle = get_encoder_bundle()
+    row = build_feature_row(applicant, bundle.feature_cols)
+    emb, default_prob = bundle.embed_and_score(row)
+    return emb.tolist(), default_prob
+
+
+def encode_and_score_applicants(applicants: List[Dict[str, Any]]) -> Tuple[List[List[float]], List[float]]:
+    """Batched encode_and_score_applicant: one forward pass for all applicants."""
+    bundle = get_encoder_bundle()
+    rows = [build_feature_row(a, bundle.feature_cols) for a in applicants]
+    emb, default_probs = bundle.embed_and_score_many(rows)
+    return emb.tolist(), [float(p) for p in default_probs]
+
+
 def build_feature_row(applicant: Dict[str, Any], feature_cols: List[str]) -> Dict[str, float]:
     """
     Build a dict keyed by the training feature columns.
@@ -57,7 +86,7 @@ def build_feature_row(applicant: Dict[str, Any], feature_cols: List[str]) -> Dic
                 pass
 
     # 2) One-hot for categories (exact string match matters)
-    for cat in ["education_level", "employment_status", "loan_purpose"]:
+    for cat in _CAT_COLS:
         val = applicant.get(cat, None)
         if isinstance(val, str) and val.strip():
             one_hot_col = f"{cat}_{val}"
@@ -65,3 +94,25 @@ def build_feature_row(applicant: Dict[str, Any], feature_cols: List[str]) -> Dic
                 row[one_hot_col] = 1.0
 
     return row
+
+
+def build_feature_matrix(df: "pd.DataFrame", feature_cols: List[str]) -> np.ndarray:
+    """
+    Vectorized build_feature_row for a whole DataFrame of raw applicants:
+    same numeric columns and exact-match one-hot columns, in feature_cols order.
+    Returns float32 (len(df), len(feature_cols)); missing / non-numeric values are 0.
+    """
+    import pandas as pd
+
+    x = np.zeros((len(df), len(feature_cols)), dtype=np.float32)
+    cats = {cat: df[cat] for cat in _CAT_COLS if cat in df.columns}
+    for j, col in enumerate(feature_cols):
+        if col in df.columns:
+            x[:, j] = pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float32)
+            continue
+        for cat, values in cats.items():
+            prefix = f"{cat}_"
+            if col.startswith(prefix):
+                x[:, j] = (values == col[len(prefix):]).to_numpy(dtype=np.float32)
+                break
+    return x
@@ -0,0 +1,236 @@
+# core/metrics.py
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# In-process metrics rendered in the Prometheus text format (GET /metrics).
+# No client library: each metric is a dict of label tuples -> values behind one
+# lock, so recording on the hot path is a dict lookup + an add (plus a bisect
+# for histograms). Counts are per process; with several uvicorn workers each
+# worker exposes its own series.
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """+1 while the block runs (in-flight / queued counts)."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = _DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label key: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in self._series.items()]
+        lines = self._header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = 'le="' + _fmt_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.label_names, key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, doc: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, doc, labels))  # type: ignore[return-value]
+
+    def gauge(self, name: str, doc: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, doc, labels))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, doc: str, labels: Sequence[str] = (), buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        return self._add(Histogram(name, doc, labels, buckets or _DEFAULT_BUCKETS))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---------- the metrics the app records ----------
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"),
+)
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_seconds",
+    "Time spent per case pipeline stage (encode, neighbors, triage, debate, policy_encode, policy_search, ...).",
+    ("stage",),
+)
+NODE_SECONDS = registry.histogram(
+    "debate_node_seconds", "Wall time of each debate graph node call.", ("node",),
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "LLM tokens reported by the provider, per debate node.", ("node", "kind"),
+)
+LLM_CALLS = registry.counter(
+    "llm_calls_total", "LLM calls per debate node.", ("node",),
+)
+RUNS_IN_FLIGHT = registry.gauge(
+    "runs_in_flight", "Case pipelines currently executing.", ("source",),
+)
+RUNS_QUEUED = registry.gauge(
+    "runs_queued", "Case pipelines accepted but not started yet (background queue / batch semaphore).", ("source",),
+)
+RUN_OUTCOMES = registry.counter(
+    "runs_total", "Finished case pipelines by path and status.", ("path", "status"),
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit|miss).", ("cache", "result"),
+)
+
+
+def cache_hit(cache: str, hit: bool = True, n: int = 1):
+    if n:
+        CACHE_REQUESTS.inc(n, cache=cache, result="hit" if hit else "miss")
+
+
+def stage_timer(stage: str):
+    return PIPELINE_STAGE_SECONDS.time(stage=stage)
+
+
+def record_llm_usage(node: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    LLM_CALLS.inc(node=node)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, node=node, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, node=node, kind="completion")
+
+
+def render() -> str:
+    return registry.render()
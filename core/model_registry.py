@@ -0,0 +1,85 @@
+# core/model_registry.py
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from configs.settings import settings
+
+try:
+    import resource  # not available on Windows
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+# One SentenceTransformer per (model name, device) per process, shared by judge-time
+# retrieval (apps/retrieval/policies.py) and policy ingestion (ingestion/policies/*).
+
+_MODELS: Dict[tuple, Any] = {}
+_LOCK = threading.Lock()
+_threads_configured = False
+
+
+def _configure_runtime():
+    """HF auth/cache env + torch intra-op threads, applied once before the first load."""
+    global _threads_configured
+    if _threads_configured:
+        return
+    # sentence-transformers uses HF_HOME/HF_TOKEN automatically
+    hf_token = os.getenv("HF_TOKEN")
+    if hf_token:
+        os.environ.setdefault("HUGGINGFACE_HUB_TOKEN", hf_token)  # extra compatibility
+    if settings.EMBED_NUM_THREADS > 0:
+        import torch
+
+        torch.set_num_threads(settings.EMBED_NUM_THREADS)
+    _threads_configured = True
+
+
+def get_sentence_model(name: Optional[str] = None, device: Optional[str] = None):
+    """Thread-safe, load-once accessor for a SentenceTransformer."""
+    key = (name or settings.POLICY_EMBED_MODEL, device or settings.EMBED_DEVICE)
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+    with _LOCK:
+        model = _MODELS.get(key)
+        if model is None:
+            _configure_runtime()
+            from sentence_transformers import SentenceTransformer
+
+            print(f"loading SentenceTransformer {key[0]} on {key[1]}...")
+            model = SentenceTransformer(key[0], device=key[1])
+            _MODELS[key] = model
+    return model
+
+
+def warmup(names: Optional[List[str]] = None) -> Dict[str, float]:
+    """Loads each model and runs a dummy encode; returns seconds spent per model."""
+    timings: Dict[str, float] = {}
+    for name in names or [settings.POLICY_EMBED_MODEL]:
+        t0 = time.perf_counter()
+        get_sentence_model(name).encode(["warmup"], show_progress_bar=False)
+        timings[name] = round(time.perf_counter() - t0, 3)
+    return timings
+
+
+def memory_report() -> Dict[str, Any]:
+    """Parameter memory of each loaded model + the process peak RSS."""
+    models = []
+    for (name, device), model in list(_MODELS.items()):
+        param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        models.append({"name": name, "device": device, "param_mb": round(param_bytes / 2**20, 1)})
+    peak_mb = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak_mb = round(peak / 2**20 if sys.platform == "darwin" else peak / 2**10, 1)
+    return {"models": models, "peak_rss_mb": peak_mb}
+
+
+if __name__ == "__main__":
+    print(warmup())
+    print(memory_report())
@@ -1,7 +1,33 @@
-from supabase import create_client
-from configs.settings import SUPABASE_URL, SUPABASE_ANON_KEY
+from typing import Optional
 
-if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-    raise RuntimeError("supabase credentials are missing, recheck .env file please!")
+from core.connections import connections
 
-supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
\ No newline at end of file
+# The shared client lives in the connection manager (core/connections.py) and is created
+# on first use, so importing modules that talk to Supabase stays cheap and doesn't fail
+# when credentials are missing.
+
+def get_supabase():
+    return connections.supabase()
+
+class _LazySupabase:
+    """Module-level `supabase` proxy: attribute access resolves the managed client."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+supabase = _LazySupabase()
+
+def postgrest_code(error: BaseException) -> Optional[str]:
+    """PostgREST / Postgres error code of a failed request (e.g. PGRST202, 42703), if it has one."""
+    code = getattr(error, "code", None)
+    if code is None and error.args and isinstance(error.args[0], dict):
+        code = error.args[0].get("code")
+    return str(code) if code is not None else None
+
+# PostgREST "function not found" (and Postgres undefined_function): the RPC isn't installed
+_MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
+def is_missing_function(error: BaseException) -> bool:
+    """True when an rpc() call failed because the function doesn't exist (not for timeouts / 5xx)."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return postgrest_code(error) in _MISSING_FUNCTION_CODES or status == 404
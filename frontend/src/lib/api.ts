@@ -249,7 +249,11 @@ export async function getRunStatus(runId: string): Promise<GetRunStatusResponse>
   return apiRequest<GetRunStatusResponse>(`/runs/${runId}/status`);
 }
 
-export async function getTranscript(runId: string): Promise<GetTranscriptResponse> {
+export async function getTranscript(
+  runId: string,
+  since?: number,
+  wait?: number
+): Promise<GetTranscriptResponse> {
   if (API_CONFIG.useMock) {
     await mockDelay(300);
     const run = mockDataStore.getRun(runId);
@@ -263,7 +267,11 @@ export async function getTranscript(runId: string): Promise<GetTranscriptRespons
     };
   }
 
-  return apiRequest<GetTranscriptResponse>(`/runs/${runId}/transcript`);
+  const params = new URLSearchParams();
+  if (since !== undefined) params.set('since', since.toString());
+  if (wait) params.set('wait', wait.toString());
+  const qs = params.toString();
+  return apiRequest<GetTranscriptResponse>(`/runs/${runId}/transcript${qs ? `?${qs}` : ''}`);
 }
 
 export async function getDecision(runId: string): Promise<GetDecisionResponse> {
@@ -381,24 +389,36 @@ export function pollTranscript(
   runId: string,
   onUpdate: (transcript: GetTranscriptResponse) => void,
   onError: (error: Error) => void,
-  interval: number = 1500
+  interval: number = 1500,
+  waitSeconds: number = 20
 ): () => void {
   let isActive = true;
-  let lastMessageCount = 0;
+  let messages: GetTranscriptResponse['messages'] = [];
+  let lastSeq = 0;
 
+  // Long-poll: the server holds each request until there is a new message or a
+  // stage change, and only sends messages after `lastSeq`.
   const poll = async () => {
     if (!isActive) return;
 
     try {
-      const transcript = await getTranscript(runId);
-      
-      if (transcript.messages.length !== lastMessageCount) {
-        lastMessageCount = transcript.messages.length;
-        onUpdate(transcript);
+      const useCursor = !API_CONFIG.useMock;
+      const transcript = useCursor
+        ? await getTranscript(runId, lastSeq, waitSeconds)
+        : await getTranscript(runId);
+      if (!isActive) return;
+
+      const next = useCursor ? messages.concat(transcript.messages) : transcript.messages;
+      if (next.length !== messages.length) {
+        messages = next;
+        lastSeq = transcript.last_seq ?? next.length;
+        onUpdate({ ...transcript, messages });
       }
 
-      if (transcript.stage !== 'done') {
-        setTimeout(poll, interval);
+      const finished =
+        transcript.stage === 'done' || transcript.status === 'decided' || transcript.status === 'failed';
+      if (!finished) {
+        setTimeout(poll, useCursor ? 0 : interval);
       }
     } catch (error) {
       onError(error instanceof Error ? error : new Error(String(error)));
@@ -120,6 +120,7 @@ export const DebateMessageSchema = z.object({
   content: z.string(),
   timestamp: z.string(),
   stage: z.enum(['opening', 'rebuttal', 'counter', 'final', 'verdict', 'done']),
+  seq: z.number().optional(), // per-run position (1-based), the transcript `since` cursor
 });
 
 export const DebateRunSchema = z.object({
@@ -285,7 +286,8 @@ export interface ListDocumentsResponse {
 
 export interface StartDebateRequest {
   top_k?: number;
-  mode?: 'standard' | 'adversarial';
+  mode?: 'standard' | 'adversarial' | 'fast';
+  rounds?: number;
 }
 
 export interface StartDebateResponse {
@@ -306,6 +308,9 @@ export interface GetTranscriptResponse {
   messages: DebateMessage[];
   stage: DebateStageType;
   updated_at: string;
+  // incremental fetch (?since=&wait=): seq of the newest message, run status
+  last_seq?: number;
+  status?: string;
 }
 
 export interface GetDecisionResponse {
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from configs.settings import settings
+
+# Content-hash -> embedding cache for policy chunks.
+# Keyed by (model name, sha256 of the normalized text), so boilerplate clauses and
+# unchanged clauses of a re-uploaded policy are never encoded twice.
+# Configured by POLICY_EMBED_CACHE / POLICY_EMBED_CACHE_PATH (configs/settings.py).
+
+_SQLITE_MAX_VARS = 900
+
+
+def normalize_text(text: str) -> str:
+    """NFKC + collapsed whitespace: formatting-only differences hit the same entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.POLICY_EMBED_CACHE_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, hash))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(dict.fromkeys(hashes))
+        out: Dict[str, List[float]] = {}
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(keys), _SQLITE_MAX_VARS):
+                part = keys[i:i + _SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(part))
+                rows = db.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    out[h] = np.frombuffer(blob, dtype=np.float32).astype(float).tolist()
+        return out
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]):
+        rows = [(model, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in items]
+        if not rows:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany("INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)", rows)
+            db.commit()
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache, or None when disabled via POLICY_EMBED_CACHE=0."""
+    global _cache
+    if not settings.POLICY_EMBED_CACHE:
+        return None
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
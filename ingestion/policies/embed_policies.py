@@ -1,131 +1,372 @@
 import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
-from sentence_transformers import SentenceTransformer
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Deque, Iterator, Tuple
 
-load_dotenv()
+from configs.settings import settings
+from core.metrics import cache_hit
+from core.model_registry import get_sentence_model
+from core.supabase_client import is_missing_function, supabase
+from ingestion.policies.embed_cache import get_cache, text_hash
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
-EMBEDDING_MODEL = os.getenv("POLICY_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_MODEL = settings.POLICY_EMBED_MODEL
 
-if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-    raise RuntimeError("Missing SUPABASE_URL or SUPABASE_ANON_KEY in environment")
 
-# ✅ HuggingFace auth + cache directory
-# sentence-transformers uses HF_HOME/HF_TOKEN automatically
-HF_TOKEN = os.getenv("HF_TOKEN")
-if HF_TOKEN:
-    os.environ["HUGGINGFACE_HUB_TOKEN"] = HF_TOKEN  # extra compatibility
-HF_HOME = os.getenv("HF_HOME")
-if HF_HOME:
-    os.environ["HF_HOME"] = HF_HOME
+def get_model():
+    # shared registry: same instance as judge-time retrieval in this process
+    return get_sentence_model(EMBEDDING_MODEL)
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)  # type: ignore
 
+def _encode_raw(texts: List[str], batch_size: int, pool: Any = None) -> List[List[float]]:
+    model = get_model()
+    if pool is not None:
+        vectors = model.encode_multi_process(texts, pool, batch_size=batch_size, normalize_embeddings=True)
+    else:
+        vectors = model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+    vectors = np.nan_to_num(vectors, nan=0.0, posinf=0.0, neginf=0.0)
+    return [vec.astype(float).tolist() for vec in vectors]
+
+
+def encode_texts(
+    texts: List[str],
+    batch_size: int = 32,
+    pool: Any = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[List[float]]:
+    """
+    Encode + L2-normalize texts (cosine ready); returns plain float lists for Supabase.
+
+    Texts are looked up in the content-hash cache first (see embed_cache); only unseen
+    texts are encoded, each distinct text once, and the results are added to the cache.
+    `stats` (if given) accumulates total / cache_hits / encoded counts.
+    """
+    if not texts:
+        return []
 
-_model: Optional[SentenceTransformer] = None
+    cache = get_cache()
+    hashes = [text_hash(t) for t in texts]
+    known = cache.get_many(EMBEDDING_MODEL, hashes) if cache else {}
+    if cache:
+        hits = sum(1 for h in hashes if h in known)
+        cache_hit("policy_embed", n=hits)
+        cache_hit("policy_embed", hit=False, n=len(hashes) - hits)
 
-def get_model() -> SentenceTransformer:
-    global _model
-    if _model is None:
-        print("initializing SentenceTransformer once...")
-        _model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
-    return _model
+    missing: Dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in known and h not in missing:
+            missing[h] = t
+    if missing:
+        fresh = _encode_raw(list(missing.values()), batch_size, pool=pool)
+        new_items = list(zip(missing.keys(), fresh))
+        known.update(new_items)
+        if cache:
+            cache.put_many(EMBEDDING_MODEL, new_items)
+
+    if stats is not None:
+        stats["total"] = stats.get("total", 0) + len(texts)
+        stats["encoded"] = stats.get("encoded", 0) + len(missing)
+        stats["cache_hits"] = stats.get("cache_hits", 0) + sum(1 for h in hashes if h not in missing)
+    return [known[h] for h in hashes]
+
+
+def dedup_ratio(stats: Dict[str, int]) -> float:
+    """Share of texts that did not need encoding (cache hits + in-batch duplicates)."""
+    total = stats.get("total", 0)
+    return 1.0 - stats.get("encoded", 0) / total if total else 0.0
 
 
 def _chunks(lst: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
     return [lst[i:i + size] for i in range(0, len(lst), size)]
 
 
+def _iter_pages(
+    policy_name: Optional[str],
+    only_missing: bool,
+    page_size: int,
+    start_after_id: Optional[Any],
+) -> Iterator[List[Dict[str, Any]]]:
+    """Keyset pagination over policy_chunks (ordered by id), fetching only id + content."""
+    last_id = start_after_id
+    while True:
+        q = supabase.table("policy_chunks").select("id,content")
+        if policy_name:
+            q = q.eq("policy_name", policy_name)
+        if only_missing:
+            q = q.is_("embedding", "null")
+        if last_id is not None:
+            q = q.gt("id", last_id)
+        rows = q.order("id").limit(page_size).execute().data or []
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+        if len(rows) < page_size:
+            return
+
+
+def _prefetch(pages: Iterator[List[Dict[str, Any]]], depth: int) -> Iterator[List[Dict[str, Any]]]:
+    """Runs the page fetches in a thread, `depth` pages ahead of the consumer (bounded queue)."""
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, depth))
+    done = object()
+
+    def _producer():
+        try:
+            for page in pages:
+                q.put(page)
+            q.put(done)
+        except BaseException as e:  # surface fetch errors to the consumer
+            q.put(e)
+
+    threading.Thread(target=_producer, name="policy-chunk-fetch", daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def _read_checkpoint(path: Optional[str]) -> Optional[Any]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        raw = f.read().strip()
+    if not raw:
+        return None
+    return int(raw) if raw.isdigit() else raw
+
+
 def embed_policies(
     policy_name: Optional[str] = None,
     batch_size: int = 32,
-    update_batch_size: int = 50,
+    update_batch_size: int = 200,
     skip_if_embedding_exists: bool = True,
+    page_size: int = 1000,
+    prefetch_pages: int = 2,
+    encode_processes: int = 1,
+    start_after_id: Optional[Any] = None,
+    checkpoint_file: Optional[str] = None,
 ):
     """
     Embeds policy_chunks.content into policy_chunks.embedding
 
-    Faster + safer:
-    - model initialized lazily (not on import)
-    - embedding is batched
-    - updates are batched
-    - optionally skip rows where embedding already exists
+    Streams the table in bounded memory as a 3-stage pipeline:
+    - fetch: keyset-paginated pages (id + content only; with skip_if_embedding_exists,
+      only rows whose embedding is null) read ahead by a thread into a bounded queue
+    - encode: batched, normalized; `encode_processes > 1` uses a sentence-transformers
+      multi-process pool
+    - write: bulk write-back (batched RPC), several batches in flight
+
+    Resumable: with skip_if_embedding_exists a rerun simply continues with the rows that
+    are still null. For a full re-embed (skip_if_embedding_exists=False, e.g. after a
+    model change) pass `checkpoint_file`: the id of the last written batch is stored there
+    until the job completes, and an interrupted run restarts after it (or pass
+    `start_after_id` explicitly).
+
+    Returns { embedded, failed_ids, last_id, dedup_ratio }.
     """
-    print("fetching chunks from supabase...")
-
-    q = supabase.table("policy_chunks").select("id,content,embedding")
-    if policy_name:
-        q = q.eq("policy_name", policy_name)
-    # If your table is large, add pagination later. For demo, fetch all:
-    rows = q.execute().data
-
-    if not rows:
-        print("no chunks found in supabase!")
-        return
-
-    # Filter empty + already embedded
-    todo = []
-    for r in rows:
-        text = (r.get("content") or "").strip()
-        if not text:
-            continue
-        if skip_if_embedding_exists and r.get("embedding") is not None:
-            continue
-        todo.append({"id": r["id"], "content": text})
-
-    if not todo:
-        print("nothing to embed (all chunks already embedded or empty).")
-        return
-
-    print(f"fetched {len(rows)} chunks; embedding {len(todo)} chunks...")
+    if start_after_id is None:
+        start_after_id = _read_checkpoint(checkpoint_file)
+    print(f"streaming chunks from supabase (start_after_id={start_after_id})...")
 
-    model = get_model()
+    # the model itself is loaded lazily by encode_texts (fully cached runs never load it)
+    pool = get_model().start_multi_process_pool(["cpu"] * encode_processes) if encode_processes > 1 else None
 
-    updates: List[Dict[str, Any]] = []
-    done = 0
+    writer = EmbeddingWriter(checkpoint_file=checkpoint_file)
+    stats: Dict[str, int] = {}
+    fetched = queued = 0
+    started = time.perf_counter()
+    try:
+        pages = _iter_pages(policy_name, skip_if_embedding_exists, page_size, start_after_id)
+        for rows in _prefetch(pages, prefetch_pages):
+            fetched += len(rows)
+            todo = [
+                {"id": r["id"], "content": (r.get("content") or "").strip()}
+                for r in rows
+                if (r.get("content") or "").strip()
+            ]
+            if not todo:
+                continue
 
-    for batch in _chunks(todo, batch_size):
-        texts = [b["content"] for b in batch]
+            # ✅ Batch encode + normalize (good for cosine search); cached texts are skipped
+            vectors = encode_texts([t["content"] for t in todo], batch_size=batch_size, pool=pool, stats=stats)
 
-        # ✅ Batch encode + normalize (good for cosine search)
-        vectors = model.encode(
-            texts,
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-            show_progress_bar=False,
-        )
-        vectors = np.nan_to_num(vectors, nan=0.0, posinf=0.0, neginf=0.0)
+            updates = [{"id": t["id"], "embedding": v} for t, v in zip(todo, vectors)]
+            # Bulk write-back to Supabase (runs in the background while we keep encoding)
+            for part in _chunks(updates, update_batch_size):
+                writer.submit(part)
+            queued += len(updates)
 
-        for item, vec in zip(batch, vectors):
-            updates.append({"id": item["id"], "embedding": vec.astype(float).tolist()})
+            rate = queued / max(time.perf_counter() - started, 1e-9)
+            print(
+                f"fetched {fetched} | embedded {queued} | written {writer.written} | "
+                f"{rate:.1f} chunks/sec | dedup {dedup_ratio(stats):.1%}"
+            )
+    finally:
+        failed_ids = writer.close()
+        if pool is not None:
+            get_model().stop_multi_process_pool(pool)
 
-        # Batch update to Supabase (chunked)
-        if len(updates) >= update_batch_size:
-            _flush_updates(updates)
-            done += len(updates)
-            print(f"embedded+updated {done}/{len(todo)}")
-            updates.clear()
+    if not fetched:
+        print("nothing to embed (all chunks already embedded or none found).")
+    if checkpoint_file and not failed_ids and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)  # finished cleanly: next run starts from the beginning
 
-    if updates:
-        _flush_updates(updates)
-        done += len(updates)
-        print(f"embedded+updated {done}/{len(todo)}")
+    print(
+        f"Embedding complete! written={writer.written} failed={len(failed_ids)} "
+        f"last_id={writer.last_id} dedup={dedup_ratio(stats):.1%}"
+    )
+    if failed_ids:
+        print(f"failed chunk ids: {failed_ids[:20]}{' ...' if len(failed_ids) > 20 else ''}")
+    return {
+        "embedded": writer.written,
+        "failed_ids": failed_ids,
+        "last_id": writer.last_id,
+        "dedup_ratio": round(dedup_ratio(stats), 4),
+    }
 
-    print("Embedding complete!")
 
+def _vector_literal(vec: List[float]) -> str:
+    """Compact pgvector text encoding ("[0.0123457,...]"), ~3x smaller than a JSON float list."""
+    return "[" + ",".join(format(x, ".7g") for x in vec) + "]"
 
-def _flush_updates(updates: List[Dict[str, Any]]):
+
+# None = not probed yet; False once the RPC is known to be missing (checked once per process)
+_rpc_available: Optional[bool] = None
+_rpc_lock = threading.Lock()  # writer threads share the flag
+
+
+def _flush_updates(updates: List[Dict[str, Any]]) -> int:
     """
-    Updates rows one-by-one because supabase-python update() doesn't do bulk upsert cleanly across all versions.
-    Still reduces overhead by doing embeddings in batches.
+    Writes one batch of embeddings back in a single round trip using the batched RPC:
+
+        create or replace function set_policy_chunk_embeddings(ids bigint[], embeddings text[])
+        returns integer language sql as $$
+          with u as (
+            update policy_chunks c set embedding = v.embedding::vector
+            from unnest(ids, embeddings) as v(id, embedding)
+            where c.id = v.id
+            returning 1
+          )
+          select count(*)::int from u;
+        $$;
+
+    Only if the RPC isn't installed (function not found) does it fall back to per-row
+    update() (still with the compact encoding); timeouts, 5xx and connection errors are
+    raised so the writer retries the batch.
     """
-    for u in updates:
-        supabase.table("policy_chunks").update({"embedding": u["embedding"]}).eq("id", u["id"]).execute()
+    global _rpc_available
+    ids = [u["id"] for u in updates]
+    literals = [_vector_literal(u["embedding"]) for u in updates]
+
+    with _rpc_lock:
+        use_rpc = _rpc_available is not False
+    if use_rpc:
+        try:
+            supabase.rpc(settings.POLICY_EMBED_WRITE_RPC, {"ids": ids, "embeddings": literals}).execute()
+            with _rpc_lock:
+                _rpc_available = True
+            return len(updates)
+        except Exception as e:
+            if not is_missing_function(e):
+                raise  # transient or real failure -> let the caller retry
+            with _rpc_lock:
+                if _rpc_available is not False:
+                    print(f"RPC {settings.POLICY_EMBED_WRITE_RPC} not installed; falling back to per-row updates")
+                _rpc_available = False
+
+    for row_id, literal in zip(ids, literals):
+        supabase.table("policy_chunks").update({"embedding": literal}).eq("id", row_id).execute()
+    return len(updates)
+
+
+class EmbeddingWriter:
+    """
+    Bounded-concurrency write-back: at most POLICY_EMBED_WRITE_CONCURRENCY batches in flight,
+    each retried with jittered exponential backoff. Batches that still fail are
+    reported (not raised) so one bad batch doesn't lose the whole job.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        retries: Optional[int] = None,
+        checkpoint_file: Optional[str] = None,
+    ):
+        self.concurrency = max(1, concurrency or settings.POLICY_EMBED_WRITE_CONCURRENCY)
+        self.retries = settings.POLICY_EMBED_WRITE_RETRIES if retries is None else retries
+        self.checkpoint_file = checkpoint_file
+        self.written = 0
+        self.last_id: Optional[Any] = None  # last id of the newest batch written (batches complete in order)
+        self.failed_ids: List[Any] = []
+        self._inflight: Deque[Tuple[List[Any], Future]] = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    def submit(self, updates: List[Dict[str, Any]]):
+        while len(self._inflight) >= self.concurrency:
+            self._collect()
+        self._inflight.append(([u["id"] for u in updates], self._pool.submit(self._write, list(updates))))
+
+    def close(self) -> List[Any]:
+        try:
+            while self._inflight:
+                self._collect()
+        finally:
+            self._pool.shutdown(wait=True)
+        return self.failed_ids
+
+    def _collect(self):
+        ids, fut = self._inflight.popleft()
+        try:
+            self.written += fut.result()
+        except Exception as e:
+            print(f"write-back failed for {len(ids)} chunks: {e}")
+            self.failed_ids.extend(ids)
+            return
+        if ids:
+            self.last_id = ids[-1]
+            if self.checkpoint_file and not self.failed_ids:
+                with open(self.checkpoint_file, "w") as f:
+                    f.write(str(self.last_id))
+
+    def _write(self, updates: List[Dict[str, Any]]) -> int:
+        for attempt in range(self.retries + 1):
+            try:
+                return _flush_updates(updates)
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                time.sleep(min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5))
+        return 0
 
 
 if __name__ == "__main__":
-    embed_policies()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--policy_name", default=None)
+    parser.add_argument("--all", action="store_true", help="re-embed every chunk (e.g. after a model change)")
+    parser.add_argument("--page_size", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=1, help="encoder processes")
+    parser.add_argument("--checkpoint", default=None, help="file used to resume a full re-embed")
+    args = parser.parse_args()
+
+    embed_policies(
+        policy_name=args.policy_name,
+        skip_if_embedding_exists=not args.all,
+        page_size=args.page_size,
+        encode_processes=args.processes,
+        checkpoint_file=args.checkpoint,
+    )
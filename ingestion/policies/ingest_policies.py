@@ -1,23 +1,65 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import os
-from typing import Optional
+import tempfile
+import time
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import PyPDF2
+from configs.settings import settings
+from core.supabase_client import postgrest_code, supabase
 
-from chonkie import RecursiveChunker
-from core.supabase_client import supabase
 
+def _pdf_page_count(local_path: str) -> int:
+    import PyPDF2
+
+    return len(PyPDF2.PdfReader(local_path).pages)
+
+
+def _extract_page_range(local_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Worker: (1-based page number, text) for pages [start, stop)."""
+    import PyPDF2
 
-def _extract_text_from_pdf(local_path: str) -> str:
     reader = PyPDF2.PdfReader(local_path)
-    text = ""
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + "\n"
-    return text
+    return [(i + 1, reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def iter_pdf_pages(
+    local_path: str,
+    workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (page number, text) in page order.
+    Pages are extracted in a process pool, `pages_per_task` contiguous pages per task,
+    with at most 2 tasks per worker in flight, so memory stays bounded and the first
+    pages are available long before the last ones are parsed.
+    """
+    workers = settings.PDF_EXTRACT_WORKERS if workers is None else workers
+    pages_per_task = max(1, pages_per_task or settings.PDF_PAGES_PER_TASK)
+    n_pages = _pdf_page_count(local_path)
+
+    if workers <= 1 or n_pages <= pages_per_task:
+        yield from _extract_page_range(local_path, 0, n_pages)
+        return
+
+    ranges = deque((a, min(a + pages_per_task, n_pages)) for a in range(0, n_pages, pages_per_task))
+    # spawn: the API runs ingestion from a thread, and forking a threaded process is unsafe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        inflight: Deque[Future] = deque()
+        while ranges or inflight:
+            while ranges and len(inflight) < workers * 2:
+                inflight.append(pool.submit(_extract_page_range, local_path, *ranges.popleft()))
+            yield from inflight.popleft().result()
+
+
+def _iter_docx_pages(local_path: str) -> Iterator[Tuple[Optional[int], str]]:
+    # DOCX has no pages; the whole body is one segment without page provenance
+    yield None, _extract_text_from_docx(local_path)
 
 
 def _extract_text_from_docx(local_path: str) -> str:
@@ -31,54 +73,268 @@ def _extract_text_from_docx(local_path: str) -> str:
     parts = [p.text for p in d.paragraphs if (p.text or "").strip()]
     return "\n".join(parts) + "\n"
 
-def ingest_policy(bucket: str, file_name: str, policy_name: str, policy_id: Optional[str] = None):
-    local_path = os.path.join("ingestion", "policies", file_name)
-
-    print("⬇️ downloading PDF from supabase...")
-    data = supabase.storage.from_(bucket).download(file_name)
-    if not data:
-        raise RuntimeError("failed to download PDF from supabase")
-
-    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-    with open(local_path, "wb") as f:
-        f.write(data)
-
-    ext = file_name.lower().rsplit(".", 1)[-1] if "." in file_name else ""
+def iter_pages(local_path: str, ext: str) -> Iterator[Tuple[Optional[int], str]]:
     if ext == "pdf":
         print("📖 reading PDF...")
-        text = _extract_text_from_pdf(local_path)
-    elif ext == "docx":
+        return iter_pdf_pages(local_path)
+    if ext == "docx":
         print("📖 reading DOCX...")
-        text = _extract_text_from_docx(local_path)
-    else:
-        raise RuntimeError(f"Unsupported policy file type: .{ext}")
+        return _iter_docx_pages(local_path)
+    raise RuntimeError(f"Unsupported policy file type: .{ext}")
+
+def extract_text(local_path: str, ext: str) -> str:
+    return "".join(text + "\n" for _, text in iter_pages(local_path, ext) if text)
+
+
+def iter_chunks(
+    pages: Iterable[Tuple[Optional[int], str]],
+    chunker: Any,
+    window_chars: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Streams page text through `chunker` in windows of ~`window_chars` characters and
+    yields (chunk text, first page, last page). The last chunk of each window may be
+    cut mid-paragraph, so its text is carried over into the next window instead of
+    being emitted; only the final window is flushed completely.
+    """
+    window_chars = window_chars or settings.CHUNK_WINDOW_CHARS
+    parts: List[str] = []
+    marks: List[Tuple[int, Optional[int]]] = []  # (offset in window, page number)
+    size = 0
+
+    def page_at(offset: int) -> Optional[int]:
+        i = bisect_right([m[0] for m in marks], offset) - 1
+        return marks[max(i, 0)][1] if marks else None
+
+    def run(final: bool):
+        nonlocal parts, marks, size
+        window = "".join(parts)
+        chunks = chunker.chunk(window) if window.strip() else []
+        if not final and len(chunks) < 2:
+            parts = [window]  # nothing safe to emit yet; keep growing the window
+            return
+        emit = chunks if final else chunks[:-1]
+        cursor = 0
+        for c in emit:
+            text = getattr(c, "text", str(c))
+            start = getattr(c, "start_index", None)
+            if start is None:
+                found = window.find(text, cursor)
+                start = found if found >= 0 else cursor
+            end = getattr(c, "end_index", None) or start + len(text)
+            cursor = end
+            yield text, page_at(start), page_at(max(end - 1, start))
+        if final:
+            parts, marks, size = [], [], 0
+            return
+        # carry the unfinished tail (and the page marks it spans) into the next window
+        tail = getattr(chunks[-1], "start_index", None)
+        tail = cursor if tail is None else tail
+        first = page_at(tail)
+        marks = [(0, first)] + [(o - tail, p) for o, p in marks if o > tail]
+        parts = [window[tail:]]
+        size = len(parts[0])
+
+    for page_no, text in pages:
+        if not text:
+            continue
+        marks.append((size, page_no))
+        parts.append(text + "\n")
+        size += len(text) + 1
+        if size >= window_chars:
+            yield from run(final=False)
+    yield from run(final=True)
+
+
+def _section_label(idx: int, first: Optional[int], last: Optional[int]) -> str:
+    if first is None:
+        return f"Section {idx}"
+    if last is None or last == first:
+        return f"Section {idx} (p. {first})"
+    return f"Section {idx} (p. {first}-{last})"
+
 
-    print(f"📄 extracted {len(text)} characters")
+# PostgREST "column not in the schema cache" / Postgres undefined_column
+_UNDEFINED_COLUMN_CODES = {"PGRST204", "42703"}
 
-    print("✂️ chunking...")
+
+class ChunkWriter:
+    """
+    Bulk inserter for policy_chunks: multi-row inserts of `batch_size` rows with at
+    most `concurrency` batches in flight. Whether the table has a `policy_id`
+    column is detected once, on the first batch, not per row.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        self.batch_size = batch_size or settings.INGEST_INSERT_BATCH_SIZE
+        self.concurrency = concurrency or settings.INGEST_INSERT_CONCURRENCY
+        self.with_policy_id: Optional[bool] = None
+        self.written = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._inflight: Deque[Future] = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    def add(self, rows: List[Dict[str, Any]]):
+        self._pending.extend(rows)
+        while len(self._pending) >= self.batch_size:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            self._submit(batch)
+
+    def close(self, flush: bool = True) -> int:
+        """
+        Writes the pending rows (unless `flush` is False, e.g. when the job failed), waits
+        for every in-flight batch and then raises the first batch error, if any.
+        """
+        error: Optional[BaseException] = None
+        try:
+            if flush and self._pending:
+                self._submit(self._pending)
+        except Exception as e:
+            error = e
+        self._pending = []
+        while self._inflight:
+            try:
+                self.written += self._inflight.popleft().result()
+            except Exception as e:
+                error = error or e
+        self._pool.shutdown(wait=True)
+        if error is not None:
+            raise error
+        return self.written
+
+    def _submit(self, batch: List[Dict[str, Any]]):
+        if self.with_policy_id is None:
+            # first batch runs synchronously to detect the schema
+            self._detect_and_insert(batch)
+            return
+        if not self.with_policy_id:
+            for row in batch:
+                row.pop("policy_id", None)
+        while len(self._inflight) >= self.concurrency:
+            self.written += self._inflight.popleft().result()
+        self._inflight.append(self._pool.submit(self._insert, batch))
+
+    def _detect_and_insert(self, batch: List[Dict[str, Any]]):
+        if not any("policy_id" in row for row in batch):
+            self.with_policy_id = False
+            self.written += self._insert(batch)
+            return
+        try:
+            self.written += self._insert(batch)
+            self.with_policy_id = True
+        except Exception as e:
+            if postgrest_code(e) not in _UNDEFINED_COLUMN_CODES:
+                raise
+            # Backward compatible insert (the table has no policy_id column)
+            for row in batch:
+                row.pop("policy_id", None)
+            self.written += self._insert(batch)
+            self.with_policy_id = False
+
+    @staticmethod
+    def _insert(batch: List[Dict[str, Any]]) -> int:
+        supabase.table("policy_chunks").insert(batch).execute()
+        return len(batch)
+
+
+def ingest_policy_file(
+    local_path: str,
+    policy_name: str,
+    policy_id: Optional[str] = None,
+    embed: bool = True,
+    batch_size: int = 32,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> int:
+    """
+    Parses a local policy file and stores its chunks in one streaming pass:
+    pages -> chunk -> (embed) -> insert, batch by batch, so the first rows land
+    (already embedded) while later pages are still being extracted.
+
+    Returns the number of chunks stored. `progress(done, None)` is called per batch
+    (the total isn't known until the last page); `stats` (if given) receives the
+    embedding cache counters (see embed_policies.encode_texts).
+    """
+    ext = local_path.lower().rsplit(".", 1)[-1] if "." in local_path else ""
+    from chonkie import RecursiveChunker
     chunker = RecursiveChunker()
-    chunks = chunker.chunk(text)
-    print(f"generated {len(chunks)} chunks")
-
-    print("📥 inserting chunks into Supabase...")
-    for idx, chunk in enumerate(chunks):
-        row = {
-            "policy_name": policy_name,
-            "section": f"Section {idx+1}",
-            "content": getattr(chunk, "text", str(chunk)),
-        }
-        if policy_id:
-            # If the Supabase table doesn't have this column, we'll fall back.
-            row["policy_id"] = policy_id
 
+    print("📥 chunking + inserting chunks into Supabase...")
+    started = time.perf_counter()
+    writer = ChunkWriter()
+    done = 0
+    first_chunk_at: Optional[float] = None
+    batch: List[Tuple[str, Optional[int], Optional[int]]] = []
+
+    def flush():
+        nonlocal done
+        rows: List[Dict[str, Any]] = []
+        for idx, (text, first, last) in enumerate(batch, done + 1):
+            row: Dict[str, Any] = {
+                "policy_name": policy_name,
+                "section": _section_label(idx, first, last),
+                "content": text,
+            }
+            if policy_id:
+                # If the Supabase table doesn't have this column, we'll fall back.
+                row["policy_id"] = policy_id
+            rows.append(row)
+
+        if embed:
+            from ingestion.policies.embed_policies import encode_texts
+            vectors = encode_texts([r["content"] for r in rows], batch_size=batch_size, stats=stats)
+            for row, vec in zip(rows, vectors):
+                # every row carries the key so multi-row inserts share one column set
+                row["embedding"] = vec if row["content"].strip() else None
+
+        writer.add(rows)
+        done += len(rows)
+        batch.clear()
+        if progress:
+            progress(done, None)
+
+    try:
+        for chunk in iter_chunks(iter_pages(local_path, ext), chunker):
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter() - started
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    except BaseException:
+        # stop the writer pool and surface what the in-flight inserts did, then re-raise
         try:
-            supabase.table("policy_chunks").insert(row).execute()
-        except Exception:
-            # Backward compatible insert (in case policy_id column doesn't exist)
-            row.pop("policy_id", None)
-            supabase.table("policy_chunks").insert(row).execute()
+            writer.close(flush=False)
+        except Exception as e:
+            print(f"⚠️ in-flight chunk inserts also failed: {e}")
+        raise
 
-    print("✅ ingestion complete")
+    written = writer.close()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"✅ ingestion complete: {written} chunks in {elapsed:.2f}s ({written / elapsed:.1f} chunks/sec"
+        f", first chunk after {first_chunk_at or 0.0:.2f}s)"
+    )
+    return written
+
+
+def ingest_policy(bucket: str, file_name: str, policy_name: str, policy_id: Optional[str] = None, embed: bool = False) -> int:
+    """Downloads `file_name` from Supabase Storage to a temp file and ingests it."""
+    print("⬇️ downloading PDF from supabase...")
+    data = supabase.storage.from_(bucket).download(file_name)
+    if not data:
+        raise RuntimeError("failed to download PDF from supabase")
+
+    ext = file_name.lower().rsplit(".", 1)[-1] if "." in file_name else ""
+    fd, local_path = tempfile.mkstemp(suffix=f".{ext}" if ext else "")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return ingest_policy_file(local_path, policy_name, policy_id=policy_id, embed=embed)
+    finally:
+        os.remove(local_path)
 
 
 if __name__ == "__main__":
@@ -87,6 +343,7 @@ if __name__ == "__main__":
     parser.add_argument("--file", required=True)
     parser.add_argument("--policy_name", required=True)
     parser.add_argument("--policy_id", default=None)
+    parser.add_argument("--embed", action="store_true", help="embed chunks while ingesting")
     args = parser.parse_args()
 
-    ingest_policy(args.bucket, args.file, args.policy_name, policy_id=args.policy_id)
+    ingest_policy(args.bucket, args.file, args.policy_name, policy_id=args.policy_id, embed=args.embed)
@@ -25,16 +25,33 @@ def _qdrant_search(client, collection: str, query_vector: List[float], limit: in
 
     raise RuntimeError("Your qdrant-client has neither search() nor query_points(). Please upgrade it.")
 
-def retrieve_neighbors(
-    query_vector: List[float],
-    applicant_payload: Optional[dict] = None,
-    top_k: int = 10
-) -> List[Dict[str, Any]]:
-    client = get_qdrant()
-    col = get_collection()
+def _qdrant_search_batch(client, collection: str, query_vectors: List[List[float]], limit: int, with_payload: Any = True):
+    """
+    One round trip for many queries; returns a list of hit lists (same order as the queries).
+    with_payload: True, or a list of payload keys to fetch (much smaller responses).
+    """
+    # Newer clients: query_batch_points()
+    if hasattr(client, "query_batch_points"):
+        from qdrant_client import models
 
-    hits = _qdrant_search(client, col, query_vector, top_k)
+        res = client.query_batch_points(
+            collection_name=collection,
+            requests=[models.QueryRequest(query=v, limit=limit, with_payload=with_payload) for v in query_vectors],
+        )
+        return [r.points for r in res]
+
+    # Older clients: search_batch()
+    if hasattr(client, "search_batch"):
+        from qdrant_client import models
+
+        return client.search_batch(
+            collection_name=collection,
+            requests=[models.SearchRequest(vector=v, limit=limit, with_payload=with_payload) for v in query_vectors],
+        )
+
+    return [_qdrant_search(client, collection, v, limit) for v in query_vectors]
 
+def _to_neighbors(hits, applicant_payload: Optional[dict]) -> List[Dict[str, Any]]:
     out = []
     for h in hits:
         payload = getattr(h, "payload", None) or {}
@@ -52,6 +69,35 @@ def retrieve_neighbors(
         })
     return out
 
+def retrieve_neighbors(
+    query_vector: List[float],
+    applicant_payload: Optional[dict] = None,
+    top_k: int = 10
+) -> List[Dict[str, Any]]:
+    client = get_qdrant()
+    col = get_collection()
+
+    hits = _qdrant_search(client, col, query_vector, top_k)
+    return _to_neighbors(hits, applicant_payload)
+
+def retrieve_neighbors_batch(
+    query_vectors: List[List[float]],
+    applicant_payloads: Optional[List[dict]] = None,
+    top_k: int = 10,
+    batch_size: int = 256,
+) -> List[List[Dict[str, Any]]]:
+    """retrieve_neighbors for many applicants, `batch_size` queries per Qdrant request."""
+    client = get_qdrant()
+    col = get_collection()
+    payloads = applicant_payloads or [{}] * len(query_vectors)
+
+    out: List[List[Dict[str, Any]]] = []
+    for start in range(0, len(query_vectors), batch_size):
+        hit_lists = _qdrant_search_batch(client, col, query_vectors[start:start + batch_size], top_k)
+        for hits, payload in zip(hit_lists, payloads[start:start + batch_size]):
+            out.append(_to_neighbors(hits, payload))
+    return out
+
 def summarize_neighbor_stats(neighbors: List[Dict[str, Any]]) -> Dict[str, Any]:
     known = [n for n in neighbors if n.get("loan_paid_back") in (0, 1)]
     if not known:
@@ -1,21 +1,18 @@
 # retrieval/qdrant/client.py
 import os
-from functools import lru_cache
-from qdrant_client import QdrantClient
+from typing import TYPE_CHECKING
 from configs.settings import settings
+from core.connections import connections
 
-@lru_cache(maxsize=1)
-def get_qdrant() -> QdrantClient:
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+def get_qdrant() -> "QdrantClient":
     """
-    Returns a cached QdrantClient.
+    Returns the process-wide pooled QdrantClient (see core/connections.py).
     Works with local docker qdrant (http://localhost:6333)
     """
-    url = getattr(settings, "QDRANT_URL", None) or os.getenv("QDRANT_URL", "http://localhost:6333")
-    api_key = getattr(settings, "QDRANT_API_KEY", None) or os.getenv("QDRANT_API_KEY", None)
-
-    if api_key:
-        return QdrantClient(url=url, api_key=api_key)
-    return QdrantClient(url=url)
+    return connections.qdrant()
 
 def get_collection() -> str:
     """
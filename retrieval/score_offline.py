@@ -0,0 +1,230 @@
+"""
+Offline neighbor-risk scoring (no LLM).
+
+    python -m retrieval.score_offline --input applicants.csv --out out/scores \
+        [--index qdrant | --index local --reference ingestion/dataset1_profiles/loan_dataset_20000.csv] \
+        [--top_k 10] [--shard_rows 100000] [--workers 4]
+
+Streams the input (CSV or Parquet) in shards of --shard_rows rows. Each shard is
+encoded with one vectorized feature build + batched encoder forward, its neighbors
+are retrieved in batches (Qdrant query_batch_points, or an exact in-memory index
+built from a labelled reference file), and it is written to
+<out>/part-<shard>.parquet with:
+
+    row_id, applicant_id, default_prob, embedding, neighbor_ids,
+    neighbor_similarities, neighbor_default_rate, known_labels
+
+Parts are written atomically (tmp + rename); rerunning the same command skips
+parts that already exist, so an interrupted run resumes where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+_QDRANT_BATCH = 256
+_LOCAL_QUERY_BLOCK = 4096
+
+# per-process state, set up once by _init_worker
+_state: Dict[str, Any] = {}
+
+
+# ---------- input ----------
+def iter_shards(path: str, shard_rows: int) -> Iterator[Tuple[int, "Any"]]:
+    """(shard number, DataFrame) in file order, reading `shard_rows` rows at a time."""
+    import pandas as pd
+
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for k, batch in enumerate(pq.ParquetFile(path).iter_batches(batch_size=shard_rows)):
+            yield k, batch.to_pandas()
+        return
+    for k, df in enumerate(pd.read_csv(path, chunksize=shard_rows)):
+        yield k, df
+
+
+def part_path(out_dir: str, shard: int) -> str:
+    return os.path.join(out_dir, f"part-{shard:05d}.parquet")
+
+
+# ---------- local exact index ----------
+def build_local_index(reference: str, cache_path: str):
+    """Encodes a labelled reference file once and caches (embeddings, ids, labels) as .npz."""
+    if os.path.exists(cache_path):
+        return cache_path
+    import pandas as pd
+    from core.encoder_runtime import build_feature_matrix, get_encoder_bundle
+
+    df = pd.read_parquet(reference) if reference.lower().endswith(".parquet") else pd.read_csv(reference)
+    if "loan_paid_back" not in df.columns:
+        raise ValueError("reference file must contain a 'loan_paid_back' column")
+    bundle = get_encoder_bundle()
+    emb, _ = bundle.embed_and_score_matrix(build_feature_matrix(df, bundle.feature_cols))
+    # same applicant_id convention as ingestion/dataset1_profiles (row position)
+    ids = df["applicant_id"].astype(str).to_numpy() if "applicant_id" in df.columns else np.arange(len(df)).astype(str)
+    labels = pd.to_numeric(df["loan_paid_back"], errors="coerce").fillna(-1).astype(np.int8).to_numpy()
+
+    tmp = cache_path + ".tmp.npz"
+    np.savez(tmp, emb=emb.astype(np.float32), ids=ids, labels=labels)
+    os.replace(tmp, cache_path)
+    print(f"local index: {len(df)} reference rows cached at {cache_path}")
+    return cache_path
+
+
+def _local_search(emb: np.ndarray, top_k: int):
+    index = _state["local"]
+    ref, ids, labels = index["emb"], index["ids"], index["labels"]
+    k = min(top_k, len(ref))
+    out_ids = np.empty((len(emb), k), dtype=object)
+    out_sims = np.empty((len(emb), k), dtype=np.float32)
+    out_labels = np.empty((len(emb), k), dtype=np.int8)
+    for start in range(0, len(emb), _LOCAL_QUERY_BLOCK):
+        sims = emb[start:start + _LOCAL_QUERY_BLOCK] @ ref.T
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(sims, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        out_ids[start:start + len(top)] = ids[top]
+        out_sims[start:start + len(top)] = np.take_along_axis(sims, top, axis=1)
+        out_labels[start:start + len(top)] = labels[top]
+    return out_ids.tolist(), out_sims.tolist(), out_labels.tolist()
+
+
+def _qdrant_search(emb: np.ndarray, top_k: int):
+    from retrieval.neighbors import _qdrant_search_batch
+    from retrieval.qdrant.client import get_collection, get_qdrant
+
+    client, col = get_qdrant(), get_collection()
+    ids, sims, labels = [], [], []
+    for start in range(0, len(emb), _QDRANT_BATCH):
+        block = emb[start:start + _QDRANT_BATCH].tolist()
+        for hits in _qdrant_search_batch(client, col, block, top_k, with_payload=["applicant_id", "loan_paid_back"]):
+            payloads = [getattr(h, "payload", None) or {} for h in hits]
+            ids.append([str(p.get("applicant_id", getattr(h, "id", ""))) for p, h in zip(payloads, hits)])
+            sims.append([float(getattr(h, "score", 0.0) or 0.0) for h in hits])
+            labels.append([int(p["loan_paid_back"]) if p.get("loan_paid_back") is not None else -1 for p in payloads])
+    return ids, sims, labels
+
+
+# ---------- worker ----------
+def _init_worker(index: str, local_cache: Optional[str]):
+    _state["index"] = index
+    if local_cache:
+        data = np.load(local_cache, allow_pickle=True)
+        _state["local"] = {"emb": data["emb"], "ids": data["ids"], "labels": data["labels"]}
+
+
+def score_shard(shard: int, df, out_dir: str, top_k: int, row_offset: int) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from core.encoder_runtime import build_feature_matrix, get_encoder_bundle
+
+    bundle = get_encoder_bundle()
+    emb, probs = bundle.embed_and_score_matrix(build_feature_matrix(df, bundle.feature_cols))
+    emb = emb.astype(np.float32)
+
+    search = _local_search if _state.get("index") == "local" else _qdrant_search
+    ids, sims, labels = search(emb, top_k)
+
+    lab = np.asarray([[x for x in row if x in (0, 1)] for row in labels], dtype=object)
+    known = np.fromiter((len(r) for r in lab), dtype=np.int32, count=len(lab))
+    defaulted = np.fromiter((len(r) - sum(r) for r in lab), dtype=np.float64, count=len(lab))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        default_rate = np.where(known > 0, defaulted / np.maximum(known, 1), np.nan)
+
+    dim = emb.shape[1]
+    applicant_ids = (
+        df["applicant_id"].astype(str).tolist()
+        if "applicant_id" in df.columns
+        else [None] * len(df)
+    )
+    table = pa.table({
+        "row_id": pa.array(np.arange(row_offset, row_offset + len(df), dtype=np.int64)),
+        "applicant_id": pa.array(applicant_ids, type=pa.string()),
+        "default_prob": pa.array(np.asarray(probs, dtype=np.float32)),
+        "embedding": pa.FixedSizeListArray.from_arrays(pa.array(emb.ravel()), dim),
+        "neighbor_ids": pa.array(ids, type=pa.list_(pa.string())),
+        "neighbor_similarities": pa.array(sims, type=pa.list_(pa.float32())),
+        "neighbor_default_rate": pa.array(default_rate.astype(np.float32), from_pandas=True),
+        "known_labels": pa.array(known),
+    })
+
+    final = part_path(out_dir, shard)
+    tmp = final + ".tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, final)
+    return len(df)
+
+
+# ---------- driver ----------
+def run(
+    input_path: str,
+    out_dir: str,
+    index: str = "qdrant",
+    reference: Optional[str] = None,
+    top_k: int = 10,
+    shard_rows: int = 100_000,
+    workers: int = 4,
+) -> Dict[str, Any]:
+    os.makedirs(out_dir, exist_ok=True)
+    local_cache = None
+    if index == "local":
+        if not reference:
+            raise ValueError("--index local needs --reference (a labelled CSV/Parquet)")
+        local_cache = build_local_index(reference, os.path.join(out_dir, "_local_index.npz"))
+
+    started = time.perf_counter()
+    scored = skipped = 0
+    # spawn: torch + a forked parent don't mix; each worker loads the encoder once
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers), mp_context=ctx, initializer=_init_worker, initargs=(index, local_cache),
+    ) as pool:
+        inflight: Deque[Future] = deque()
+        offset = 0
+        for shard, df in iter_shards(input_path, shard_rows):
+            rows = len(df)
+            if os.path.exists(part_path(out_dir, shard)):
+                skipped += 1
+            else:
+                while len(inflight) >= max(1, workers) * 2:
+                    scored += inflight.popleft().result()
+                inflight.append(pool.submit(score_shard, shard, df, out_dir, top_k, offset))
+            offset += rows
+        while inflight:
+            scored += inflight.popleft().result()
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    summary = {
+        "rows_scored": scored,
+        "shards_skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(scored / elapsed, 1),
+    }
+    print(f"✅ offline scoring: {summary}")
+    return summary
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--input", required=True, help="CSV or Parquet of raw applicants")
+    p.add_argument("--out", required=True, help="output directory for part-*.parquet")
+    p.add_argument("--index", choices=["qdrant", "local"], default="qdrant")
+    p.add_argument("--reference", default=None, help="labelled CSV/Parquet for --index local")
+    p.add_argument("--top_k", type=int, default=10)
+    p.add_argument("--shard_rows", type=int, default=100_000)
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    args = p.parse_args()
+
+    run(args.input, args.out, args.index, args.reference, args.top_k, args.shard_rows, args.workers)
+
+
+if __name__ == "__main__":
+    main()
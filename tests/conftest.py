@@ -0,0 +1,5 @@
+import os
+
+# configs.settings requires provider keys at import; tests never call the provider
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("STARTUP_WARMUP", "false")
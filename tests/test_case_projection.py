@@ -0,0 +1,21 @@
+import pytest
+from fastapi import HTTPException
+
+from apps.api.routes_cases import _parse_fields, _project, fail_case, new_case
+
+
+def test_failed_case_error_is_projected():
+    case_id = new_case(None, source="batch")
+    fail_case(case_id, "scoring failed: encoder unavailable")
+
+    fields = _parse_fields("status,error")
+    assert _project(case_id, "full", fields) == {
+        "case_id": case_id, "status": "failed", "error": "scoring failed: encoder unavailable",
+    }
+    assert _project(case_id, "summary")["error"] == "scoring failed: encoder unavailable"
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(HTTPException) as e:
+        _parse_fields("error,nope")
+    assert e.value.status_code == 400
@@ -0,0 +1,51 @@
+from workflow.utils import consensus, extract_recommendation
+
+
+def _msg(speaker, content):
+    return {"speaker": speaker, "content": content, "validated": False, "stage": "opening"}
+
+
+RISK_REJECT = "1) Decision recommendation: **REJECT**\n2) Two of three neighbors defaulted."
+
+
+def test_own_numbered_line():
+    assert extract_recommendation("1) Decision recommendation: **REVIEW**\n- thin file") == "REVIEW"
+    assert extract_recommendation("**Decision recommendation:** approve") == "APPROVE"
+    assert extract_recommendation("1) Decision recommendation (APPROVE or REVIEW)\n**APPROVE**") == "APPROVE"
+
+
+def test_quoting_the_opponent_is_not_a_recommendation():
+    text = (
+        "Countering the risk agent's recommendation: REJECT is overly cautious.\n"
+        "1) Decision recommendation (APPROVE or REVIEW): APPROVE\n"
+    )
+    assert extract_recommendation(text, "advocate") == "APPROVE"
+    assert consensus([_msg("risk", RISK_REJECT), _msg("advocate", text)]) is None
+
+
+def test_template_echo_reads_the_answer_not_the_options():
+    assert extract_recommendation("1) Decision recommendation (REJECT or REVIEW): REVIEW", "risk") == "REVIEW"
+    assert extract_recommendation("1) Decision recommendation (REJECT or REVIEW)") is None
+
+
+def test_negation_is_not_a_recommendation():
+    assert extract_recommendation("I would not recommend APPROVE for this applicant.") is None
+    assert extract_recommendation("1) Decision recommendation:\nnot APPROVE yet") is None
+
+
+def test_last_answer_line_wins():
+    text = "1) Decision recommendation: REVIEW\n...\n1) Decision recommendation: APPROVE"
+    assert extract_recommendation(text) == "APPROVE"
+
+
+def test_outside_the_agents_options_is_ignored():
+    # the risk prompt only offers REJECT / REVIEW, the advocate's APPROVE / REVIEW
+    assert extract_recommendation("1) Decision recommendation: APPROVE", "risk") is None
+    assert extract_recommendation("1) Decision recommendation: REJECT", "advocate") is None
+
+
+def test_consensus_only_on_a_shared_review():
+    risk = _msg("risk", "1) Decision recommendation (REJECT or REVIEW): REVIEW")
+    adv = _msg("advocate", "1) Decision recommendation: REVIEW")
+    assert consensus([risk, adv]) == "REVIEW"
+    assert consensus([_msg("risk", RISK_REJECT), _msg("advocate", "1) Decision recommendation: REJECT")]) is None
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from apps.api import dashboard_store
+from apps.api.dashboard_store import _THROUGHPUT, _hour_bucket, forget_case, snapshot, track_case
+
+
+def _decided(case_id, hours_ago):
+    ts = (datetime.utcnow() - timedelta(hours=hours_ago)).isoformat() + "Z"
+    return {"case_id": case_id, "status": "decided", "decided_at": ts,
+            "decision": {"verdict": "approve", "confidence": 0.8}, "applicant": {}}
+
+
+def test_moving_a_case_after_its_hour_was_pruned(monkeypatch):
+    old_hour = _hour_bucket(_decided("x", 3)["decided_at"])
+    track_case(_decided("dash-a", 3))
+    track_case(_decided("dash-b", 3))
+    assert _THROUGHPUT[old_hour] >= 2
+
+    monkeypatch.setattr(dashboard_store, "THROUGHPUT_HOURS", 2)
+    track_case(_decided("dash-c", 0))  # prunes the hour dash-a and dash-b were decided in
+    assert old_hour not in _THROUGHPUT
+
+    track_case({"case_id": "dash-a", "status": "running", "applicant": {}})  # re-run
+    forget_case("dash-b")
+    assert old_hour not in _THROUGHPUT
+    assert all(n >= 0 for n in _THROUGHPUT.values())
+
+    track_case(_decided("dash-a", 0))  # decided again: counted in the current hour
+    now_hour = _hour_bucket(_decided("x", 0)["decided_at"])
+    assert {"hour": now_hour, "decided": _THROUGHPUT[now_hour]} in snapshot()["throughput_hourly"]
+    assert _THROUGHPUT[now_hour] >= 2
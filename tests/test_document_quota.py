@@ -0,0 +1,41 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from apps.api import routes_cases
+from apps.api.routes_cases import DOCUMENTS, new_case, upload_document
+from configs.settings import settings
+
+
+@pytest.fixture
+def small_quota(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DOCUMENT_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 100)
+    monkeypatch.setattr(settings, "MAX_DOCUMENT_BYTES", 1000)
+    monkeypatch.setattr(settings, "MAX_CASE_DOCUMENT_BYTES", 1000)
+
+
+def _upload(i, size):
+    return UploadFile(io.BytesIO(bytes([i]) * size), filename=f"doc{i}.pdf")
+
+
+def test_concurrent_uploads_stay_within_the_case_quota(small_quota):
+    case_id = new_case(None)
+
+    async def main():
+        return await asyncio.gather(
+            *(upload_document(case_id, _upload(i, 600)) for i in range(3)), return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    accepted = [r for r in results if isinstance(r, dict)]
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(accepted) == 1 and len(rejected) == 2
+    assert all(r.status_code == 413 for r in rejected)
+    assert sum(d["size"] for d in DOCUMENTS[case_id]) == 600
+    assert case_id not in routes_cases._UPLOADS_RESERVED  # rejected uploads gave their bytes back
+
+    # the remaining quota is still usable
+    assert asyncio.run(upload_document(case_id, _upload(9, 400)))["document"]["size"] == 400
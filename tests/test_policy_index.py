@@ -0,0 +1,110 @@
+import hashlib
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import core.supabase_client
+from apps.retrieval.policy_index import PolicyIndex
+
+
+class _Query:
+    def __init__(self, db, count=None):
+        self.db, self.count, self.after = db, count, None
+        self.not_ = self
+
+    def select(self, cols, count=None):
+        return _Query(self.db, count)
+
+    def is_(self, col, value):
+        return self
+
+    def gt(self, col, value):
+        self.after = value
+        return self
+
+    def order(self, col):
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self.db.embedded() if self.after is None or r["id"] > self.after]
+        if self.count:
+            return SimpleNamespace(data=rows[:1], count=len(rows))
+        return SimpleNamespace(data=rows[: self.n])
+
+
+class FakePolicyChunks:
+    """policy_chunks behind the PostgREST calls the index makes (select, count, VERSION_RPC)."""
+
+    def __init__(self, with_version_rpc=True):
+        self.rows = {}
+        self.with_version_rpc = with_version_rpc
+
+    def put(self, row_id, vec):
+        self.rows[row_id] = {"id": row_id, "policy_name": "p", "section": "s", "content": f"c{row_id}",
+                             "embedding": json.dumps(vec)}
+
+    def embedded(self):
+        return [self.rows[k] for k in sorted(self.rows)]
+
+    def table(self, name):
+        return _Query(self)
+
+    def rpc(self, name, params):
+        if not self.with_version_rpc:
+            raise Exception({"code": "PGRST202", "message": "Could not find the function"})
+        digest = hashlib.md5(",".join(f"{r['id']}:{r['embedding']}" for r in self.embedded()).encode()).hexdigest()
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=f"{len(self.rows)}:{digest}"))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakePolicyChunks()
+    monkeypatch.setattr(core.supabase_client, "supabase", fake)
+    for i in (1, 2, 3):
+        fake.put(i, [1.0, 0.0])
+    return fake
+
+
+def _top_id(index, vec):
+    return index.search(np.asarray(vec, dtype=np.float32), k=1)[0]["id"]
+
+
+def test_reembed_with_same_ids_and_count_reloads(db):
+    index = PolicyIndex()
+    index.reload()
+    for i in (1, 2, 3):  # embed_policies --all with a new model, from another process
+        db.put(i, [0.0, 1.0] if i == 2 else [1.0, 0.0])
+    index.poll_once()
+    assert _top_id(index, [0.0, 1.0]) == 2
+
+
+def test_delete_and_insert_keeping_the_count_reloads(db):
+    index = PolicyIndex()
+    index.reload()
+    del db.rows[1]
+    db.put(0, [0.0, 1.0])  # a lower id than the newest one indexed
+    index.poll_once()
+    assert sorted(m["id"] for m in index._meta) == [0, 2, 3]
+
+
+def test_unchanged_table_is_not_reloaded(db):
+    index = PolicyIndex()
+    index.reload()
+    loaded_at = index.loaded_at
+    index.poll_once()
+    assert index.loaded_at == loaded_at
+
+
+def test_without_the_rpc_new_rows_are_still_picked_up(db):
+    db.with_version_rpc = False
+    index = PolicyIndex()
+    index.reload()
+    db.put(4, [0.0, 1.0])
+    index.poll_once()
+    assert index.size() == 4 and _top_id(index, [0.0, 1.0]) == 4
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from workflow.rate_limit import RateLimiter
+
+
+def test_first_call_on_a_fresh_limiter_does_not_wait():
+    limiter = RateLimiter("t", rpm=30, tpm=6000)  # the default quota
+    t0 = time.perf_counter()
+    asyncio.run(limiter.acquire(2000))
+    assert time.perf_counter() - t0 < 0.05
+    _, wait = limiter._reserve(2000)
+    assert wait == 0  # a second debate turn also fits in the minute's quota
+
+
+def test_waits_for_the_oldest_call_to_leave_the_window():
+    limiter = RateLimiter("t", rpm=2, tpm=None, headroom=1.0, period_seconds=10)
+    waits = [limiter._reserve(0)[1] for _ in range(4)]
+    assert waits[:2] == [0, 0]
+    assert 9 < waits[2] <= 10
+    admitted = [e[0] for e in limiter._requests.entries]
+    assert admitted == sorted(admitted)  # served in arrival order
+
+
+def test_settle_replaces_the_estimate():
+    limiter = RateLimiter("t", rpm=None, tpm=1000, headroom=1.0)
+    grant, _ = limiter._reserve(800)
+    grant.settle(100)  # the provider reported 100 tokens
+    assert limiter._reserve(800)[1] == 0
+
+
+def test_cancelled_waiter_is_refunded():
+    limiter = RateLimiter("t", rpm=1, tpm=None, headroom=1.0, period_seconds=5)
+
+    async def main():
+        await limiter.acquire(0)
+        waiter = asyncio.ensure_future(limiter.acquire(0))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert [e[1] for e in limiter._requests.entries] == [1.0, 0.0]
+
+
+def test_hedge_only_when_nobody_is_queued():
+    limiter = RateLimiter("t", rpm=2, tpm=None, headroom=1.0, period_seconds=5)
+    assert limiter.try_acquire(0) is not None
+    limiter._reserve(0)
+    assert limiter.try_acquire(0) is None
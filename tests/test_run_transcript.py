@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import uuid
+
+from apps.api.routes_case_run import record_run_failure
+from apps.api.run_store import append_message, get_transcript, set_run_status, wait_for_transcript
+
+
+def _run_with_messages(n):
+    run_id = str(uuid.uuid4())
+    set_run_status(run_id, "case-1", status="running", stage="opening", progress=20)
+    for i in range(n):
+        append_message(run_id, {"role": "RISK", "content": f"turn {i}", "stage": "opening"})
+    return run_id
+
+
+def test_since_cursor_returns_only_new_messages():
+    run_id = _run_with_messages(3)
+    page = get_transcript(run_id, since=2)
+    assert [m["seq"] for m in page["messages"]] == [3]
+    assert page["last_seq"] == 3
+
+
+def test_failure_message_arrives_with_the_terminal_status():
+    run_id = _run_with_messages(2)
+
+    async def poll():
+        # what a client does: wait past its cursor, read, stop once the status is terminal
+        waiting = asyncio.ensure_future(wait_for_transcript(run_id, since=2, timeout=5))
+        await asyncio.sleep(0.05)
+        threading.Thread(target=record_run_failure, args=(run_id, "case-1", RuntimeError("judge crashed"))).start()
+        await waiting
+        return get_transcript(run_id, since=2)
+
+    page = asyncio.run(poll())
+    assert page["status"] == "failed"
+    assert [m["content"] for m in page["messages"]] == ["Run failed: judge crashed"]
+    assert page["messages"][0]["seq"] == 3
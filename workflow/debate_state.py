@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Dict, Literal, Any
+from typing import TypedDict, List, Dict, Literal, Any, Tuple
 
 Stage = Literal["opening", "rebuttal", "counter", "final_argument", "verdict"]
 
@@ -32,3 +32,11 @@ class DebateState(TypedDict, total=False):
     times_adv_fact_checked: int
     validated: bool
     judge_verdict: Dict[str, Any]
+    # Schedule (see workflow/debate_workflow.py)
+    mode: Literal["standard", "fast"]
+    schedule: List[Tuple[str, str]]           # (stage, speaker) turns before the verdict
+    turn: int                                 # index into schedule of the turn just spoken
+    early_consensus: Dict[str, Any]           # set when the moderator stopped the debate early
+    # Fast mode: parallel opening branches write distinct keys, merged by the join node
+    risk_opening: DebateMessage
+    advocate_opening: DebateMessage
@@ -1,12 +1,56 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from langgraph.graph import StateGraph, END
 from workflow.debate_state import DebateState
+from workflow.resilience import retry_budget
 from workflow.nodes import (
-    RiskAgentNode, AdvocateAgentNode, ModeratorNode, JudgeNode,
-    NODE_RISK, NODE_ADV, NODE_MOD, NODE_JUDGE
+    RiskAgentNode, AdvocateAgentNode, ModeratorNode, JudgeNode, OpeningsJoinNode,
+    NODE_RISK, NODE_ADV, NODE_MOD, NODE_JUDGE,
+    NODE_RISK_OPEN, NODE_ADV_OPEN, NODE_JOIN,
 )
 
+MODES = ("standard", "fast")
+MODE_ALIASES = {"adversarial": "standard"}  # legacy frontend value
+DEFAULT_ROUNDS = 2  # opening/rebuttal + counter/final_argument
+
+
+def build_schedule(rounds: int = DEFAULT_ROUNDS) -> List[Tuple[str, str]]:
+    """
+    (stage, speaker) turns for a sequential debate of `rounds` risk/advocate exchanges:
+      round 1: opening(risk) -> rebuttal(advocate)
+      middle : counter(risk) -> rebuttal(advocate)
+      last   : counter(risk) -> final_argument(advocate)
+    rounds=2 is the original fixed schedule.
+    """
+    rounds = max(1, int(rounds))
+    turns = [("opening", "risk"), ("rebuttal", "advocate")]
+    for r in range(2, rounds + 1):
+        turns.append(("counter", "risk"))
+        turns.append(("final_argument" if r == rounds else "rebuttal", "advocate"))
+    return turns
+
+
 class CreditDebateWorkflow:
+    """
+    mode="standard": sequential risk/advocate turns routed by the moderator, then the judge.
+    mode="fast": risk and advocate openings run as parallel branches, no counter rounds,
+    straight to the judge (roughly half the wall-clock time; meant for pre-screening).
+    """
+
+    # compiled graphs are reusable across runs (nodes keep no per-run state)
+    _compiled: Dict[str, object] = {}
+
+    def __init__(self, mode: str = "standard", rounds: Optional[int] = None):
+        mode = MODE_ALIASES.get(mode, mode)
+        if mode not in MODES:
+            raise ValueError(f"Unknown debate mode: {mode} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.rounds = rounds or DEFAULT_ROUNDS
+
     def _build(self) -> StateGraph:
+        return self._build_fast() if self.mode == "fast" else self._build_standard()
+
+    def _build_standard(self) -> StateGraph:
         g = StateGraph(DebateState)
 
         g.add_node(NODE_RISK, RiskAgentNode())
@@ -28,6 +72,62 @@ class CreditDebateWorkflow:
 
         return g
 
-    async def run(self, initial_state: DebateState):
-        graph = self._build().compile()
-        return await graph.ainvoke(initial_state, config={"recursion_limit": 50})
+    def _build_fast(self) -> StateGraph:
+        g = StateGraph(DebateState)
+
+        # Parallel branches must write distinct state keys (a shared `messages` write in
+        # the same superstep would conflict); the join node merges them in a fixed order.
+        g.add_node(NODE_RISK_OPEN, RiskAgentNode(output_key="risk_opening"))
+        g.add_node(NODE_ADV_OPEN, AdvocateAgentNode(output_key="advocate_opening"))
+        g.add_node(NODE_JOIN, OpeningsJoinNode())
+        g.add_node(NODE_JUDGE, JudgeNode())
+
+        # Flow: (risk_opening || advocate_opening) -> join -> judge -> END
+        g.set_entry_point(NODE_RISK_OPEN)
+        g.set_entry_point(NODE_ADV_OPEN)
+        g.add_edge([NODE_RISK_OPEN, NODE_ADV_OPEN], NODE_JOIN)
+        g.add_edge(NODE_JOIN, NODE_JUDGE)
+        g.add_edge(NODE_JUDGE, END)
+
+        return g
+
+    def _graph(self):
+        graph = self._compiled.get(self.mode)
+        if graph is None:
+            graph = self._compiled[self.mode] = self._build().compile()
+        return graph
+
+    async def run(self, initial_state: DebateState, on_message: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Runs the debate and returns the final state.
+        on_message: called with each transcript message as soon as its node finishes
+        (the graph is streamed state by state instead of invoked in one call).
+        """
+        state: DebateState = {**initial_state, "mode": self.mode}  # type: ignore
+        if self.mode == "standard":
+            schedule = build_schedule(self.rounds)
+            state.update({
+                "schedule": schedule,
+                "turn": 0,
+                "stage": schedule[0][0],    # type: ignore
+                "speaker": schedule[0][1],  # type: ignore
+            })
+            recursion_limit = max(50, 2 * len(schedule) + 10)
+        else:
+            state.update({"stage": "opening"})
+            recursion_limit = 50
+        config = {"recursion_limit": recursion_limit}
+        # one retry budget for all LLM calls of this run (workflow/resilience.py)
+        with retry_budget():
+            if on_message is None:
+                return await self._graph().ainvoke(state, config=config)
+
+            final = state
+            seen = len(state.get("messages") or [])
+            async for values in self._graph().astream(state, config=config, stream_mode="values"):
+                final = values
+                msgs = values.get("messages") or []
+                for msg in msgs[seen:]:
+                    on_message(msg)
+                seen = max(seen, len(msgs))
+            return final
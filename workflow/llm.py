@@ -2,15 +2,65 @@ import os
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
+
+from core.metrics import record_llm_usage
+from workflow.rate_limit import estimate_tokens, provider_limiter, record_usage, using
+from workflow.resilience import get_caller
 
 def get_llm(temperature: float = 0.2):
     return ChatGroq(
         groq_api_key=os.getenv("GROQ_API_KEY"), # type: ignore
         model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
         temperature=temperature,
+        max_retries=0,  # retries/hedging/timeouts are handled by workflow.resilience
     )
 
-def build_chain(system_prompt: str, human_prompt: str, temperature: float = 0.2):
+def _token_usage(message):
+    """(prompt, completion) tokens from an AIMessage: usage_metadata, else Groq's token_usage."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+    meta = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return meta.get("prompt_tokens"), meta.get("completion_tokens")
+
+def _usage_recorder(name: str):
+    def record(message):
+        usage = _token_usage(message)
+        record_llm_usage(name, *usage)
+        record_usage(*usage)  # settle the rate limiter's estimate for this call
+        return message
+    return RunnableLambda(record)
+
+class ResilientChain:
+    """prompt | llm | parser with rate limiting, deadline, hedging, retries and the circuit breaker on ainvoke."""
+
+    def __init__(self, runnable, name: str, prompt=None):
+        self.runnable = runnable
+        self.name = name
+        self.prompt = prompt
+
+    def estimate_tokens(self, inputs) -> int:
+        try:
+            text = self.prompt.format(**inputs) if self.prompt is not None else str(inputs)
+        except Exception:
+            text = str(inputs)
+        return estimate_tokens(text)
+
+    async def ainvoke(self, inputs):
+        tokens = self.estimate_tokens(inputs)
+        return await get_caller(self.name).acall(lambda: self.runnable.ainvoke(inputs), tokens=tokens)
+
+    def invoke(self, inputs):
+        # sync callers (scripts) get the plain chain, still within the provider quota
+        grant = None
+        if provider_limiter.enabled:
+            grant = provider_limiter.acquire_sync(self.estimate_tokens(inputs), node=self.name)
+        with using(grant):
+            return self.runnable.invoke(inputs)
+
+def build_chain(system_prompt: str, human_prompt: str, temperature: float = 0.2, name: str = "llm"):
+    # name: the debate node using the chain (token/call counters in /metrics, latency window, per-node timeout)
     llm = get_llm(temperature=temperature)
     prompt = ChatPromptTemplate.from_messages([("system", system_prompt), ("human", human_prompt)])
-    return prompt | llm | StrOutputParser()
+    return ResilientChain(prompt | llm | _usage_recorder(name) | StrOutputParser(), name, prompt=prompt)
@@ -0,0 +1,245 @@
+"""
+Simulated load test for the resilient LLM layer (no provider calls).
+
+    python -m workflow.llm_loadtest [--runs 2000] [--concurrency 32]
+                                    [--tail_prob 0.03] [--error_prob 0.02] [--time_scale 0.02]
+                                    [--rpm 300 --tpm 400000]
+
+Each run makes 5 sequential calls (4 agent turns + judge) against a simulated
+provider: log-normal latency around 1s, a `tail_prob` chance of a stalled request
+(8-15x slower) and an `error_prob` chance of a fast 503. The same workload is run
+twice:
+  baseline : plain awaits, no deadline, first error fails the run (the old behaviour)
+  resilient: workflow.resilience (deadline + p95 hedging + jittered retries + budget + breaker)
+and run-latency quantiles are reported in simulated seconds. `time_scale` is real
+seconds per simulated second.
+
+With --rpm/--tpm the provider also enforces a rolling one-minute quota (over it: a
+fast 429), and a third mode adds the rate limiter (workflow.rate_limit) to the
+resilient one. Each call sends ~1200 prompt tokens (the caller's estimate is within
+15%) and gets ~250 completion tokens back; the report adds the 429 count and the
+accepted requests / tokens per simulated minute.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from configs.settings import settings
+from workflow.rate_limit import RateLimiter, record_usage
+from workflow.resilience import CircuitBreaker, ResilientCaller, retry_budget
+
+NODES = ["risk", "advocate", "risk", "advocate", "judge"]
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"simulated provider error {status_code}")
+        self.status_code = status_code
+
+
+class SimulatedProvider:
+    def __init__(
+        self, scale: float, tail_prob: float, error_prob: float, seed: int,
+        rpm: Optional[int] = None, tpm: Optional[int] = None,
+    ):
+        self.scale = scale
+        self.tail_prob = tail_prob
+        self.error_prob = error_prob
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.rpm = rpm
+        self.tpm = tpm
+        self.accepted: Deque[Tuple[float, int]] = deque()  # (time, tokens) in the last minute
+        self.accepted_total = 0
+        self.tokens_total = 0
+        self.rate_limited = 0
+
+    def _admit(self, tokens: int) -> bool:
+        if not (self.rpm or self.tpm):
+            return True
+        now = time.perf_counter()
+        while self.accepted and now - self.accepted[0][0] >= 60 * self.scale:
+            self.accepted.popleft()
+        over_rpm = self.rpm and len(self.accepted) + 1 > self.rpm
+        over_tpm = self.tpm and sum(t for _, t in self.accepted) + tokens > self.tpm
+        if over_rpm or over_tpm:
+            self.rate_limited += 1
+            return False
+        self.accepted.append((now, tokens))
+        self.accepted_total += 1
+        self.tokens_total += tokens
+        return True
+
+    async def call(self, prompt_tokens: int = 0) -> str:
+        self.requests += 1
+        completion_tokens = int(self.rng.uniform(150, 350)) if prompt_tokens else 0
+        if not self._admit(prompt_tokens + completion_tokens):
+            await asyncio.sleep(0.02 * self.scale)
+            raise ProviderError(429)
+        r = self.rng.random()
+        if r < self.error_prob:
+            await asyncio.sleep(0.05 * self.scale)
+            raise ProviderError(503)
+        latency = self.rng.lognormvariate(0.0, 0.35)
+        if r < self.error_prob + self.tail_prob:
+            latency *= self.rng.uniform(8, 15)
+        await asyncio.sleep(latency * self.scale)
+        record_usage(prompt_tokens, completion_tokens)
+        return "ok"
+
+
+@contextmanager
+def scaled_settings(scale: float) -> Iterator[None]:
+    """Time-based LLM_* settings are in real seconds; express them in simulated seconds."""
+    keys = [
+        "LLM_TIMEOUT_SECONDS", "LLM_HEDGE_DEFAULT_DELAY_SECONDS", "LLM_HEDGE_MIN_DELAY_SECONDS",
+        "LLM_RETRY_BASE_SECONDS", "LLM_RETRY_MAX_SECONDS", "LLM_BREAKER_COOLDOWN_SECONDS",
+        "LLM_RATE_LIMIT_PENALTY_SECONDS",
+    ]
+    saved = {k: getattr(settings, k) for k in keys}
+    saved_nodes = dict(settings.LLM_NODE_TIMEOUTS)
+    try:
+        for k in keys:
+            setattr(settings, k, saved[k] * scale)
+        settings.LLM_NODE_TIMEOUTS = {k: v * scale for k, v in saved_nodes.items()}
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        settings.LLM_NODE_TIMEOUTS = saved_nodes
+
+
+async def _run_once(provider: SimulatedProvider, callers: Optional[Dict[str, ResilientCaller]]) -> Optional[float]:
+    t0 = time.perf_counter()
+    quota = bool(provider.rpm or provider.tpm)
+    try:
+        if callers is None:
+            for _ in NODES:
+                await provider.call(1200 if quota else 0)
+        else:
+            with retry_budget():
+                for node in NODES:
+                    prompt = int(provider.rng.lognormvariate(7.09, 0.2)) if quota else 0  # ~1200 tokens
+                    estimate = int(prompt * provider.rng.uniform(0.85, 1.15)) if quota else 0
+                    await callers[node].acall(
+                        lambda: provider.call(prompt),
+                        tokens=estimate + settings.LLM_COMPLETION_TOKENS_ESTIMATE if quota else 0,
+                    )
+    except Exception:
+        return None
+    return time.perf_counter() - t0
+
+
+async def _workload(
+    runs: int, concurrency: int, provider: SimulatedProvider, callers: Optional[Dict[str, ResilientCaller]],
+) -> List[Optional[float]]:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            return await _run_once(provider, callers)
+
+    return await asyncio.gather(*(one() for _ in range(runs)))
+
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _report(
+    name: str, results: List[Optional[float]], provider: SimulatedProvider, scale: float, elapsed: float,
+) -> Dict[str, Any]:
+    ok = [r / scale for r in results if r is not None]
+    requests = provider.requests
+    row = {
+        "mode": name,
+        "runs": len(results),
+        "failed": len(results) - len(ok),
+        "p50": round(statistics.median(ok), 2) if ok else None,
+        "p95": round(_quantile(ok, 0.95), 2) if ok else None,
+        "p99": round(_quantile(ok, 0.99), 2) if ok else None,
+        "max": round(max(ok), 2) if ok else None,
+        "requests_per_run": round(requests / max(len(results), 1), 2),
+    }
+    line = (
+        f"{name:<10} runs={row['runs']} failed={row['failed']} "
+        f"p50={row['p50']}s p95={row['p95']}s p99={row['p99']}s max={row['max']}s "
+        f"requests/run={row['requests_per_run']}"
+    )
+    if provider.rpm or provider.tpm:
+        minutes = elapsed / scale / 60
+        row.update({
+            "minutes": round(minutes, 2),
+            "rate_limited": provider.rate_limited,
+            "accepted_per_min": round(provider.accepted_total / minutes, 1),
+            "tokens_per_min": round(provider.tokens_total / minutes),
+        })
+        line += (
+            f" 429s={row['rate_limited']} minutes={row['minutes']} accepted/min={row['accepted_per_min']}"
+            f" tokens/min={row['tokens_per_min']}"
+        )
+    print(line)
+    return row
+
+
+def _timed_workload(runs, concurrency, provider, callers):
+    t0 = time.perf_counter()
+    results = asyncio.run(_workload(runs, concurrency, provider, callers))
+    return results, time.perf_counter() - t0
+
+
+def run(
+    runs: int = 2000,
+    concurrency: int = 32,
+    tail_prob: float = 0.03,
+    error_prob: float = 0.02,
+    time_scale: float = 0.02,
+    seed: int = 7,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    rows = []
+
+    provider = SimulatedProvider(time_scale, tail_prob, error_prob, seed, rpm, tpm)
+    results, elapsed = _timed_workload(runs, concurrency, provider, None)
+    rows.append(_report("baseline", results, provider, time_scale, elapsed))
+
+    modes = ["resilient"] + (["limited"] if rpm or tpm else [])
+    with scaled_settings(time_scale):
+        for mode in modes:
+            provider = SimulatedProvider(time_scale, tail_prob, error_prob, seed, rpm, tpm)
+            breaker = CircuitBreaker("loadtest", settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS)
+            limiter = RateLimiter("loadtest", rpm, tpm, period_seconds=60 * time_scale) if mode == "limited" else None
+            callers = {n: ResilientCaller(n, breaker, limiter=limiter) for n in set(NODES)}
+            results, elapsed = _timed_workload(runs, concurrency, provider, callers)
+            rows.append(_report(mode, results, provider, time_scale, elapsed))
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--runs", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--tail_prob", type=float, default=0.03)
+    p.add_argument("--error_prob", type=float, default=0.02)
+    p.add_argument("--time_scale", type=float, default=0.02)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--rpm", type=int, default=None, help="simulated provider requests-per-minute quota")
+    p.add_argument("--tpm", type=int, default=None, help="simulated provider tokens-per-minute quota")
+    args = p.parse_args()
+    run(
+        args.runs, args.concurrency, args.tail_prob, args.error_prob, args.time_scale, args.seed,
+        args.rpm, args.tpm,
+    )
+
+
+if __name__ == "__main__":
+    main()
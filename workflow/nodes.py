@@ -1,23 +1,61 @@
-from typing import Dict, Any
+import asyncio
+import functools
+from typing import Dict, Any, Optional
 from langgraph.types import Command # type: ignore
 from langgraph.graph import END
 
 from workflow.debate_state import DebateState
-from workflow.utils import create_msg, history
+from workflow.utils import consensus, create_msg, history
+from configs.settings import settings
+from core.metrics import NODE_SECONDS
 from workflow.llm import build_chain
+from workflow.resilience import LLMUnavailable
 from workflow.prompts import (
     RISK_SYSTEM, RISK_HUMAN,
     ADV_SYSTEM, ADV_HUMAN,
     MOD_SYSTEM, MOD_HUMAN,
     JUDGE_SYSTEM, JUDGE_HUMAN
 )
-from apps.retrieval.policies import retrieve_policies
+from apps.retrieval.policies import retrieve_policies_multi
 
 
 NODE_RISK = "risk_agent"
 NODE_ADV = "advocate_agent"
 NODE_MOD = "moderator"
 NODE_JUDGE = "judge"
+NODE_RISK_OPEN = "risk_agent_opening"
+NODE_ADV_OPEN = "advocate_agent_opening"
+NODE_JOIN = "openings_join"
+
+_NODE_BY_SPEAKER = {"risk": NODE_RISK, "advocate": NODE_ADV, "judge": NODE_JUDGE}
+
+
+def _timed(node: str):
+    """Records each call of the wrapped node __call__ in debate_node_seconds{node=...}."""
+    def wrap(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def ainner(self, state):
+                with NODE_SECONDS.time(node=node):
+                    return await fn(self, state)
+            return ainner
+
+        @functools.wraps(fn)
+        def inner(self, state):
+            with NODE_SECONDS.time(node=node):
+                return fn(self, state)
+        return inner
+    return wrap
+
+
+async def _agent_turn(chain, speaker: str, inputs: Dict[str, Any]) -> str:
+    """LLM turn; with LLM_DEGRADE_ON_FAILURE an unavailable model skips the turn instead of failing the run."""
+    try:
+        return await chain.ainvoke(inputs)
+    except LLMUnavailable as e:
+        if not settings.LLM_DEGRADE_ON_FAILURE:
+            raise
+        return f"({speaker} agent unavailable for this turn: {e}. The debate continues without it.)"
 
 
 def _fmt_neighbors(neighbors):
@@ -42,14 +80,17 @@ def _fmt_neighbors(neighbors):
 
 
 class RiskAgentNode:
-    def __init__(self):
-        self.chain = build_chain(RISK_SYSTEM, RISK_HUMAN, temperature=0.0)
+    def __init__(self, output_key: Optional[str] = None):
+        self.chain = build_chain(RISK_SYSTEM, RISK_HUMAN, temperature=0.0, name="risk")
+        # set for parallel branches: write the message to its own key instead of `messages`
+        self.output_key = output_key
 
-    def __call__(self, state: DebateState) -> Dict[str, Any]:
+    @_timed("risk")
+    async def __call__(self, state: DebateState) -> Dict[str, Any]:
         msgs = state.get("messages", []) or []
         stage = state.get("stage", "opening")
 
-        out = self.chain.invoke({
+        out = await _agent_turn(self.chain, "risk", {
             "applicant_payload": state.get("applicant_payload", {}) or {},
             "neighbor_stats": state.get("neighbor_stats", {}) or {},
             "neighbors": _fmt_neighbors(state.get("neighbors", [])),
@@ -57,16 +98,21 @@ class RiskAgentNode:
             "stage": stage,
         })
 
+        msg = create_msg("risk", out, stage, validated=True)
+        if self.output_key:
+            return {self.output_key: msg}
         return {
-            "messages": msgs + [create_msg("risk", out, stage, validated=True)]
+            "messages": msgs + [msg]
         }
 
 
 class AdvocateAgentNode:
-    def __init__(self):
-        self.chain = build_chain(ADV_SYSTEM, ADV_HUMAN, temperature=0.0)
+    def __init__(self, output_key: Optional[str] = None):
+        self.chain = build_chain(ADV_SYSTEM, ADV_HUMAN, temperature=0.0, name="advocate")
+        self.output_key = output_key
 
-    def __call__(self, state: DebateState) -> Dict[str, Any]:
+    @_timed("advocate")
+    async def __call__(self, state: DebateState) -> Dict[str, Any]:
         msgs = state.get("messages", []) or []
         stage = state.get("stage", "rebuttal")
 
@@ -76,7 +122,7 @@ class AdvocateAgentNode:
                 opponent = m.get("content", "")
                 break
 
-        out = self.chain.invoke({
+        out = await _agent_turn(self.chain, "advocate", {
             "applicant_payload": state.get("applicant_payload", {}) or {},
             "neighbor_stats": state.get("neighbor_stats", {}) or {},
             "neighbors": _fmt_neighbors(state.get("neighbors", [])),
@@ -85,15 +131,19 @@ class AdvocateAgentNode:
             "stage": stage,
         })
 
+        msg = create_msg("advocate", out, stage, validated=True)
+        if self.output_key:
+            return {self.output_key: msg}
         return {
-            "messages": msgs + [create_msg("advocate", out, stage, validated=True)]
+            "messages": msgs + [msg]
         }
 
 
 class ModeratorNode:
     def __init__(self):
-        self.chain = build_chain(MOD_SYSTEM, MOD_HUMAN, temperature=0.0)
+        self.chain = build_chain(MOD_SYSTEM, MOD_HUMAN, temperature=0.0, name="moderator")
 
+    @_timed("moderator")
     def __call__(self, state: DebateState) -> Command[str]:
         stage = state.get("stage", "opening")
         speaker = state.get("speaker", "risk")
@@ -101,21 +151,93 @@ class ModeratorNode:
         if stage == "verdict" or speaker == "judge":
             return Command(goto=NODE_JUDGE if speaker == "judge" else END)
 
-        if stage == "opening" and speaker == "risk":
-            return Command(update={"stage": "rebuttal", "speaker": "advocate"}, goto=NODE_ADV)
+        schedule = state.get("schedule")
+        if not schedule:
+            from workflow.debate_workflow import build_schedule
+            schedule = build_schedule()
+
+        nxt = state.get("turn", 0) + 1
+
+        # early consensus: both sides already recommend the same outcome (parsed, no LLM call)
+        if settings.EARLY_CONSENSUS and nxt < len(schedule):
+            agreed = consensus(state.get("messages", []) or [])
+            if agreed:
+                skipped = len(schedule) - nxt
+                note = create_msg(
+                    "moderator",
+                    f"Early consensus: both agents recommend {agreed} after {nxt} turns; "
+                    f"skipping the remaining {skipped} turns and moving to the verdict.",
+                    stage,
+                    validated=True,
+                )
+                return Command(
+                    update={
+                        "messages": (state.get("messages", []) or []) + [note],
+                        "stage": "verdict",
+                        "speaker": "judge",
+                        "early_consensus": {"recommendation": agreed, "after_turns": nxt, "turns_skipped": skipped},
+                    },
+                    goto=NODE_JUDGE,
+                )
+
+        # advance to the next scheduled (stage, speaker); past the end -> verdict
+        if nxt < len(schedule):
+            next_stage, next_speaker = schedule[nxt]
+            return Command(
+                update={"stage": next_stage, "speaker": next_speaker, "turn": nxt},
+                goto=_NODE_BY_SPEAKER[next_speaker],
+            )
 
-        if stage == "rebuttal" and speaker == "advocate":
-            return Command(update={"stage": "counter", "speaker": "risk"}, goto=NODE_RISK)
+        return Command(update={"stage": "verdict", "speaker": "judge"}, goto=NODE_JUDGE)
 
-        if stage == "counter" and speaker == "risk":
-            return Command(update={"stage": "final_argument", "speaker": "advocate"}, goto=NODE_ADV)
 
-        if stage == "final_argument" and speaker == "advocate":
-            return Command(update={"stage": "verdict", "speaker": "judge"}, goto=NODE_JUDGE)
+class OpeningsJoinNode:
+    """Fast mode: merges the parallel openings into the transcript (risk first)."""
 
-        return Command(update={"stage": "verdict", "speaker": "judge"}, goto=NODE_JUDGE)
+    @_timed("openings_join")
+    def __call__(self, state: DebateState) -> Dict[str, Any]:
+        msgs = list(state.get("messages", []) or [])
+        for key in ("risk_opening", "advocate_opening"):
+            msg = state.get(key)
+            if msg:
+                msgs.append(msg)
+        return {"messages": msgs, "stage": "verdict", "speaker": "judge"}
     
 
+def _policy_facets(applicant: Dict[str, Any], neighbor_stats: Dict[str, Any]) -> Dict[str, str]:
+    """Short, focused policy queries (one per decision facet) instead of one giant prompt."""
+    a = applicant or {}
+
+    def v(key: str) -> str:
+        val = a.get(key)
+        return "unknown" if val is None or val == "" else str(val)
+
+    return {
+        "affordability": (
+            f"affordability and repayment capacity: debt-to-income ratio {v('debt_to_income_ratio')}, "
+            f"annual income {v('annual_income')}, loan amount {v('loan_amount')}, "
+            f"installment {v('installment')}, current balance {v('current_balance')}"
+        ),
+        "credit_history": (
+            f"credit history requirements: credit score {v('credit_score')}, grade {v('grade_subgrade')}, "
+            f"delinquency history {v('delinquency_history')}, delinquencies {v('num_of_delinquencies')}, "
+            f"public records {v('public_records')}"
+        ),
+        "loan_purpose": (
+            f"eligible loan purpose and terms: purpose {v('loan_purpose')}, term {v('loan_term')} months, "
+            f"interest rate {v('interest_rate')}"
+        ),
+        "employment": (
+            f"employment and income verification: employment status {v('employment_status')}, "
+            f"education {v('education_level')}, age {v('age')}"
+        ),
+        "risk_thresholds": (
+            "risk thresholds and manual review triggers: historical default rate among similar applicants "
+            f"{neighbor_stats.get('default_rate', 'unknown')}"
+        ),
+    }
+
+
 def _fmt_policy_evidence(matches):
     
     if not matches:
@@ -142,44 +264,50 @@ def _fmt_policy_evidence(matches):
 
 class JudgeNode:
     def __init__(self):
-        self.chain = build_chain(JUDGE_SYSTEM, JUDGE_HUMAN, temperature=0.0)
+        self.chain = build_chain(JUDGE_SYSTEM, JUDGE_HUMAN, temperature=0.0, name="judge")
 
-    def __call__(self, state: DebateState) -> Dict[str, Any]:
+    @_timed("judge")
+    async def __call__(self, state: DebateState) -> Dict[str, Any]:
         msgs = state.get("messages", []) or []
 
-        # Build a query from debate + applicant info (no DB storage needed)
         debate_text = history(msgs)
         applicant_payload = state.get("applicant_payload", {}) or {}
         neighbor_stats = state.get("neighbor_stats", {}) or {}
 
-        policy_query = (
-            "Use the following debate + applicant context to find the most relevant bank policy clauses.\n\n"
-            f"APPLICANT:\n{applicant_payload}\n\n"
-            f"NEIGHBOR_STATS:\n{neighbor_stats}\n\n"
-            f"DEBATE:\n{debate_text}\n"
+        # Retrieve policy clauses: one batched encode over the decision facets, fused by rank
+        policy_matches = await asyncio.to_thread(
+            retrieve_policies_multi, _policy_facets(applicant_payload, neighbor_stats), k=10, min_similarity=0.60
         )
-
-        # Retrieve policy clauses
-        policy_matches = retrieve_policies(policy_query, k=10)
-        policy_matches = [m for m in policy_matches if (m.get("similarity") or 0) >= 0.60]
         policy_evidence = _fmt_policy_evidence(policy_matches)
 
 
         # Judge receives everything
-        out = self.chain.invoke({
-            "applicant_payload": applicant_payload,
-            "neighbor_stats": neighbor_stats,
-            "neighbors": _fmt_neighbors(state.get("neighbors", [])),
-            "debate_history": debate_text,
-            "policy_evidence": policy_evidence,
-        })
-
-        verdict_msg = create_msg("judge", out, "verdict", validated=True)
+        degraded = False
+        try:
+            out = await self.chain.ainvoke({
+                "applicant_payload": applicant_payload,
+                "neighbor_stats": neighbor_stats,
+                "neighbors": _fmt_neighbors(state.get("neighbors", [])),
+                "debate_history": debate_text,
+                "policy_evidence": policy_evidence,
+            })
+        except LLMUnavailable as e:
+            if not settings.LLM_DEGRADE_ON_FAILURE:
+                raise
+            # no verdict without the judge: route the case to a human
+            degraded = True
+            out = (
+                "Final decision: MANUAL REVIEW\n"
+                f"confidence: 0\n- The judge model was unavailable ({e}); the case needs a human reviewer."
+            )
+
+        verdict_msg = create_msg("judge", out, "verdict", validated=not degraded)
         return {
             "messages": msgs + [verdict_msg],
             "judge_verdict": {
                 "raw": out,
                 "policy_matches": policy_matches,   # so you can inspect/debug
+                "degraded": degraded,
             },
             "stage": "verdict",
             "speaker": "judge",
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from configs.settings import settings
+from core.metrics import registry
+
+# Client-side limiter for the chat provider's per-minute quotas (requests and tokens),
+# shared by every run, thread and event loop in the process (used by workflow/resilience.py):
+#   - two sliding one-minute windows (RPM, TPM), each capped at LLM_RATE_LIMIT_HEADROOM of
+#     the quota: an idle process sends at once, and no 60 s span ever goes over the cap,
+#     so sustained throughput stays just under the quota
+#   - a call reserves 1 request + its estimated tokens up front, at the earliest time both
+#     windows have room. Reservations are taken in arrival order under one lock, so waiting
+#     calls are served FIFO whatever thread or loop they come from
+#   - once the response arrives the estimate is replaced by the provider's usage
+#   - a 429 stops admissions for its Retry-After
+# Limits are per process: with several uvicorn workers, give each worker its share of
+# the quota (LLM_RPM_LIMIT / LLM_TPM_LIMIT divided by the worker count).
+
+LLM_RATE_LIMIT_WAIT = registry.histogram(
+    "llm_rate_limit_wait_seconds",
+    "Time LLM calls waited for the provider rate limiter, per debate node.",
+    ("node",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+LLM_RATE_LIMIT_WAITING = registry.gauge(
+    "llm_rate_limit_waiting", "LLM calls currently queued in the rate limiter.", ("limiter",),
+)
+LLM_RATE_LIMITED = registry.counter(
+    "llm_rate_limited_total", "429 responses from the provider despite the limiter.", ("limiter",),
+)
+
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(prompt_text: str) -> int:
+    """Prompt tokens (~4 chars each) plus the completion allowance reserved before the call."""
+    return len(prompt_text) // _CHARS_PER_TOKEN + settings.LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a 429's Retry-After header, if the error carries a response."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return int(status) if status is not None else None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return status_code(error) == 429 or "RateLimit" in type(error).__name__
+
+
+class _Window:
+    """Admissions of the last `period_seconds`, capped at `limit` (the provider's rolling window)."""
+
+    def __init__(self, per_period: float, period_seconds: float, headroom: float):
+        self.limit = max(1.0, per_period * headroom)
+        self.period = period_seconds
+        self.entries: Deque[List[float]] = deque()  # [admit time, amount], admit times non-decreasing
+        self.blocked_until = 0.0
+
+    def earliest(self, amount: float, now: float) -> float:
+        """First time >= now (and after every earlier reservation) with room for `amount`."""
+        while self.entries and self.entries[0][0] <= now - self.period:
+            self.entries.popleft()
+        t = max(now, self.blocked_until, self.entries[-1][0] if self.entries else now)
+        in_window = [e for e in self.entries if e[0] > t - self.period]
+        used = sum(e[1] for e in in_window)
+        for entry in in_window:  # oldest first: wait until enough of them leave the window
+            if used + amount <= self.limit:
+                break
+            t = max(t, entry[0] + self.period)
+            used -= entry[1]
+        return t
+
+    def add(self, amount: float, at: float) -> List[float]:
+        entry = [at, float(amount)]
+        self.entries.append(entry)
+        return entry
+
+
+class Grant:
+    """One admitted call: its reservations, corrected by `settle` once usage is known."""
+
+    __slots__ = ("limiter", "tokens", "settled", "entries")
+
+    def __init__(self, limiter: "RateLimiter", tokens: int, entries: List[Optional[List[float]]]):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.settled = False
+        self.entries = entries  # [request entry, token entry]
+
+    def settle(self, actual_tokens: int):
+        if self.settled:
+            return
+        self.settled = True
+        self.limiter._set(self.entries[1], actual_tokens)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float],
+        tpm: Optional[float],
+        headroom: Optional[float] = None,
+        period_seconds: float = 60.0,
+    ):
+        headroom = settings.LLM_RATE_LIMIT_HEADROOM if headroom is None else headroom
+        self.name = name
+        self._lock = threading.Lock()
+        self._requests = _Window(rpm, period_seconds, headroom) if rpm else None
+        self._tokens = _Window(tpm, period_seconds, headroom) if tpm else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    def _admit(self, tokens: int, at: float) -> Grant:
+        # caller holds _lock; both windows record the call at the same admit time
+        return Grant(self, tokens, [
+            self._requests.add(1, at) if self._requests is not None else None,
+            self._tokens.add(tokens, at) if self._tokens is not None else None,
+        ])
+
+    def _earliest(self, tokens: int, now: float) -> float:
+        at = now
+        if self._requests is not None:
+            at = max(at, self._requests.earliest(1, now))
+        if self._tokens is not None:
+            at = max(at, self._tokens.earliest(tokens, now))
+        return at
+
+    def _reserve(self, tokens: int) -> Tuple[Grant, float]:
+        with self._lock:
+            now = time.monotonic()
+            at = self._earliest(tokens, now)
+            grant = self._admit(tokens, at)
+        return grant, at - now
+
+    def _set(self, entry: Optional[List[float]], amount: float):
+        if entry is not None:
+            with self._lock:
+                entry[1] = float(amount)
+
+    def _refund(self, grant: Grant):
+        # cancelled while queued: nothing was sent
+        grant.settled = True
+        for entry in grant.entries:
+            self._set(entry, 0)
+
+    async def acquire(self, tokens: int, node: str = "") -> Grant:
+        """Waits (without holding a thread) until the call may be sent."""
+        t0 = time.perf_counter()
+        grant, wait = self._reserve(tokens)
+        if wait > 0:
+            with LLM_RATE_LIMIT_WAITING.track(limiter=self.name):
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    self._refund(grant)
+                    raise
+        LLM_RATE_LIMIT_WAIT.observe(time.perf_counter() - t0, node=node)
+        return grant
+
+    def acquire_sync(self, tokens: int, node: str = "") -> Grant:
+        t0 = time.perf_counter()
+        grant, wait = self._reserve(tokens)
+        if wait > 0:
+            with LLM_RATE_LIMIT_WAITING.track(limiter=self.name):
+                time.sleep(wait)
+        LLM_RATE_LIMIT_WAIT.observe(time.perf_counter() - t0, node=node)
+        return grant
+
+    def try_acquire(self, tokens: int) -> Optional[Grant]:
+        """A grant only if nobody is queued and the windows have room now (for hedges)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._earliest(tokens, now) > now:
+                return None
+            return self._admit(tokens, now)
+
+    def throttle(self, seconds: Optional[float] = None):
+        """The provider answered 429: stop admitting calls for Retry-After (or the default pause)."""
+        LLM_RATE_LIMITED.inc(limiter=self.name)
+        seconds = settings.LLM_RATE_LIMIT_PENALTY_SECONDS if seconds is None else seconds
+        with self._lock:
+            until = time.monotonic() + seconds
+            for window in (self._requests, self._tokens):
+                if window is not None:
+                    window.blocked_until = max(window.blocked_until, until)
+
+
+_current_grant: contextvars.ContextVar[Optional[Grant]] = contextvars.ContextVar("llm_rate_grant", default=None)
+
+
+@contextmanager
+def using(grant: Optional[Grant]) -> Iterator[None]:
+    """Makes `grant` the one settled by record_usage for calls started inside the block."""
+    token = _current_grant.set(grant)
+    try:
+        yield
+    finally:
+        _current_grant.reset(token)
+
+
+def record_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    """Replaces the current call's token estimate by the usage the provider reported."""
+    grant = _current_grant.get()
+    if grant is not None and (prompt_tokens or completion_tokens):
+        grant.settle((prompt_tokens or 0) + (completion_tokens or 0))
+
+
+# one limiter for the chat provider, shared by every node and run in the process
+provider_limiter = RateLimiter("groq", settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT)
@@ -0,0 +1,78 @@
+"""
+Replays recorded debate transcripts through the moderator's early-consensus rule
+and reports how many agent turns it would have saved.
+
+    python -m workflow.replay_consensus transcripts.jsonl [more.json ...]
+
+Each input is JSONL (one transcript per line) or a JSON list of transcripts. A
+transcript is either a list of messages or an object with a `messages` list, in
+workflow shape ({speaker, content, stage}) or API shape ({role, content, stage},
+e.g. GET /runs/{run_id}/transcript).
+"""
+import argparse
+import json
+from collections import Counter
+from typing import Any, Dict, Iterator, List
+
+from workflow.utils import consensus
+
+_ROLE_TO_SPEAKER = {"RISK": "risk", "ADVOCATE": "advocate", "MODERATOR": "moderator", "JUDGE": "judge"}
+
+
+def _normalize(transcript: Any) -> List[Dict[str, Any]]:
+    msgs = transcript.get("messages", []) if isinstance(transcript, dict) else transcript
+    out = []
+    for m in msgs or []:
+        speaker = m.get("speaker") or _ROLE_TO_SPEAKER.get((m.get("role") or "").upper(), "")
+        out.append({"speaker": speaker.lower(), "content": m.get("content") or "", "stage": m.get("stage")})
+    return out
+
+
+def _load(paths: List[str]) -> Iterator[List[Dict[str, Any]]]:
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        if not text:
+            continue
+        if text.startswith("["):
+            data = json.loads(text)
+            # a single transcript (list of messages) or a list of transcripts
+            items = [data] if data and isinstance(data[0], dict) and "content" in data[0] else data
+        else:
+            items = [json.loads(line) for line in text.splitlines() if line.strip()]
+        for item in items:
+            yield _normalize(item)
+
+
+def replay(transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agent turns spoken, and where the moderator would have stopped (same rule as ModeratorNode)."""
+    agent_turns = [m for m in transcript if m["speaker"] in ("risk", "advocate")]
+    for i in range(1, len(agent_turns)):
+        agreed = consensus(agent_turns[:i])
+        if agreed:
+            return {"turns": len(agent_turns), "stopped_after": i, "saved": len(agent_turns) - i, "recommendation": agreed}
+    return {"turns": len(agent_turns), "stopped_after": None, "saved": 0, "recommendation": None}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("paths", nargs="+")
+    args = p.parse_args()
+
+    results = [replay(t) for t in _load(args.paths)]
+    if not results:
+        raise SystemExit("no transcripts found")
+
+    total = sum(r["turns"] for r in results)
+    saved = sum(r["saved"] for r in results)
+    stopped = [r for r in results if r["stopped_after"] is not None]
+    print(f"transcripts:       {len(results)}")
+    print(f"early-stopped:     {len(stopped)} ({len(stopped) / len(results):.1%})")
+    print(f"agent turns:       {total}")
+    print(f"turns saved:       {saved} ({saved / max(total, 1):.1%} of agent LLM calls)")
+    print(f"stopped after:     {dict(sorted(Counter(r['stopped_after'] for r in stopped).items()))}")
+    print(f"consensus on:      {dict(Counter(r['recommendation'] for r in stopped))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from configs.settings import settings
+from core.metrics import registry
+from workflow.rate_limit import RateLimiter, is_rate_limited, provider_limiter, retry_after, status_code, using
+
+# Resilient LLM calls (used by workflow/llm.py):
+#   - per-node deadline for each attempt
+#   - hedging: if the first request is slower than the node's recent p95, a duplicate
+#     is sent; the first to succeed wins and the other is cancelled
+#   - retries with full jitter, limited per call and by a per-run retry budget
+#   - a process-wide circuit breaker: after repeated provider failures calls fail
+#     fast for a cooldown instead of each run waiting out its own timeouts
+#   - the provider rate limiter (workflow/rate_limit.py): each attempt waits for its
+#     RPM/TPM reservation before its deadline starts; hedges are only sent when the
+#     limiter has room, and a 429 throttles the limiter instead of tripping the breaker
+
+T = TypeVar("T")
+
+LLM_RETRIES = registry.counter("llm_retries_total", "LLM call retries per node.", ("node",))
+LLM_HEDGES = registry.counter(
+    "llm_hedges_total", "Hedged duplicate requests per node (issued / won / throttled).", ("node", "outcome"),
+)
+LLM_TIMEOUTS = registry.counter("llm_timeouts_total", "LLM attempts that hit the node deadline.", ("node",))
+LLM_FAILURES = registry.counter("llm_failures_total", "LLM calls that failed after retries, by reason.", ("node", "reason"))
+LLM_BREAKER_OPEN = registry.gauge("llm_circuit_open", "1 while the provider circuit breaker is open.", ("breaker",))
+
+_RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailable(RuntimeError):
+    """The call could not be completed (deadline, retries/budget exhausted, circuit open)."""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, transport errors, 429 and 5xx are retried; bad requests/auth are not."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = status_code(error)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    name = type(error).__name__
+    return any(s in name for s in ("Timeout", "Connection", "RateLimit", "ServiceUnavailable", "InternalServer"))
+
+
+class LatencyWindow:
+    """Recent successful call durations of one node; quantiles for the hedge delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """closed -> open after `failures` consecutive failures -> half-open after `cooldown` (one probe)."""
+
+    def __init__(self, name: str, failures: int, cooldown_seconds: float):
+        self.name = name
+        self.failures = failures
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._probe_in_flight = False
+            if self._opened_at is not None:
+                self._opened_at = None
+                LLM_BREAKER_OPEN.set(0, breaker=self.name)
+
+    def abandon(self):
+        """The call was cancelled: free the half-open probe slot without a verdict."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            reopen = self._probe_in_flight
+            self._probe_in_flight = False
+            if reopen or (self._opened_at is None and self._consecutive >= self.failures):
+                self._opened_at = time.monotonic()
+                LLM_BREAKER_OPEN.set(1, breaker=self.name)
+
+
+class RetryBudget:
+    """Retries one run may spend across all its LLM calls."""
+
+    def __init__(self, retries: int):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+_run_budget: contextvars.ContextVar[Optional[RetryBudget]] = contextvars.ContextVar("llm_retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget(retries: Optional[int] = None) -> Iterator[RetryBudget]:
+    """Scopes a retry budget to everything (tasks included) started inside the block."""
+    budget = RetryBudget(settings.LLM_RUN_RETRY_BUDGET if retries is None else retries)
+    token = _run_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _run_budget.reset(token)
+
+
+class ResilientCaller:
+    """Wraps one node's async LLM call with deadline, hedging, retries and the breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        timeout_seconds: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        max_retries: Optional[int] = None,
+        window: Optional[LatencyWindow] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.timeout_seconds = timeout_seconds or settings.LLM_NODE_TIMEOUTS.get(name, settings.LLM_TIMEOUT_SECONDS)
+        self.hedge = settings.LLM_HEDGE_ENABLED if hedge is None else hedge
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.window = window or LatencyWindow()
+        self.limiter = limiter if limiter is not None and limiter.enabled else None
+
+    def hedge_delay(self) -> float:
+        p = self.window.quantile(settings.LLM_HEDGE_QUANTILE, settings.LLM_HEDGE_MIN_SAMPLES)
+        if p is None:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return max(p, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    def _start(self, fn: Callable[[], Awaitable[T]], grant) -> "asyncio.Future[T]":
+        # the task copies the context, so the call settles its own grant with the real usage
+        with using(grant):
+            return asyncio.ensure_future(fn())
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """One attempt: primary, plus a hedge after the p95 delay; first success wins."""
+        grant = await self.limiter.acquire(tokens, node=self.name) if self.limiter else None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+        hedge_at = loop.time() + self.hedge_delay()
+        primary = self._start(fn, grant)
+        started = {primary: loop.time()}
+        grants = {primary: grant}
+        tasks = {primary}
+        hedged = False
+        first_error: Optional[BaseException] = None
+        try:
+            while tasks:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    LLM_TIMEOUTS.inc(node=self.name)
+                    raise asyncio.TimeoutError(f"{self.name}: no response within {self.timeout_seconds:.0f}s")
+                wait = remaining
+                if self.hedge and not hedged:
+                    wait = min(remaining, max(0.0, hedge_at - loop.time()))
+                done, tasks = await asyncio.wait(tasks, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                # read every finished task's exception (a failed twin must not go unretrieved)
+                errors = {t: t.exception() for t in done}
+                for task, error in errors.items():
+                    if error is None:
+                        self.window.observe(loop.time() - started[task])
+                        if task is not primary:
+                            LLM_HEDGES.inc(node=self.name, outcome="won")
+                        return task.result()
+                    if grants.get(task) is not None and status_code(error) is not None:
+                        grants[task].settle(0)  # rejected with an error response: no tokens used
+                    first_error = first_error or error
+                if not done and self.hedge and not hedged:
+                    hedged = True
+                    hedge_grant = self.limiter.try_acquire(tokens) if self.limiter else None
+                    if self.limiter and hedge_grant is None:
+                        # calls are queued for quota: a duplicate would only take a queued run's slot
+                        LLM_HEDGES.inc(node=self.name, outcome="throttled")
+                        continue
+                    LLM_HEDGES.inc(node=self.name, outcome="issued")
+                    hedge = self._start(fn, hedge_grant)
+                    started[hedge] = loop.time()
+                    grants[hedge] = hedge_grant
+                    tasks.add(hedge)
+            raise first_error or LLMUnavailable(f"{self.name}: no attempt completed")
+        finally:
+            for task in tasks:
+                # the loser (or everything, on timeout): its elapsed time is a lower bound
+                # on its latency; keeping it stops the window from only seeing fast winners
+                task.cancel()
+                self.window.observe(loop.time() - started[task])
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """`tokens`: estimated prompt + completion tokens, reserved in the rate limiter."""
+        budget = _run_budget.get()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                LLM_FAILURES.inc(node=self.name, reason="circuit_open")
+                raise CircuitOpenError(f"LLM provider circuit is open (cooling down); {self.name} call skipped")
+            try:
+                out = await self._attempt(fn, tokens)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.success()  # the provider answered; the request itself was bad
+                    LLM_FAILURES.inc(node=self.name, reason="not_retryable")
+                    raise
+                if is_rate_limited(e) and self.limiter:
+                    self.limiter.throttle(retry_after(e))  # quota, not an outage: the retry queues
+                else:
+                    self.breaker.failure()
+                if attempt >= self.max_retries:
+                    LLM_FAILURES.inc(node=self.name, reason="retries_exhausted")
+                    raise LLMUnavailable(f"{self.name}: failed after {attempt + 1} attempts: {e}") from e
+                if budget is not None and not budget.spend():
+                    LLM_FAILURES.inc(node=self.name, reason="budget_exhausted")
+                    raise LLMUnavailable(f"{self.name}: run retry budget exhausted: {e}") from e
+                attempt += 1
+                LLM_RETRIES.inc(node=self.name)
+                # full jitter: uniform(0, min(cap, base * 2^attempt))
+                cap = min(settings.LLM_RETRY_MAX_SECONDS, settings.LLM_RETRY_BASE_SECONDS * (2 ** attempt))
+                await asyncio.sleep(random.uniform(0, cap))
+                continue
+            self.breaker.success()
+            return out
+
+
+# one breaker for the chat provider, shared by every node and run in the process
+provider_breaker = CircuitBreaker("groq", settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SECONDS)
+
+_CALLERS: Dict[str, ResilientCaller] = {}
+_CALLERS_LOCK = threading.Lock()
+
+
+def get_caller(name: str) -> ResilientCaller:
+    """One caller (and latency window) per node name, shared across chains and runs."""
+    with _CALLERS_LOCK:
+        caller = _CALLERS.get(name)
+        if caller is None:
+            caller = _CALLERS[name] = ResilientCaller(name, provider_breaker, limiter=provider_limiter)
+        return caller
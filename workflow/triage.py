@@ -0,0 +1,89 @@
+from typing import Any, Dict, List
+
+from configs.settings import settings
+
+# Pre-debate triage.
+# Combines the encoder head's default probability with the labelled neighborhood
+# (retrieval.neighbors.summarize_neighbor_stats). Only when both agree strongly
+# (very low/high modelled risk AND a (near-)unanimous neighborhood) do we skip the
+# LLM debate and issue a deterministic, templated decision with the same evidence.
+
+PATH_TRIAGE = "triage"
+PATH_DEBATE = "debate"
+
+
+def triage(default_prob: float, neighbor_stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns { path, verdict, reason, default_prob, neighbor_default_rate, known_labels }.
+    verdict is "approve" / "reject" for the triage path, None when the case goes to debate.
+    """
+    known = int(neighbor_stats.get("known_labels") or 0)
+    rate = neighbor_stats.get("default_rate")
+    out: Dict[str, Any] = {
+        "path": PATH_DEBATE,
+        "verdict": None,
+        "reason": "",
+        "default_prob": round(float(default_prob), 4),
+        "neighbor_default_rate": rate,
+        "known_labels": known,
+    }
+
+    if not settings.TRIAGE_ENABLED:
+        out["reason"] = "triage disabled"
+        return out
+    if known < settings.TRIAGE_MIN_KNOWN_NEIGHBORS or rate is None:
+        out["reason"] = f"only {known} labelled neighbors (need {settings.TRIAGE_MIN_KNOWN_NEIGHBORS})"
+        return out
+
+    dissent = settings.TRIAGE_MAX_DISSENT
+    if default_prob <= settings.TRIAGE_APPROVE_MAX_PROB and rate <= dissent:
+        out.update(path=PATH_TRIAGE, verdict="approve", reason="low modelled risk and a repaying neighborhood")
+    elif default_prob >= settings.TRIAGE_REJECT_MIN_PROB and rate >= 1.0 - dissent:
+        out.update(path=PATH_TRIAGE, verdict="reject", reason="high modelled risk and a defaulting neighborhood")
+    else:
+        out["reason"] = "ambiguous: model score and neighborhood are not both clear"
+    return out
+
+
+def templated_decision(
+    result: Dict[str, Any],
+    neighbor_items: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """DecisionSchema for a triaged case (same shape the judge path produces)."""
+    verdict = result["verdict"]
+    p = result["default_prob"]
+    known = result["known_labels"]
+    rate = float(result["neighbor_default_rate"] or 0.0)
+    defaulted = round(rate * known)
+
+    justification = [
+        f"Encoder risk model: modelled default probability {p:.1%}.",
+        f"{known - defaulted} of {known} most similar past applicants repaid, {defaulted} defaulted "
+        f"(default rate {rate:.1%}).",
+        f"Triage policy: {result['reason']}; decided without debate.",
+    ]
+    for n in neighbor_items[:3]:
+        hl = ", ".join(n.get("highlights") or []) or "no exact feature matches"
+        justification.append(
+            f"Neighbor {n['neighbor_id']} (similarity {n['similarity']:.2f}, {n['outcome']}): {hl}."
+        )
+
+    return {
+        "verdict": verdict,
+        "justification": justification,
+        "evidence_refs": [n["neighbor_id"] for n in neighbor_items[:3]],
+        "confidence": round(1.0 - p if verdict == "approve" else p, 4),
+        "policy_refs": [],
+        "path": PATH_TRIAGE,
+    }
+
+
+def templated_message(decision: Dict[str, Any]) -> str:
+    """Judge-style transcript text for a triaged case."""
+    final = {"approve": "APPROVE", "reject": "REJECT"}.get(decision["verdict"], "REVIEW")
+    bullets = "\n".join(f"- {j}" for j in decision["justification"])
+    return (
+        f"final_decision: {final}\n"
+        f"confidence: {round(decision['confidence'] * 100)}\n"
+        f"justification:\n{bullets}"
+    )
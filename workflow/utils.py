@@ -1,4 +1,5 @@
-from typing import List
+import re
+from typing import List, Optional
 from workflow.debate_state import DebateMessage
 
 def create_msg(speaker: str, content: str, stage: str, validated: bool = False) -> DebateMessage:
@@ -6,3 +7,36 @@ def create_msg(speaker: str, content: str, stage: str, validated: bool = False)
 
 def history(messages: List[DebateMessage]) -> str:
     return "\n".join(f"[{m['stage'].upper()}] {m['speaker'].upper()}: {m['content']}" for m in messages)
+
+
+# Only the agent's own numbered answer line counts, e.g.
+#   "1) Decision recommendation: **REJECT**", "**Decision recommendation (APPROVE or REVIEW):** REVIEW"
+# Free-text mentions ("the risk agent's recommendation: REJECT is overly cautious",
+# "I would not recommend APPROVE") are never read as the agent's recommendation.
+_REC_LINE = re.compile(
+    r"^[ \t>*_#-]*(?:1[).:][ \t*_]*)?decision[ \t]+recommendation[ \t*_]*(?:\([^)\n]*\)[ \t*_]*)?"
+    r"(?:[:\-–—][ \t*_]*(?:\n[ \t>*_-]*)?|\n[ \t>*_-]*)(APPROVE|REJECT|REVIEW)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# what each agent's prompt lets it recommend (workflow/prompts.py); anything else is a misparse
+_ALLOWED = {"risk": {"REJECT", "REVIEW"}, "advocate": {"APPROVE", "REVIEW"}}
+
+def extract_recommendation(text: str, speaker: Optional[str] = None) -> Optional[str]:
+    """Agent's own decision recommendation (APPROVE/REJECT/REVIEW) from its last answer line, or None."""
+    matches = _REC_LINE.findall(text or "")
+    if not matches:
+        return None
+    rec = matches[-1].upper()
+    if speaker in _ALLOWED and rec not in _ALLOWED[speaker]:
+        return None
+    return rec
+
+def consensus(messages: List[DebateMessage]) -> Optional[str]:
+    """The shared recommendation when the latest risk and advocate turns agree, else None."""
+    latest = {}
+    for m in messages:
+        if m.get("speaker") in ("risk", "advocate"):
+            latest[m["speaker"]] = extract_recommendation(m.get("content", ""), m["speaker"])
+    risk, adv = latest.get("risk"), latest.get("advocate")
+    return risk if risk is not None and risk == adv else None